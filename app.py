@@ -2,28 +2,109 @@
 Main Streamlit application
 """
 
+import queue
+import threading
 import time
+from collections import deque
 import streamlit as st
 import config
+from src.utils.lazy import preload
 from src.utils.logger import Logger
+from src.utils.tracing import Tracer
+from src.audio.device import AudioDeviceManager
 from src.audio.recorder import AudioRecorder
-from src.audio.player import AudioPlayer
+from src.audio.player import AudioPlayer, merge_wav_clips
 from src.services.deepgram import DeepgramService
 from src.services.groq import GroqService
+from src.services.http import HttpClient
+from src.services.memory import ConversationMemory
+from src.services.resilience import Resilience
+from src.services.response_cache import ResponseCache
+from src.services.tts_cache import TTSCache
+from src.pipeline.voice import VoicePipeline
+from src.pipeline.session import ConversationSession, SessionSnapshot
+from src.pipeline.speculation import SpeculationStats
 from src.ui.styles import CUSTOM_CSS
-from src.ui.components import render_sidebar, render_logs, render_conversation
+from src.ui.components import (
+    render_sidebar,
+    render_logs,
+    render_conversation,
+    render_history,
+    render_connection_stats,
+    render_cache_stats,
+    render_latency_panel,
+    render_device_stats,
+    render_speculation_stats,
+    render_resilience_stats,
+    render_response_cache_stats,
+    render_timing,
+)
+
+
+@st.cache_resource
+def preload_dependencies():
+    """Import the audio and API libraries in the background, once per process"""
+    return preload()
+
+
+@st.cache_resource
+def get_http_client() -> HttpClient:
+    """Connection pool shared by all services, kept alive across reruns"""
+    return HttpClient()
+
+
+@st.cache_resource
+def get_resilience() -> Resilience:
+    """Retry/hedge state and circuit breakers shared by all services"""
+    return Resilience()
+
+
+@st.cache_resource
+def get_device_manager() -> AudioDeviceManager:
+    """PyAudio and a warm input stream, kept across reruns"""
+    device = AudioDeviceManager()
+    device.warm()
+    return device
+
+
+@st.cache_resource
+def get_tracer() -> Tracer:
+    """Latency percentiles collected across reruns"""
+    return Tracer()
+
+
+@st.cache_resource
+def get_tts_cache() -> TTSCache:
+    """TTS cache shared across reruns and sessions"""
+    return TTSCache()
+
+
+@st.cache_resource
+def get_response_cache() -> ResponseCache:
+    """LLM replies shared across reruns and sessions"""
+    return ResponseCache()
+
+
+@st.cache_resource
+def get_speculation_stats() -> SpeculationStats:
+    """Speculative LLM request outcomes, collected across reruns"""
+    return SpeculationStats()
 
 
 def initialize_session_state():
     """Initialize Streamlit session state"""
-    if 'logs' not in st.session_state:
-        st.session_state.logs = []
+    if 'logger' not in st.session_state:
+        # One bounded logger per browser session, kept across reruns; all share
+        # one handler thread, so abandoned sessions leave no thread behind
+        st.session_state.logger = Logger()
     if 'transcript' not in st.session_state:
         st.session_state.transcript = ""
     if 'response' not in st.session_state:
         st.session_state.response = ""
-    if 'audio_file' not in st.session_state:
-        st.session_state.audio_file = None
+    if 'audio_data' not in st.session_state:
+        st.session_state.audio_data = None
+    if 'latency' not in st.session_state:
+        st.session_state.latency = None
     if 'is_processing' not in st.session_state:
         st.session_state.is_processing = False
     if 'vad_threshold' not in st.session_state:
@@ -31,18 +112,157 @@ def initialize_session_state():
         st.session_state.vad_threshold = config.DEFAULT_VAD_THRESHOLD
     if 'silence_duration' not in st.session_state:
         st.session_state.silence_duration = config.DEFAULT_SILENCE_DURATION
+    if 'vad_backend' not in st.session_state:
+        st.session_state.vad_backend = config.DEFAULT_VAD_BACKEND
+    if 'memory' not in st.session_state:
+        # Conversation history sent to the LLM, trimmed to a token budget
+        st.session_state.memory = ConversationMemory()
+    if 'session' not in st.session_state:
+        # Hands-free ConversationSession, if one was started
+        st.session_state.session = None
+    if 'history' not in st.session_state:
+        # Answered turns for the conversation view; bounded so reruns stay cheap
+        st.session_state.history = deque(maxlen=config.UI_HISTORY_TURNS)
+        st.session_state.synced_turns = 0
+    if 'render_times' not in st.session_state:
+        st.session_state.render_times = deque(maxlen=config.UI_RENDER_WINDOW)
+
+
+def create_voice_pipeline(
+    deepgram_key: str,
+    groq_key: str,
+    vad_threshold: int,
+    silence_duration: float,
+    vad_backend: str,
+    status_callback=None,
+    player=None,
+) -> VoicePipeline:
+    """Build a VoicePipeline on the shared device, connection pool and cache"""
+    logger = st.session_state.logger
+    recorder = AudioRecorder(
+        logger,
+        vad_threshold,
+        silence_duration,
+        vad_backend=vad_backend,
+        device=get_device_manager(),
+    )
+    http = get_http_client()
+    tts_cache = get_tts_cache() if config.TTS_CACHE_ENABLED else None
+    resilience = get_resilience()
+    deepgram = DeepgramService(
+        deepgram_key, logger, http=http, tts_cache=tts_cache, resilience=resilience
+    )
+    response_cache = get_response_cache() if config.RESPONSE_CACHE_ENABLED else None
+    groq = GroqService(
+        groq_key, logger, http=http, resilience=resilience, response_cache=response_cache
+    )
+    return VoicePipeline(
+        recorder,
+        deepgram,
+        groq,
+        logger,
+        status_callback=status_callback,
+        player=player,
+        memory=st.session_state.memory,
+        speculation=get_speculation_stats() if config.SPECULATIVE_LLM else None,
+    )
+
 
+def show_status(placeholder, status: str):
+    """Render a pipeline status message into a placeholder"""
+    if status == "listening":
+        placeholder.info("🎤 Listening... Speak now!")
+    elif status == "speaking":
+        placeholder.success("🗣️ Speech detected...")
+    elif status == "thinking":
+        placeholder.info("🤔 Thinking...")
+    elif status == "responding":
+        placeholder.info("🔊 Preparing response...")
+    elif status == "playing":
+        placeholder.info("🔊 Playing response...")
+
+
+def remember_turn(transcript: str, response: str):
+    """Add an answered turn to the conversation view"""
+    st.session_state.history.append({'transcript': transcript, 'response': response})
+
+
+def sync_session(snapshot: SessionSnapshot):
+    """Copy the hands-free session's latest turn into session state"""
+    if snapshot.transcript:
+        st.session_state.transcript = snapshot.transcript
+        st.session_state.response = snapshot.response
+        st.session_state.audio_data = snapshot.audio_data
+        st.session_state.latency = snapshot.latency
+    if snapshot.turns != st.session_state.synced_turns:
+        st.session_state.synced_turns = snapshot.turns
+        if snapshot.response:
+            remember_turn(snapshot.transcript, snapshot.response)
+
+
+def render_log_view():
+    """Render the most recent log records"""
+    logger = st.session_state.logger
+    logger.flush(timeout=0.2)
+    render_logs(logger.get_logs(config.UI_LOG_LINES), logger.stats())
+
+
+@st.fragment(run_every=config.CONTINUOUS_REFRESH)
+def render_live_logs():
+    """Logs panel polled on its own while hands-free mode runs"""
+    render_log_view()
+
+
+def render_latency_caption(latency, response: str):
+    """Render time to first token/audio, prompt size and upload for the last turn"""
+    if latency and response:
+        ttft = latency["ttft"] or 0.0
+        ttfa = latency["ttfa"]
+        parts = [
+            f"⏱️ First token {ttft:.2f}s",
+            f"first audio {f'{ttfa:.2f}s' if ttfa is not None else 'n/a'}",
+        ]
+        if latency.get("prompt_tokens"):
+            parts.append(f"prompt ~{latency['prompt_tokens']} tokens")
+        if latency.get("upload_bytes") is not None:
+            upload = (
+                f"upload {latency['upload_bytes'] / 1024:.0f} KB "
+                f"(saved {latency['upload_saved_bytes'] / 1024:.0f} KB)"
+            )
+            if latency.get("upload_time") is not None:
+                upload += f" in {latency['upload_time'] * 1000:.0f} ms"
+            parts.append(upload)
+        st.caption(" · ".join(parts))
 
-def log_callback(log_type: str, message: str):
-    """Callback for logger to push logs into Streamlit session_state"""
-    timestamp = time.strftime("%H:%M:%S")
-    st.session_state.logs.append(
-        {
-            "timestamp": timestamp,
-            "type": log_type,
-            "message": message,
-        }
+
+@st.fragment(run_every=config.CONTINUOUS_REFRESH)
+def render_hands_free():
+    """
+    Poll the hands-free session. Only this fragment reruns on each tick;
+    the full app reruns once, when the session ends.
+    """
+    session = st.session_state.session
+    snapshot = session.snapshot()
+    sync_session(snapshot)
+
+    if not snapshot.running:
+        if snapshot.error:
+            st.session_state.logger.error(f"Hands-free mode stopped: {snapshot.error}")
+        st.rerun()
+
+    show_status(st.empty(), snapshot.status)
+    st.caption(
+        f"🔁 Hands-free · {snapshot.turns} turn(s) · {snapshot.barge_ins} barge-in(s)"
+    )
+    # Replies already play on the local device with LOCAL_PLAYBACK
+    render_conversation(
+        snapshot.transcript,
+        snapshot.response,
+        snapshot.audio_data,
+        autoplay=not config.LOCAL_PLAYBACK,
     )
+    render_latency_caption(snapshot.latency, snapshot.response)
+    render_history(list(st.session_state.history)[:-1])
 
 
 def process_voice_interaction(
@@ -50,66 +270,99 @@ def process_voice_interaction(
     groq_key: str,
     vad_threshold: int,
     silence_duration: float,
+    vad_backend: str,
+    log_panel,
 ):
     """
-    Process complete voice interaction:
+    Process complete voice interaction through the concurrent VoicePipeline:
 
-    1. Record audio with VAD (mean absolute amplitude inside AudioRecorder)
-    2. Transcribe via Deepgram
-    3. Get LLM response via Groq
-    4. Synthesize response audio via Deepgram
-    """
-    # Initialize logger
-    logger = Logger()
-    logger.add_callback(log_callback)
-
-    # Initialize services
-    recorder = AudioRecorder(logger, vad_threshold, silence_duration)
-    player = AudioPlayer(logger)
-    deepgram = DeepgramService(deepgram_key, logger)
-    groq = GroqService(groq_key, logger)
+    1. Record audio with VAD, streaming it to Deepgram live STT
+    2. Stream the Groq reply sentence by sentence
+    3. Synthesize each sentence via Deepgram as soon as it is complete
 
+    The pipeline runs on a worker thread; this (script) thread only drains
+    status updates into the placeholder and refreshes `log_panel` as records
+    arrive, so Streamlit calls stay on it.
+    """
     status_placeholder = st.empty()
+    statuses: queue.Queue = queue.Queue()
+
+    voice = create_voice_pipeline(
+        deepgram_key,
+        groq_key,
+        vad_threshold,
+        silence_duration,
+        vad_backend,
+        status_callback=statuses.put,
+    )
+    recorder = voice.recorder
+    results = []
+    errors = []
 
-    def status_callback(status: str):
-        if status == "listening":
-            status_placeholder.info("🎤 Listening... Speak now!")
-        elif status == "speaking":
-            status_placeholder.success("🗣️ Speech detected...")
-
-    try:
-        # Record audio with VAD
-        audio_file = recorder.record_with_vad(status_callback)
+    def run_turn():
+        # Exceptions are handed back to the script thread, which shows them
+        try:
+            results.append(voice.run())
+        except Exception as e:
+            errors.append(e)
 
-        if audio_file:
-            # Transcribe
-            transcript = deepgram.transcribe(audio_file)
+    worker = threading.Thread(target=run_turn)
 
-            if transcript:
-                st.session_state.transcript = transcript
+    logger = st.session_state.logger
+    shown = logger.emitted
+    refreshed = time.monotonic()
 
-                # Get LLM response
-                response = groq.chat(transcript)
+    worker.start()
+    try:
+        while worker.is_alive() or not statuses.empty():
+            try:
+                show_status(status_placeholder, statuses.get(timeout=0.05))
+            except queue.Empty:
+                pass
+            # Push new log records into the panel in place, at a bounded rate
+            now = time.monotonic()
+            if logger.emitted != shown and now - refreshed >= config.UI_LOG_REFRESH:
+                shown = logger.emitted
+                refreshed = now
+                with log_panel.container():
+                    render_logs(logger.get_logs(config.UI_LOG_LINES), logger.stats())
+        worker.join()
+    except BaseException:
+        # Script rerun/stop: cancel outstanding work before unwinding
+        voice.cancel()
+        raise
+    finally:
+        # Always clean up audio resources
+        worker.join()
+        recorder.cleanup()
 
-                if response:
-                    st.session_state.response = response
+    if errors:
+        logger.error(f"Voice turn failed: {str(errors[0])}")
+        status_placeholder.error(f"❌ Voice turn failed: {str(errors[0])}")
+        return
+    result = results[0]
+    if result.transcript:
+        st.session_state.transcript = result.transcript
 
-                    # Synthesize speech
-                    audio_data = deepgram.synthesize(response)
+    if result.response:
+        st.session_state.response = result.response
+        st.session_state.latency = result.metrics()
+        remember_turn(result.transcript, result.response)
 
-                    if audio_data:
-                        saved_audio_file = player.save_audio(audio_data)
-                        st.session_state.audio_file = saved_audio_file
-                        status_placeholder.success("✅ Response ready!")
-        else:
-            status_placeholder.warning("⚠️ No speech detected")
+        if result.audio_clips:
+            # Kept in memory; st.audio serves bytes without a temp file
+            with result.trace.span("save"):
+                st.session_state.audio_data = merge_wav_clips(result.audio_clips)
+            status_placeholder.success("✅ Response ready!")
+    elif result.pipeline.ok and not result.transcript:
+        status_placeholder.warning("⚠️ No speech detected")
 
-    finally:
-        # Always clean up audio resources
-        recorder.cleanup()
+    if result.trace.spans:
+        get_tracer().finish(result.trace)
 
 
 def main():
+    started = time.perf_counter()
     st.set_page_config(
         page_title="Voice AI Agent",
         page_icon="🎤",
@@ -119,6 +372,8 @@ def main():
     # Apply custom CSS
     st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
+    preload_dependencies()
+
     # Initialize session state
     initialize_session_state()
 
@@ -127,17 +382,22 @@ def main():
     st.markdown("*Real-time voice conversation with AI*")
 
     # Render sidebar and get configuration
-    deepgram_key, groq_key, vad_threshold, silence_duration = render_sidebar(
+    deepgram_key, groq_key, vad_threshold, silence_duration, vad_backend = render_sidebar(
         st.session_state.vad_threshold,
         st.session_state.silence_duration,
+        st.session_state.vad_backend,
     )
 
     # Persist updated values
     st.session_state.vad_threshold = vad_threshold
     st.session_state.silence_duration = silence_duration
+    st.session_state.vad_backend = vad_backend
 
     # Main interface
     col1, col2 = st.columns([2, 1])
+    with col2:
+        # Filled below, or updated in place while a turn runs
+        log_panel = st.empty()
 
     with col1:
         st.markdown("### 🎙️ Voice Interface")
@@ -147,44 +407,103 @@ def main():
             st.warning("⚠️ Please enter your API keys in the sidebar to get started.")
             st.stop()
 
-        # Recording button
-        if not st.session_state.is_processing:
-            if st.button("🎤 Start Listening", type="primary", use_container_width=True):
-                st.session_state.is_processing = True
-                st.session_state.audio_file = None
+        session = st.session_state.session
+        if session is not None and session.running:
+            # Hands-free: the session worker loops turns; only the fragment polls it
+            if st.button("⏹️ Stop Hands-free", use_container_width=True):
+                session.stop(timeout=5.0)
+                sync_session(session.snapshot())
                 st.rerun()
+            render_hands_free()
         else:
-            st.warning("⏳ Processing... Please wait")
-
-        # Process recording in the "processing" state
-        if st.session_state.is_processing:
-            process_voice_interaction(
-                deepgram_key,
-                groq_key,
-                vad_threshold,
-                silence_duration,
-            )
-            st.session_state.is_processing = False
-            st.rerun()
-
-        # Display conversation
-        render_conversation(
-            st.session_state.transcript,
-            st.session_state.response,
-            st.session_state.audio_file,
-        )
-
-        # Clear conversation button
-        if st.session_state.transcript and not st.session_state.is_processing:
-            if st.button("🔄 Start New Conversation", use_container_width=True):
-                st.session_state.transcript = ""
-                st.session_state.response = ""
-                st.session_state.audio_file = None
+            # Recording button
+            if not st.session_state.is_processing:
+                button_col, hands_free_col = st.columns(2)
+                if button_col.button("🎤 Start Listening", type="primary", use_container_width=True):
+                    st.session_state.is_processing = True
+                    st.session_state.audio_data = None
+                    st.rerun()
+                if hands_free_col.button("🔁 Hands-free Mode", use_container_width=True):
+                    player = (
+                        AudioPlayer(st.session_state.logger, device=get_device_manager())
+                        if config.LOCAL_PLAYBACK else None
+                    )
+                    voice = create_voice_pipeline(
+                        deepgram_key,
+                        groq_key,
+                        vad_threshold,
+                        silence_duration,
+                        vad_backend,
+                        player=player,
+                    )
+                    # Without a local player the browser plays each reply; the
+                    # session waits it out so the microphone does not hear it
+                    session = ConversationSession(
+                        voice, st.session_state.logger, tracer=get_tracer(),
+                        remote_playback=not config.LOCAL_PLAYBACK,
+                    )
+                    session.start()
+                    st.session_state.session = session
+                    st.session_state.audio_data = None
+                    st.rerun()
+            else:
+                st.warning("⏳ Processing... Please wait")
+
+            # Process recording in the "processing" state
+            if st.session_state.is_processing:
+                process_voice_interaction(
+                    deepgram_key,
+                    groq_key,
+                    vad_threshold,
+                    silence_duration,
+                    vad_backend,
+                    log_panel,
+                )
+                st.session_state.is_processing = False
                 st.rerun()
 
+            # Display conversation
+            render_conversation(
+                st.session_state.transcript,
+                st.session_state.response,
+                st.session_state.audio_data,
+            )
+
+            render_latency_caption(st.session_state.latency, st.session_state.response)
+            render_history(list(st.session_state.history)[:-1])
+
+            # Clear conversation button
+            if st.session_state.transcript and not st.session_state.is_processing:
+                if st.button("🔄 Start New Conversation", use_container_width=True):
+                    st.session_state.transcript = ""
+                    st.session_state.response = ""
+                    st.session_state.audio_data = None
+                    st.session_state.memory.clear()
+                    st.session_state.history.clear()
+                    st.rerun()
+
     with col2:
-        # Show last 20 logs
-        render_logs(st.session_state.logs[-20:])
+        with log_panel.container():
+            if session is not None and session.running:
+                render_live_logs()
+            else:
+                render_log_view()
+
+        tracer = get_tracer()
+        render_latency_panel(tracer.summary(), tracer.last_trace)
+        render_device_stats(get_device_manager().stats())
+        render_connection_stats(get_http_client().stats())
+        render_resilience_stats(get_resilience().stats())
+        if config.TTS_CACHE_ENABLED:
+            render_cache_stats(get_tts_cache().stats())
+        if config.RESPONSE_CACHE_ENABLED:
+            render_response_cache_stats(get_response_cache().stats())
+        if config.SPECULATIVE_LLM:
+            render_speculation_stats(get_speculation_stats().stats())
+
+        render_times = st.session_state.render_times
+        render_times.append((time.perf_counter() - started) * 1000)
+        render_timing(list(render_times))
 
 
 if __name__ == "__main__":
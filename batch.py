@@ -0,0 +1,109 @@
+"""
+Batch transcription and synthesis without the UI.
+
+Transcribe a directory of WAV files (or a manifest of paths) to JSON lines,
+or render a file of text prompts to WAV files. Interrupted runs resume:
+items already recorded as "ok" in the output are skipped.
+
+Usage:
+    DEEPGRAM_API_KEY=... python batch.py transcribe calls/ --output transcripts.jsonl
+    DEEPGRAM_API_KEY=... python batch.py synthesize prompts.txt --audio-dir prompts/ --workers 4
+"""
+
+import argparse
+import os
+import config
+from src.utils.logger import Logger
+from src.services.deepgram import DeepgramService
+from src.services.http import HttpClient
+from src.services.resilience import Resilience, format_resilience_stats
+from src.services.tts_cache import TTSCache
+from src.pipeline.batch import BatchRunner, RateLimiter, audio_items, text_items
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Batch transcription and synthesis")
+    parser.add_argument("mode", choices=("transcribe", "synthesize"))
+    parser.add_argument(
+        "source",
+        help="transcribe: directory of WAV files or manifest (paths or JSON lines "
+             "with id/path); synthesize: prompts file (lines or JSON lines with id/text)",
+    )
+    parser.add_argument(
+        "--output", help="Results file, JSON lines (default: <mode>.jsonl, or in --audio-dir)"
+    )
+    parser.add_argument(
+        "--audio-dir", default="batch_audio", help="Where synthesized WAV files are written"
+    )
+    parser.add_argument("--workers", type=int, default=config.BATCH_WORKERS)
+    parser.add_argument(
+        "--rate", type=float, default=config.BATCH_RATE,
+        help="API requests sent per second, retries and hedges included (0 = unlimited)",
+    )
+    parser.add_argument(
+        "--warm-tts-cache", action="store_true",
+        help="Also store synthesized clips in the TTS cache used by the voice agent",
+    )
+    parser.add_argument("--deepgram-url", help="Deepgram REST base URL (e.g. a local mock)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    deepgram_key = os.environ.get("DEEPGRAM_API_KEY", "")
+    if not deepgram_key:
+        raise SystemExit("Set DEEPGRAM_API_KEY")
+
+    # Per-item info records would swamp the progress lines
+    logger = Logger(level="warning")
+    http = HttpClient(pool_size=max(args.workers, config.HTTP_POOL_SIZE))
+    tts_cache = TTSCache() if args.warm_tts_cache else None
+    # Every request sent takes a token, retries and hedges included
+    resilience = Resilience(limiter=RateLimiter(args.rate, burst=args.workers))
+    deepgram = DeepgramService(
+        deepgram_key, logger, base_url=args.deepgram_url, http=http,
+        tts_cache=tts_cache, resilience=resilience,
+    )
+
+    if args.mode == "transcribe":
+        output = args.output or "transcribe.jsonl"
+        items = audio_items(args.source)
+    else:
+        output = args.output or os.path.join(args.audio_dir, "synthesize.jsonl")
+        items = text_items(args.source)
+        os.makedirs(args.audio_dir, exist_ok=True)
+
+    def progress(stats):
+        print(
+            f"{stats['ok']} ok, {stats['failed']} failed, {stats['skipped']} skipped "
+            f"({stats['items_per_second']:.1f} items/s)"
+        )
+
+    runner = BatchRunner(
+        deepgram, logger, output,
+        workers=args.workers, progress_callback=progress,
+    )
+    if args.mode == "transcribe":
+        work = runner.transcribe
+    else:
+        work = lambda item: runner.synthesize(item, args.audio_dir)  # noqa: E731
+
+    try:
+        runner.run(items, work)
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume")
+    finally:
+        logger.close()
+        http.close()
+
+    stats = runner.stats()
+    print(
+        f"Done in {stats['elapsed']:.1f}s: {stats['ok']} ok, {stats['failed']} failed, "
+        f"{stats['skipped']} skipped ({stats['items_per_second']:.1f} items/s) -> {output}"
+    )
+    for line in format_resilience_stats(resilience.stats()):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
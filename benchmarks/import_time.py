@@ -0,0 +1,162 @@
+"""
+Import-time (cold start) benchmark.
+
+Imports each target in a fresh interpreter with `python -X importtime`,
+several times, and reports the median cumulative import time along with
+the heavy third-party packages it pulled in. The core (`src.audio`,
+`src.services`, `src.pipeline`) and the headless entry points must not
+load any of HEAVY_PACKAGES at import time; they are imported on first use.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 10 --baseline bench_results/imports-abc123.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from vad_bench import git_commit  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_PACKAGES = (
+    "numpy", "pyaudio", "requests", "urllib3", "websockets", "tenacity", "streamlit",
+)
+
+# Targets that must import without any heavy package
+CORE_TARGETS = (
+    "config",
+    "src.audio.recorder",
+    "src.audio.player",
+    "src.audio.preprocess",
+    "src.services.deepgram",
+    "src.services.groq",
+    "src.pipeline.voice",
+    "headless",
+    "batch",
+)
+# Measured only: the app needs Streamlit, the server needs websockets
+OTHER_TARGETS = ("server", "app")
+
+# Fastest import time may grow this much (and by at least MIN_REGRESSION_MS) before it is flagged
+REGRESSION_TOLERANCE = 0.25
+MIN_REGRESSION_MS = 5.0
+
+
+def measure(target: str) -> Dict:
+    """Import `target` once in a fresh interpreter; cumulative ms and packages loaded."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{completed.stderr[-2000:]}")
+
+    cumulative_us = 0
+    packages = set()
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # header
+        name = name.strip()
+        packages.add(name.split(".")[0])
+        if name == target:
+            cumulative_us = int(cumulative)
+    return {"ms": cumulative_us / 1000, "packages": packages}
+
+
+def run_target(target: str, repeat: int) -> Dict:
+    runs = [measure(target) for _ in range(repeat)]
+    heavy = sorted(set.union(*(run["packages"] for run in runs)) & set(HEAVY_PACKAGES))
+    times = [run["ms"] for run in runs]
+    return {
+        "target": target,
+        "median_ms": round(statistics.median(times), 1),
+        "min_ms": round(min(times), 1),
+        "heavy": heavy,
+    }
+
+
+def compare(results: List[Dict], baseline_path: str) -> List[str]:
+    """Return regression messages against a previous results file."""
+    with open(baseline_path) as f:
+        baseline = {r["target"]: r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["target"])
+        if not previous:
+            continue
+        # The fastest run is the least disturbed by other load on the machine
+        new, old = result["min_ms"], previous["min_ms"]
+        if new > old * (1 + REGRESSION_TOLERANCE) and new - old >= MIN_REGRESSION_MS:
+            regressions.append(f"{result['target']}: min_ms {old} -> {new}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark")
+    parser.add_argument(
+        "--targets", nargs="+", default=list(CORE_TARGETS + OTHER_TARGETS),
+        help="Modules to import",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument("--output", help="Results JSON path (default: bench_results/imports-<commit>.json)")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    results = []
+    failures = []
+    print(f"{'target':<24}{'median ms':<12}{'min ms':<10}heavy packages")
+    for target in args.targets:
+        try:
+            result = run_target(target, args.repeat)
+        except RuntimeError as e:
+            # e.g. the app without Streamlit installed
+            print(f"{target:<24}skipped: {str(e).splitlines()[-1]}")
+            continue
+        results.append(result)
+        print(
+            f"{target:<24}{result['median_ms']:<12}{result['min_ms']:<10}"
+            f"{', '.join(result['heavy']) or '-'}"
+        )
+        if target in CORE_TARGETS and result["heavy"]:
+            failures.append(f"{target} imports {', '.join(result['heavy'])} eagerly")
+
+    commit = git_commit()
+    output = args.output or os.path.join("bench_results", f"imports-{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(
+            {
+                "commit": commit,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": sys.version.split()[0],
+                "repeat": args.repeat,
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        failures += [f"REGRESSION {message}" for message in compare(results, args.baseline)]
+    for message in failures:
+        print(message)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+End-to-end load generator: N concurrent synthetic sessions through the
+real VoicePipeline, DeepgramService and GroqService, against the mock APIs
+(src/mock/api_server.py) or any compatible endpoint.
+
+Each session replays a synthetic utterance per turn (batch STT, streamed
+LLM, sentence-by-sentence TTS) with its own conversation memory; the
+services, connection pool and resilience layer are shared, as in the
+voice server. Reports throughput and, across all turns:
+
+- turn_ms: end of the utterance -> reply fully synthesized
+- ttft_ms / ttfa_ms: time to first LLM token / first synthesized audio
+- upload_ms: batch STT upload time
+
+Usage:
+    python benchmarks/loadgen.py --sessions 16 --turns 5
+    python benchmarks/loadgen.py --sessions 32 --error-rate 0.05 --drop-rate 0.02
+    python benchmarks/loadgen.py --url http://127.0.0.1:8787 --sessions 8
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server_load import synthesize_utterance  # noqa: E402
+import config  # noqa: E402
+from src.audio.wav import build_wav  # noqa: E402
+from src.mock.api_server import (  # noqa: E402
+    MockApiServer,
+    add_profile_arguments,
+    profile_from_args,
+)
+from src.pipeline.voice import Utterance, VoicePipeline  # noqa: E402
+from src.services.deepgram import DeepgramService  # noqa: E402
+from src.services.groq import GroqService  # noqa: E402
+from src.services.http import HttpClient  # noqa: E402
+from src.services.memory import ConversationMemory  # noqa: E402
+from src.services.resilience import Resilience, format_resilience_stats  # noqa: E402
+from src.services.response_cache import ResponseCache  # noqa: E402
+from src.services.tts_cache import TTSCache  # noqa: E402
+from src.utils.logger import Logger  # noqa: E402
+from src.utils.tracing import percentile  # noqa: E402
+
+METRICS = ("turn_ms", "ttft_ms", "ttfa_ms", "upload_ms")
+
+# Per-turn chatter would swamp the report
+QUIET_LOGGER = Logger(level="error", console=False)
+
+
+def recording(seed: int) -> bytes:
+    """A WAV utterance with silence around it, as the recorder would capture."""
+    speech = synthesize_utterance(seed)
+    lead = bytes(int(config.PRE_ROLL_DURATION * config.SAMPLE_RATE) * 2)
+    tail = bytes(int(config.DEFAULT_SILENCE_DURATION * config.SAMPLE_RATE) * 2)
+    return build_wav([lead, speech.tobytes(), tail])
+
+
+def run_session(
+    index: int,
+    args: argparse.Namespace,
+    deepgram: DeepgramService,
+    groq: GroqService,
+    results: Dict[str, List],
+    lock: threading.Lock,
+):
+    wav = recording(index)
+    memory = ConversationMemory()
+    for _ in range(args.turns):
+        voice = VoicePipeline(None, deepgram, groq, QUIET_LOGGER, memory=memory)
+        start = time.perf_counter()
+        result = voice.run(Utterance(memoryview(wav)))
+        elapsed = time.perf_counter() - start
+
+        with lock:
+            # A reply cut short by a dropped stream still has audio; it failed too
+            if result.pipeline.error or result.llm_error or not result.audio_clips:
+                results["errors"].append(
+                    repr(result.pipeline.error) if result.pipeline.error
+                    else f"llm: {result.llm_error}" if result.llm_error
+                    else "no reply" if result.transcript else "no transcript"
+                )
+                continue
+            results["turn_ms"].append(elapsed * 1000)
+            for metric, value in (
+                ("ttft_ms", result.time_to_first_token),
+                ("ttfa_ms", result.time_to_first_audio),
+                ("upload_ms", result.upload_time),
+            ):
+                if value is not None:
+                    results[metric].append(value * 1000)
+        if args.think_time:
+            time.sleep(args.think_time)
+
+
+def report(results: Dict[str, List], elapsed: float, args: argparse.Namespace):
+    turns = len(results["turn_ms"])
+    print(f"{'metric':<12}{'n':<6}{'p50':<10}{'p95':<10}{'p99':<10}{'max':<10}")
+    for metric in METRICS:
+        values = sorted(results[metric])
+        if not values:
+            print(f"{metric:<12}0")
+            continue
+        print(
+            f"{metric:<12}{len(values):<6}"
+            + "".join(f"{percentile(values, q):<10.1f}" for q in (50, 95, 99))
+            + f"{values[-1]:<10.1f}"
+        )
+    print(
+        f"\n{args.sessions} sessions: {turns} turns in {elapsed:.1f}s "
+        f"({turns / elapsed:.2f} turns/s), {len(results['errors'])} failed"
+    )
+    for error in sorted(set(results["errors"]))[:5]:
+        print(f"  {error} x{results['errors'].count(error)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", help="API base URL (default: start a local mock)")
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent sessions")
+    parser.add_argument("--turns", type=int, default=3, help="Turns per session")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Seconds a session waits between turns")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="Serve repeated questions from an LLM response cache")
+    parser.add_argument("--tts-cache", action="store_true",
+                        help="Serve repeated sentences from an in-memory TTS cache")
+    parser.add_argument("--output", help="Write raw results as JSON to this file")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    mock = None
+    url = args.url
+    if url is None:
+        mock = MockApiServer(profile_from_args(args), seed=args.seed).start()
+        url = mock.url
+
+    http = HttpClient(pool_size=max(args.sessions, config.HTTP_POOL_SIZE))
+    resilience = Resilience()
+    response_cache = ResponseCache() if args.response_cache else None
+    tts_cache = TTSCache(disk_dir=None) if args.tts_cache else None
+    deepgram = DeepgramService(
+        "mock", QUIET_LOGGER, base_url=f"{url}/v1", http=http,
+        tts_cache=tts_cache, resilience=resilience,
+    )
+    groq = GroqService(
+        "mock", QUIET_LOGGER, base_url=f"{url}/openai/v1", http=http,
+        resilience=resilience, response_cache=response_cache,
+    )
+
+    results: Dict[str, List] = {metric: [] for metric in METRICS}
+    results["errors"] = []
+    lock = threading.Lock()
+    sessions = [
+        threading.Thread(
+            target=run_session, args=(i, args, deepgram, groq, results, lock)
+        )
+        for i in range(args.sessions)
+    ]
+
+    start = time.perf_counter()
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+    elapsed = time.perf_counter() - start
+
+    report(results, elapsed, args)
+    for line in format_resilience_stats(resilience.stats()):
+        print(line)
+    print(f"connections: {http.stats()}")
+    if response_cache is not None:
+        print(f"response cache: {response_cache.stats()}")
+    if tts_cache is not None:
+        print(f"tts cache: {tts_cache.stats()}")
+    if mock is not None:
+        print(f"mock: {json.dumps(mock.stats())}")
+        mock.stop()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"elapsed": elapsed, **results}, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Synthetic load test for the voice server (server.py).
+
+Each client connects, streams a spoken-like utterance in real time
+followed by silence, waits for the answer and repeats. Reports, across
+all clients:
+
+- ttfa_ms: end of the utterance -> first audio clip received
+- turn_ms: end of the utterance -> turn result received
+- server_ttft_ms: time to first LLM token, as reported by the server
+
+Usage:
+    python benchmarks/server_load.py --url ws://127.0.0.1:8766 --clients 8 --turns 3
+    python benchmarks/server_load.py --wav samples/question.wav --speed 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed, InvalidStatus
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from src.audio.replay import load_wav  # noqa: E402
+from src.utils.tracing import percentile  # noqa: E402
+
+FRAME_MS = 20
+FRAME_SAMPLES = config.SAMPLE_RATE * FRAME_MS // 1000
+
+
+def synthesize_utterance(seed: int, duration: float = 1.2) -> np.ndarray:
+    """Low noise with a voiced-like burst, as in benchmarks/vad_bench.py."""
+    rng = np.random.default_rng(seed)
+    rate = config.SAMPLE_RATE
+    t = np.arange(int(duration * rate)) / rate
+    pitch = rng.uniform(100, 250)
+    envelope = 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * rng.uniform(2, 5) * t))
+    voiced = np.sin(2 * np.pi * pitch * t) + 0.5 * np.sin(4 * np.pi * pitch * t)
+    samples = voiced * envelope * rng.uniform(1500, 4000) + rng.normal(0, 10, t.size)
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+
+
+async def stream(connection, samples: np.ndarray, speed: float):
+    """Send samples in real-time paced frames."""
+    frame_time = FRAME_MS / 1000 / speed
+    start = time.perf_counter()
+    for i, offset in enumerate(range(0, samples.size, FRAME_SAMPLES)):
+        await connection.send(samples[offset:offset + FRAME_SAMPLES].tobytes())
+        delay = start + (i + 1) * frame_time - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def run_client(
+    url: str,
+    utterance: np.ndarray,
+    turns: int,
+    speed: float,
+    timeout: float,
+    results: Dict[str, List],
+):
+    silence = np.zeros(FRAME_SAMPLES * 5, dtype=np.int16)
+    try:
+        async with connect(url) as connection:
+            ready = json.loads(await connection.recv())
+            assert ready["type"] == "ready"
+
+            for _ in range(turns):
+                await stream(connection, utterance, speed)
+                end = time.perf_counter()
+                first_audio: Optional[float] = None
+
+                # Keep the microphone "open" (silence) until the turn result arrives
+                async def keep_streaming():
+                    while True:
+                        await stream(connection, silence, speed)
+
+                streamer = asyncio.create_task(keep_streaming())
+                try:
+                    async with asyncio.timeout(timeout):
+                        while True:
+                            message = await connection.recv()
+                            if isinstance(message, bytes):
+                                if first_audio is None:
+                                    first_audio = time.perf_counter() - end
+                                continue
+                            data = json.loads(message)
+                            if data["type"] in ("turn", "error") and data.get("scope") != "session":
+                                break
+                            if data["type"] == "error":
+                                raise RuntimeError(data["message"])
+                finally:
+                    streamer.cancel()
+
+                if data["type"] == "error":
+                    # A failed turn; the session carries on with the next one
+                    results["errors"].append(f"turn: {data['message']}")
+                    continue
+                results["turn_ms"].append((time.perf_counter() - end) * 1000)
+                if first_audio is not None:
+                    results["ttfa_ms"].append(first_audio * 1000)
+                if data.get("ttft") is not None:
+                    results["server_ttft_ms"].append(data["ttft"] * 1000)
+
+            await connection.send(json.dumps({"type": "CloseStream"}))
+    except ConnectionClosed as e:
+        # 1013: the server is at its session limit
+        if e.rcvd is not None and e.rcvd.code == 1013:
+            results["rejected"].append(1)
+        else:
+            results["errors"].append(repr(e))
+    except (InvalidStatus, TimeoutError, RuntimeError, AssertionError) as e:
+        results["errors"].append(repr(e))
+
+
+async def run(args) -> Dict[str, List]:
+    results: Dict[str, List] = {
+        "ttfa_ms": [], "turn_ms": [], "server_ttft_ms": [], "errors": [], "rejected": [],
+    }
+    clients = []
+    for i in range(args.clients):
+        utterance = load_wav(args.wav) if args.wav else synthesize_utterance(i)
+        clients.append(
+            run_client(args.url, utterance, args.turns, args.speed, args.timeout, results)
+        )
+        # Stagger connections a little, like real callers
+        await asyncio.sleep(args.ramp / max(args.clients, 1))
+    await asyncio.gather(*clients)
+    return results
+
+
+def report(results: Dict[str, List], elapsed: float):
+    print(f"{'metric':<16}{'n':<6}{'p50':<10}{'p95':<10}{'p99':<10}")
+    for metric in ("ttfa_ms", "turn_ms", "server_ttft_ms"):
+        values = sorted(results[metric])
+        if not values:
+            print(f"{metric:<16}0")
+            continue
+        print(
+            f"{metric:<16}{len(values):<6}"
+            + "".join(f"{percentile(values, q):<10.1f}" for q in (50, 95, 99))
+        )
+    print(
+        f"\n{len(results['turn_ms'])} turns in {elapsed:.1f}s, "
+        f"{len(results['errors'])} errors, {len(results['rejected'])} rejected"
+    )
+    for error in results["errors"][:5]:
+        print(f"  {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", default=f"ws://{config.SERVER_HOST}:{config.SERVER_PORT}")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=2, help="Turns per client")
+    parser.add_argument("--wav", help="Utterance to send (default: synthetic)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Real-time factor")
+    parser.add_argument("--ramp", type=float, default=1.0, help="Seconds to connect all clients")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-turn timeout")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = asyncio.run(run(args))
+    report(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+Offline VAD and endpointing benchmark.
+
+Replays a corpus of WAV files through `AudioRecorder.record_with_vad` (via
+ReplaySource, faster than real time) for each VAD setting and reports:
+
+- cpu_us_per_chunk: VAD CPU time per 64 ms chunk
+- onset_latency_ms: speech start -> speech trigger
+- eos_latency_ms: speech end -> recording stopped (endpoint)
+- clipped_pct: labelled speech not included in the captured audio
+- false_triggers: utterances capturing no labelled speech
+- early_onsets: utterances triggered well before the speech they captured
+- missed_segments: labelled segments no utterance captured
+
+Each `name.wav` may have a `name.json` sidecar with speech segments in
+seconds: {"segments": [[0.8, 2.1], [3.0, 4.2]]}. Files without labels
+count towards CPU time only.
+
+Usage:
+    python benchmarks/vad_bench.py --corpus path/to/wavs
+    python benchmarks/vad_bench.py --synthetic 20 --baseline bench_results/vad-abc123.json
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from src.audio.recorder import AudioRecorder  # noqa: E402
+from src.audio.replay import ReplaySource, load_wav  # noqa: E402
+from src.audio.vad import VAD, AdaptiveEnergyVAD, EnergyVAD, WebRTCVAD  # noqa: E402
+from src.utils.logger import Logger  # noqa: E402
+
+SETTINGS = {
+    "energy-40": lambda: EnergyVAD(40),
+    "energy-80": lambda: EnergyVAD(80),
+    "energy-120": lambda: EnergyVAD(120),
+    "webrtc-1": lambda: WebRTCVAD(aggressiveness=1),
+    "webrtc-2": lambda: WebRTCVAD(aggressiveness=2),
+    "webrtc-3": lambda: WebRTCVAD(aggressiveness=3),
+    "adaptive": lambda: AdaptiveEnergyVAD(),
+}
+
+# Seconds a trigger may precede the labelled speech start and still count as
+# its onset (labels and chunk boundaries are not sample-exact)
+ONSET_SLACK = 0.1
+
+# Recorder chatter would swamp the report
+QUIET_LOGGER = Logger(level="error", console=False)
+
+# Metrics where a higher value is worse, with the relative slack allowed
+# before a comparison against a baseline counts as a regression
+REGRESSION_TOLERANCE = {
+    "cpu_us_per_chunk": 0.50,
+    "onset_latency_ms": 0.10,
+    "eos_latency_ms": 0.10,
+    "clipped_pct": 0.10,
+    "false_triggers": 0.0,
+    "early_onsets": 0.0,
+    "missed_segments": 0.0,
+}
+
+
+class TimedVAD(VAD):
+    """Wraps a VAD and accumulates the thread CPU time it spends."""
+
+    def __init__(self, inner: VAD):
+        super().__init__()
+        self.inner = inner
+        self.cpu_ns = 0
+        self.chunks = 0
+
+    def is_speech(self, chunk: bytes) -> bool:
+        start = time.thread_time_ns()
+        speech = self.inner.is_speech(chunk)
+        self.cpu_ns += time.thread_time_ns() - start
+        self.chunks += 1
+        self.level = self.inner.level
+        return speech
+
+    def reset(self):
+        self.inner.reset()
+
+
+# ---------- Corpus ----------
+
+def synthesize_corpus(directory: str, count: int, seed: int = 0) -> List[str]:
+    """Write `count` labelled WAVs of noise with voiced-like bursts."""
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    rate = config.SAMPLE_RATE
+    paths = []
+
+    for i in range(count):
+        duration = rng.uniform(4.0, 8.0)
+        samples = rng.normal(0, rng.uniform(5, 40), int(duration * rate))
+        segments = []
+        start = rng.uniform(0.5, 1.5)
+        while start + 0.6 < duration - 2.0:
+            length = rng.uniform(0.5, 1.8)
+            end = min(start + length, duration - 2.0)
+            t = np.arange(int((end - start) * rate)) / rate
+            pitch = rng.uniform(100, 250)
+            envelope = 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * rng.uniform(2, 5) * t))
+            voiced = np.sin(2 * np.pi * pitch * t) + 0.5 * np.sin(4 * np.pi * pitch * t)
+            offset = int(start * rate)
+            samples[offset:offset + t.size] += voiced * envelope * rng.uniform(800, 4000)
+            segments.append([round(start, 3), round(end, 3)])
+            start = end + rng.uniform(2.0, 3.0)
+
+        path = os.path.join(directory, f"synthetic-{i:03d}.wav")
+        with wave.open(path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(rate)
+            wf.writeframes(np.clip(samples, -32768, 32767).astype(np.int16).tobytes())
+        with open(path[:-4] + ".json", "w") as f:
+            json.dump({"segments": segments}, f)
+        paths.append(path)
+
+    return paths
+
+
+def load_labels(path: str):
+    label_path = os.path.splitext(path)[0] + ".json"
+    if not os.path.exists(label_path):
+        return None
+    with open(label_path) as f:
+        return [tuple(segment) for segment in json.load(f)["segments"]]
+
+
+# ---------- Running ----------
+
+def replay_file(samples: np.ndarray, vad: TimedVAD, silence_duration: float
+                ) -> List[Tuple[float, float, float]]:
+    """
+    Replay one file, recording utterances until the audio runs out.
+    Returns (trigger_s, capture_start_s, capture_end_s) per utterance.
+    """
+    source = ReplaySource(samples)
+    recorder = AudioRecorder(
+        QUIET_LOGGER, silence_duration=silence_duration, vad=vad, audio=source
+    )
+    rate = config.SAMPLE_RATE
+    utterances = []
+
+    while not source.exhausted:
+        trigger = []
+
+        def on_status(status: str):
+            if status == "speaking":
+                trigger.append(source.position / rate)
+
+        audio = recorder.record_with_vad(on_status)
+
+        if audio and trigger:
+            end = min(source.position, samples.size) / rate
+            captured = (memoryview(audio).nbytes - 44) / 2 / rate
+            utterances.append((trigger[0], end - captured, end))
+
+    recorder.cleanup()
+    return utterances
+
+
+def score_file(labels, utterances, duration: float) -> Dict:
+    """
+    Match utterances against labelled segments by overlap of the captured
+    audio. A trigger more than ONSET_SLACK before the first segment an
+    utterance covers is an early onset (e.g. set off by noise): the segment
+    counts as detected and the endpoint is scored, but no onset latency is.
+    """
+    onsets, endpoints = [], []
+    false_triggers = early_onsets = 0
+    detected = set()
+
+    for trigger, cap_start, cap_end in utterances:
+        covered = [
+            i for i, (start, stop) in enumerate(labels)
+            if min(stop, cap_end) > max(start, cap_start)
+        ]
+        if not covered:
+            false_triggers += 1
+            continue
+        first = labels[covered[0]]
+        if covered[0] not in detected:
+            if trigger < first[0] - ONSET_SLACK:
+                early_onsets += 1
+            else:
+                onsets.append(trigger - first[0])
+        detected.update(covered)
+        # Endpoint relative to the last segment this utterance covered
+        endpoints.append(cap_end - labels[covered[-1]][1])
+
+    speech = sum(stop - start for start, stop in labels)
+    captured = 0.0
+    for start, stop in labels:
+        for _, cap_start, cap_end in utterances:
+            captured += max(0.0, min(stop, cap_end) - max(start, cap_start))
+    clipped = max(0.0, speech - captured)
+
+    return {
+        "onsets": onsets,
+        "endpoints": endpoints,
+        "false_triggers": false_triggers,
+        "early_onsets": early_onsets,
+        "missed_segments": len(labels) - len(detected),
+        "speech_s": speech,
+        "clipped_s": clipped,
+        "duration_s": duration,
+    }
+
+
+def run_setting(name: str, files: List[str], silence_duration: float) -> Dict:
+    vad = TimedVAD(SETTINGS[name]())
+    onsets, endpoints = [], []
+    false_triggers = early_onsets = missed = 0
+    speech = clipped = 0.0
+
+    for path in files:
+        samples = load_wav(path)
+        labels = load_labels(path)
+        utterances = replay_file(samples, vad, silence_duration)
+        if labels is None:
+            continue
+        score = score_file(labels, utterances, samples.size / config.SAMPLE_RATE)
+        onsets += score["onsets"]
+        endpoints += score["endpoints"]
+        false_triggers += score["false_triggers"]
+        early_onsets += score["early_onsets"]
+        missed += score["missed_segments"]
+        speech += score["speech_s"]
+        clipped += score["clipped_s"]
+
+    def ms(values, q):
+        return round(float(np.percentile(values, q)) * 1000, 1) if values else None
+
+    return {
+        "setting": name,
+        "files": len(files),
+        "chunks": vad.chunks,
+        "cpu_us_per_chunk": round(vad.cpu_ns / max(vad.chunks, 1) / 1000, 2),
+        "onset_latency_ms": ms(onsets, 50),
+        "onset_latency_p95_ms": ms(onsets, 95),
+        "eos_latency_ms": ms(endpoints, 50),
+        "eos_latency_p95_ms": ms(endpoints, 95),
+        "clipped_pct": round(100 * clipped / speech, 2) if speech else None,
+        "false_triggers": false_triggers,
+        "early_onsets": early_onsets,
+        "missed_segments": missed,
+    }
+
+
+# ---------- Reporting ----------
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(results: List[Dict], baseline_path: str) -> List[str]:
+    """Return regression messages against a previous results file."""
+    with open(baseline_path) as f:
+        baseline = {r["setting"]: r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["setting"])
+        if not previous:
+            continue
+        for metric, tolerance in REGRESSION_TOLERANCE.items():
+            new, old = result.get(metric), previous.get(metric)
+            if new is None or old is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > 1e-9:
+                regressions.append(
+                    f"{result['setting']}: {metric} {old} -> {new}"
+                )
+    return regressions
+
+
+def print_table(results: List[Dict]):
+    columns = [
+        ("setting", 12), ("cpu_us_per_chunk", 10), ("onset_latency_ms", 10),
+        ("eos_latency_ms", 10), ("clipped_pct", 9), ("false_triggers", 7),
+        ("early_onsets", 7), ("missed_segments", 7),
+    ]
+    headers = [
+        "setting", "cpu us", "onset ms", "eos ms", "clip %", "false", "early", "missed",
+    ]
+    print("  ".join(h.ljust(w) for h, (_, w) in zip(headers, columns)))
+    for result in results:
+        print("  ".join(str(result[key]).ljust(w) for key, w in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline VAD benchmark")
+    parser.add_argument("--corpus", help="Directory of WAV files (+ .json labels)")
+    parser.add_argument(
+        "--synthetic", type=int, default=0,
+        help="Generate N labelled synthetic files (into --corpus or a temp dir)",
+    )
+    parser.add_argument(
+        "--settings", nargs="+", choices=sorted(SETTINGS), default=sorted(SETTINGS)
+    )
+    parser.add_argument(
+        "--silence-duration", type=float, default=config.DEFAULT_SILENCE_DURATION
+    )
+    parser.add_argument("--output", help="Results JSON path (default: bench_results/vad-<commit>.json)")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    if not args.corpus and not args.synthetic:
+        parser.error("pass --corpus and/or --synthetic")
+
+    # A synthetic corpus without --corpus is generated into a temp dir,
+    # removed once the settings have run
+    temp_dir = None if args.corpus else tempfile.mkdtemp(prefix="vad-corpus-")
+    corpus = args.corpus or temp_dir
+    try:
+        if args.synthetic:
+            synthesize_corpus(corpus, args.synthetic)
+        files = sorted(glob.glob(os.path.join(corpus, "*.wav")))
+        if not files:
+            parser.error(f"no WAV files in {corpus}")
+        results = [
+            run_setting(name, files, args.silence_duration) for name in args.settings
+        ]
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    print_table(results)
+
+    commit = git_commit()
+    output = args.output or os.path.join("bench_results", f"vad-{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(
+            {
+                "commit": commit,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "corpus": (
+                    f"synthetic:{args.synthetic}" if temp_dir else os.path.abspath(corpus)
+                ),
+                "silence_duration": args.silence_duration,
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,21 +8,160 @@ AUDIO_FORMAT = 'paInt16'
 CHANNELS = 1
 SAMPLE_RATE = 16000
 
+# Capture thread
+CAPTURE_CALLBACK_MODE = True  # PortAudio callback feeds a queue read by the VAD loop
+CAPTURE_QUEUE_CHUNKS = 32  # ~2 s of audio before chunks are dropped
+
+# Capture buffer
+PRE_ROLL_DURATION = 0.3  # seconds kept from before the speech trigger
+MAX_UTTERANCE_DURATION = 30.0  # seconds; recording stops when reached
+NO_SPEECH_TIMEOUT = 10.0  # seconds to wait for speech before giving up
+
 # VAD configuration
+VAD_BACKENDS = ['energy', 'webrtc', 'adaptive']
+DEFAULT_VAD_BACKEND = 'energy'
+
+# Energy backend: mean absolute amplitude threshold
 DEFAULT_VAD_THRESHOLD = 80
 MIN_VAD_THRESHOLD = 40
 MAX_VAD_THRESHOLD = 150
 
+# webrtcvad backend
+WEBRTC_VAD_AGGRESSIVENESS = 2  # 0-3
+WEBRTC_VAD_FRAME_MS = 30  # 10, 20 or 30
+
+# Adaptive backend: speech = level above the tracked noise floor
+ADAPTIVE_VAD_RATIO = 3.0
+ADAPTIVE_VAD_MARGIN = 20.0
+ADAPTIVE_VAD_ADAPT_RATE = 0.05
+
 DEFAULT_SILENCE_DURATION = 1.5  # seconds
 MIN_SILENCE_DURATION = 0.5
 MAX_SILENCE_DURATION = 3.0
 
 # API configuration
+DEEPGRAM_BASE_URL = 'https://api.deepgram.com/v1'
+DEEPGRAM_LIVE_URL = 'wss://api.deepgram.com/v1/listen'
+GROQ_BASE_URL = 'https://api.groq.com/openai/v1'
+
 DEEPGRAM_STT_MODEL = 'nova-2'
 DEEPGRAM_TTS_MODEL = 'aura-asteria-en'
+DEEPGRAM_TTS_ENCODING = 'linear16'
 GROQ_MODEL = 'llama-3.3-70b-versatile'
 
+# HTTP connection pool
+HTTP_POOL_SIZE = 10  # pooled connections per host
+HTTP_KEEPALIVE_IDLE = 30  # seconds idle before TCP keep-alive probes
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_READ_TIMEOUT = 30.0
+
+# Resilience (retries, hedged requests, circuit breakers)
+RETRY_ATTEMPTS = 3  # attempts per idempotent call, including the first
+RETRY_BACKOFF = 0.2  # seconds; base of the jittered exponential backoff
+RETRY_BACKOFF_MAX = 2.0
+HEDGE_ENABLED = True  # send a second STT/TTS request when the first is slow
+HEDGE_LLM = False  # also hedge non-streaming LLM calls (pays twice for the tokens)
+HEDGE_PERCENTILE = 95  # hedge once a request outlasts this latency percentile
+HEDGE_MIN_SAMPLES = 20  # latencies observed before hedging starts
+LATENCY_WINDOW = 200  # latencies kept per endpoint
+BREAKER_FAILURES = 5  # consecutive failures that open an endpoint's circuit
+BREAKER_RESET = 30.0  # seconds an open circuit waits before a trial request
+
+# TTS cache
+TTS_CACHE_ENABLED = True
+TTS_CACHE_MEMORY_BYTES = 32 * 1024 * 1024
+TTS_CACHE_DIR = '.cache/tts'  # None disables the disk tier
+TTS_CACHE_DISK_BYTES = 256 * 1024 * 1024
+TTS_CACHE_TTL = 7 * 24 * 3600  # seconds
+
+# Audio artifacts (files handed out by AudioPlayer.save_audio)
+ARTIFACT_DIR = None  # None = private temp dir removed at exit
+ARTIFACT_MAX_BYTES = 64 * 1024 * 1024
+ARTIFACT_MAX_FILES = 50
+ARTIFACT_MAX_AGE = 3600  # seconds
+
+# Streaming STT configuration
+STREAMING_STT = True  # push audio over the live socket while recording
+LIVE_FINALIZE_TIMEOUT = 5.0  # seconds to wait for the final transcript
+LIVE_KEEPALIVE_INTERVAL = 4.0  # seconds without audio before a KeepAlive (Deepgram closes idle streams after ~10 s)
+
+# Batch STT upload (when the recording is uploaded rather than streamed)
+UPLOAD_TRIM_SILENCE = True  # cut leading/trailing silence before uploading
+UPLOAD_TRIM_PADDING = 0.2  # seconds of silence kept around the speech
+UPLOAD_TRIM_FRAME_MS = 10
+UPLOAD_ENCODING = 'linear16'  # 'linear16' (WAV) or 'mulaw' (raw 8-bit, half the bytes)
+UPLOAD_SAMPLE_RATE = 16000  # 8000 halves the bytes again; must divide SAMPLE_RATE
+
+# Pipeline configuration
+PIPELINE_QUEUE_SIZE = 4  # max sentences waiting for TTS (backpressure)
+PIPELINE_STAGE_TIMEOUTS = {  # seconds per item
+    'capture': 60.0,
+    'transcribe': 15.0,
+    'respond': 30.0,  # to the first sentence and between sentences
+    'synthesize': 15.0,
+    'play': 60.0,
+}
+
+# Hands-free mode
+CONTINUOUS_IDLE_TURNS = 3  # end the session after this many turns without speech
+CONTINUOUS_REFRESH = 0.5  # seconds between UI polls of the session state
+LOCAL_PLAYBACK = True  # play replies on the local output device (needed to interrupt them)
+REMOTE_PLAYBACK_MARGIN = 1.0  # extra seconds hands-free waits for a reply played by the browser
+BARGE_IN_ENABLED = True  # keep listening while answering; speech interrupts the reply
+# While a reply plays (no echo cancellation), speech must exceed all of these to interrupt it
+BARGE_IN_MIN_LEVEL = 160  # mean absolute amplitude (twice DEFAULT_VAD_THRESHOLD)
+BARGE_IN_ECHO_RATIO = 2.0  # times the echo level measured during playback
+BARGE_IN_MIN_CHUNKS = 4  # consecutive chunks (~256 ms)
+BARGE_IN_ECHO_ADAPT_RATE = 0.2
+
+# UI rendering (app.py)
+UI_LOG_LINES = 50  # log records shown in the logs panel
+UI_LOG_REFRESH = 0.25  # seconds between logs panel updates while a turn runs
+UI_HISTORY_TURNS = 20  # earlier turns kept in the conversation view
+UI_RENDER_WINDOW = 50  # reruns kept for the render time percentiles
+
+# Voice server (server.py)
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8766
+SERVER_MAX_SESSIONS = 32  # further connections are refused (close code 1013)
+SERVER_WORKERS = 32  # shared threads running the pipeline stages of all sessions
+SERVER_SEND_QUEUE = 8  # messages/clips buffered per session before synthesis stalls
+SERVER_RECV_QUEUE = 16  # frames buffered per session before the socket stops being read
+
+# Batch transcription/synthesis (batch.py)
+BATCH_WORKERS = 8  # files or prompts processed concurrently
+BATCH_RATE = 10.0  # API requests sent per second across workers, retries included (0 = unlimited)
+BATCH_PROGRESS_EVERY = 25  # items between progress lines
+
+# Logging
+LOG_LEVEL = 'info'  # 'debug' adds per-chunk VAD output
+LOG_CAPACITY = 500  # recent records kept in memory
+LOG_QUEUE_SIZE = 1000  # records waiting for the handler thread; extra are dropped
+LOG_HANDLER_IDLE = 5.0  # seconds without records before the shared handler thread exits
+LOG_CONSOLE = True
+
+# Latency tracing
+TRACE_WINDOW = 500  # interactions kept per span for percentiles
+TRACE_EXPORT_PATH = 'traces.jsonl'  # None disables JSON lines export
+
 # LLM configuration
 LLM_MAX_TOKENS = 150
 LLM_TEMPERATURE = 0.7
+STREAMING_LLM = True  # stream tokens and synthesize sentence by sentence
+SPECULATIVE_LLM = True  # start the LLM request on a stable interim transcript
+SPECULATION_STABLE_TIME = 0.3  # seconds the interim transcript must stay unchanged
+SPECULATION_MIN_WORDS = 2
+SPECULATION_MAX_ATTEMPTS = 2  # speculative requests per utterance
+MEMORY_TOKEN_BUDGET = 1200  # max (estimated) tokens of conversation history per request
+MEMORY_SUMMARY_TOKENS = 120  # summary of trimmed turns (0 = drop them silently)
+
+# LLM response cache (replies to frequent questions skip the Groq round trip)
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_BYTES = 4 * 1024 * 1024
+RESPONSE_CACHE_TTL = 3600  # seconds
+RESPONSE_CACHE_CONTEXT_TURNS = 1  # previous exchanges that must match too (0 = question only)
+RESPONSE_CACHE_CONTEXT_WORDS = (  # questions with these words depend on the conversation
+    'it', 'that', 'this', 'these', 'those', 'they', 'them', 'he', 'she', 'him', 'her',
+    'again', 'more', 'else', 'previous', 'last', 'earlier', 'above', 'said',
+)
 SYSTEM_PROMPT = 'You are a helpful voice assistant. Keep responses concise and conversational, under 2-3 sentences.'
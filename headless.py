@@ -0,0 +1,117 @@
+"""
+Headless voice agent: runs voice turns in the terminal without Streamlit.
+
+Usage:
+    DEEPGRAM_API_KEY=... GROQ_API_KEY=... python headless.py --turns 3
+"""
+
+import argparse
+import os
+import config
+from src.utils.lazy import preload
+from src.utils.logger import Logger
+from src.utils.tracing import Tracer
+from src.audio.recorder import AudioRecorder
+from src.audio.player import AudioPlayer, merge_wav_clips
+from src.services.deepgram import DeepgramService
+from src.services.groq import GroqService
+from src.services.memory import ConversationMemory
+from src.services.resilience import format_resilience_stats, get_resilience
+from src.services.response_cache import ResponseCache
+from src.services.tts_cache import TTSCache
+from src.pipeline.speculation import SpeculationStats
+from src.pipeline.voice import VoicePipeline
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Headless Voice AI Agent")
+    parser.add_argument(
+        "--turns", type=int, default=1, help="Number of turns (0 = until Ctrl+C)"
+    )
+    parser.add_argument(
+        "--vad-threshold", type=int, default=config.DEFAULT_VAD_THRESHOLD
+    )
+    parser.add_argument(
+        "--silence-duration", type=float, default=config.DEFAULT_SILENCE_DURATION
+    )
+    parser.add_argument(
+        "--vad", choices=config.VAD_BACKENDS, default=config.DEFAULT_VAD_BACKEND
+    )
+    return parser.parse_args()
+
+
+def main():
+    # Load what the first turn needs (live STT socket, retries) in the background
+    preload()
+    args = parse_args()
+    deepgram_key = os.environ.get("DEEPGRAM_API_KEY", "")
+    groq_key = os.environ.get("GROQ_API_KEY", "")
+    if not deepgram_key or not groq_key:
+        raise SystemExit("Set DEEPGRAM_API_KEY and GROQ_API_KEY")
+
+    logger = Logger()
+    recorder = AudioRecorder(
+        logger, args.vad_threshold, args.silence_duration, vad_backend=args.vad
+    )
+    player = AudioPlayer(logger)
+    tts_cache = TTSCache() if config.TTS_CACHE_ENABLED else None
+    deepgram = DeepgramService(deepgram_key, logger, tts_cache=tts_cache)
+    response_cache = ResponseCache() if config.RESPONSE_CACHE_ENABLED else None
+    groq = GroqService(groq_key, logger, response_cache=response_cache)
+    tracer = Tracer()
+    memory = ConversationMemory()
+    speculation = SpeculationStats() if config.SPECULATIVE_LLM else None
+
+    turn = 0
+    try:
+        while args.turns == 0 or turn < args.turns:
+            turn += 1
+            voice = VoicePipeline(
+                recorder, deepgram, groq, logger,
+                status_callback=lambda status: print(f"[{status}]"),
+                memory=memory,
+                speculation=speculation,
+            )
+            result = voice.run()
+
+            if result.transcript:
+                print(f"You: {result.transcript}")
+            if result.upload_bytes is not None:
+                print(
+                    f"Upload: {result.upload_bytes / 1024:.1f} KB "
+                    f"(saved {result.upload_saved_bytes / 1024:.1f} KB)"
+                )
+            if result.response:
+                print(f"AI:  {result.response}  (prompt ~{result.prompt_tokens} tokens)")
+            if result.audio_clips:
+                with result.trace.span("save"):
+                    path = player.save_audio(merge_wav_clips(result.audio_clips))
+                print(f"Audio: {path}")
+            if result.trace.spans:
+                tracer.finish(result.trace)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recorder.cleanup()
+        recorder.device.close()
+        logger.close()
+
+    if speculation is not None:
+        stats = speculation.stats()
+        print(
+            f"speculation    hit rate {stats['hit_rate']:.0%} "
+            f"({stats['hits']}/{stats['launched']}), wasted tokens "
+            f"{stats['wasted_prompt_tokens']} prompt + "
+            f"{stats['wasted_completion_tokens']} output"
+        )
+    for line in format_resilience_stats(get_resilience().stats()):
+        print(line)
+    for row in tracer.summary():
+        print(
+            f"{row['span']:<14} n={row['count']:<4} p50={row['p50_ms']:>8.1f}ms "
+            f"p95={row['p95_ms']:>8.1f}ms p99={row['p99_ms']:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Headless multi-session voice server: clients stream PCM over WebSocket.
+
+Usage:
+    DEEPGRAM_API_KEY=... GROQ_API_KEY=... python server.py --port 8766
+
+Load test it with synthetic clients:
+    python benchmarks/server_load.py --url ws://127.0.0.1:8766 --clients 8
+"""
+
+import argparse
+import asyncio
+import os
+import config
+from src.utils.lazy import preload
+from src.utils.logger import Logger
+from src.utils.tracing import Tracer
+from src.services.deepgram import DeepgramService
+from src.services.groq import GroqService
+from src.services.resilience import format_resilience_stats, get_resilience
+from src.services.response_cache import ResponseCache
+from src.services.tts_cache import TTSCache
+from src.server.voice_server import VoiceServer
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Multi-session voice server")
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument(
+        "--max-sessions", type=int, default=config.SERVER_MAX_SESSIONS
+    )
+    parser.add_argument(
+        "--workers", type=int, default=config.SERVER_WORKERS,
+        help="Threads running pipeline stages for all sessions",
+    )
+    parser.add_argument(
+        "--vad-threshold", type=int, default=config.DEFAULT_VAD_THRESHOLD
+    )
+    parser.add_argument(
+        "--silence-duration", type=float, default=config.DEFAULT_SILENCE_DURATION
+    )
+    parser.add_argument(
+        "--vad", choices=config.VAD_BACKENDS, default=config.DEFAULT_VAD_BACKEND
+    )
+    parser.add_argument(
+        "--deepgram-url", help="Deepgram REST base URL (e.g. a local mock)"
+    )
+    parser.add_argument("--groq-url", help="Groq API base URL (e.g. a local mock)")
+    return parser.parse_args()
+
+
+def main():
+    preload()
+    args = parse_args()
+    deepgram_key = os.environ.get("DEEPGRAM_API_KEY", "")
+    groq_key = os.environ.get("GROQ_API_KEY", "")
+    if not deepgram_key or not groq_key:
+        raise SystemExit("Set DEEPGRAM_API_KEY and GROQ_API_KEY")
+
+    logger = Logger()
+    tts_cache = TTSCache() if config.TTS_CACHE_ENABLED else None
+    deepgram = DeepgramService(
+        deepgram_key, logger, base_url=args.deepgram_url, tts_cache=tts_cache
+    )
+    response_cache = ResponseCache() if config.RESPONSE_CACHE_ENABLED else None
+    groq = GroqService(
+        groq_key, logger, base_url=args.groq_url, response_cache=response_cache
+    )
+    tracer = Tracer()
+    server = VoiceServer(
+        deepgram,
+        groq,
+        logger,
+        tracer=tracer,
+        max_sessions=args.max_sessions,
+        vad_backend=args.vad,
+        vad_threshold=args.vad_threshold,
+        silence_duration=args.silence_duration,
+        workers=args.workers,
+    )
+
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.close()
+
+    print(server.stats())
+    for line in format_resilience_stats(get_resilience().stats()):
+        print(line)
+    for row in tracer.summary():
+        print(
+            f"{row['span']:<14} n={row['count']:<4} p50={row['p50_ms']:>8.1f}ms "
+            f"p95={row['p95_ms']:>8.1f}ms p99={row['p99_ms']:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
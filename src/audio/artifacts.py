@@ -0,0 +1,101 @@
+"""
+Managed on-disk store for audio artifacts
+"""
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from typing import Optional
+import config
+
+
+class ArtifactStore:
+    """
+    Bounded directory of audio files for consumers that need a path.
+    Oldest files are deleted once the store exceeds its size, count or age
+    limits; a private temporary directory is removed on `close` (run at exit).
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = config.ARTIFACT_DIR,
+        max_bytes: int = config.ARTIFACT_MAX_BYTES,
+        max_files: int = config.ARTIFACT_MAX_FILES,
+        max_age: float = config.ARTIFACT_MAX_AGE,
+    ):
+        """
+        :param directory: Directory holding the artifacts (None = private temp dir)
+        :param max_bytes: Total size budget
+        :param max_files: Max number of files kept
+        :param max_age: Max age (seconds) of a file
+        """
+        self.temporary = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="voice-agent-")
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.cleanup()
+        atexit.register(self.close)
+
+    def put(self, data: bytes, suffix: str = ".wav") -> str:
+        """Write data to a new artifact and return its path."""
+        path = os.path.join(self.directory, f"{uuid.uuid4().hex}{suffix}")
+        with self._lock:
+            with open(path, "wb") as f:
+                f.write(data)
+            self._evict(keep=path)
+        return path
+
+    def cleanup(self):
+        """Apply the size, count and age limits now."""
+        with self._lock:
+            self._evict()
+
+    def _evict(self, keep: Optional[str] = None):
+        now = time.time()
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        total = sum(entry.stat().st_size for entry in entries)
+        count = len(entries)
+
+        for entry in entries:
+            if entry.path == keep:
+                continue
+            expired = now - entry.stat().st_mtime > self.max_age
+            if not expired and total <= self.max_bytes and count <= self.max_files:
+                break
+            try:
+                size = entry.stat().st_size
+                os.unlink(entry.path)
+                total -= size
+                count -= 1
+            except OSError:
+                pass
+
+    def close(self):
+        """Remove the store directory if it is private, else apply limits."""
+        if self.temporary:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        elif os.path.isdir(self.directory):
+            self.cleanup()
+
+
+_default_store: Optional[ArtifactStore] = None
+_default_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Return the process-wide default ArtifactStore."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ArtifactStore()
+        return _default_store
@@ -0,0 +1,116 @@
+"""
+Preallocated capture buffer with pre-roll
+"""
+from __future__ import annotations
+from .wav import wav_header
+from ..utils.lazy import lazy_import
+import config
+
+np = lazy_import("numpy")
+
+HEADER_SIZE = 44
+
+
+class CaptureBuffer:
+    """
+    Fixed-size int16 capture storage.
+
+    Before speech is detected, chunks go into a pre-roll ring so the start
+    of the first word is not clipped. On `start`, the ring is copied to the
+    head of the utterance region and subsequent chunks are appended after it.
+    The utterance region sits right after space reserved for a WAV header,
+    so the finished recording is handed out as a zero-copy memoryview.
+    """
+
+    def __init__(
+        self,
+        pre_roll: float = config.PRE_ROLL_DURATION,
+        max_duration: float = config.MAX_UTTERANCE_DURATION,
+        sample_rate: int = config.SAMPLE_RATE,
+    ):
+        """
+        :param pre_roll: Seconds of audio kept from before the speech trigger
+        :param max_duration: Max utterance length in seconds (including pre-roll)
+        :param sample_rate: Samples per second
+        """
+        self.sample_rate = sample_rate
+        self.ring = np.zeros(int(pre_roll * sample_rate), dtype=np.int16)
+        self.ring_pos = 0
+        self.ring_filled = 0
+
+        capacity = int(max_duration * sample_rate)
+        self.raw = bytearray(HEADER_SIZE + capacity * 2)
+        self.samples = np.frombuffer(self.raw, dtype=np.int16, offset=HEADER_SIZE)
+        self.length = 0
+        self.started = False
+
+    @property
+    def capacity(self) -> int:
+        return self.samples.size
+
+    @property
+    def full(self) -> bool:
+        return self.length >= self.capacity
+
+    def reset(self):
+        """Forget any captured audio (the memory is reused)."""
+        self.ring_pos = 0
+        self.ring_filled = 0
+        self.length = 0
+        self.started = False
+
+    def push_preroll(self, chunk: bytes):
+        """Write a pre-trigger chunk into the pre-roll ring."""
+        size = self.ring.size
+        if size == 0:
+            return
+        data = np.frombuffer(chunk, dtype=np.int16)[-size:]
+        n = data.size
+
+        first = min(n, size - self.ring_pos)
+        self.ring[self.ring_pos:self.ring_pos + first] = data[:first]
+        self.ring[:n - first] = data[first:]
+        self.ring_pos = (self.ring_pos + n) % size
+        self.ring_filled = min(size, self.ring_filled + n)
+
+    def start(self) -> np.ndarray:
+        """
+        Mark the speech trigger: move the pre-roll into the utterance.
+        Returns a view of the pre-roll samples now at the head of the utterance.
+        """
+        n = min(self.ring_filled, self.capacity)
+        oldest = (self.ring_pos - n) % self.ring.size if self.ring.size else 0
+        first = min(n, self.ring.size - oldest)
+
+        self.samples[:first] = self.ring[oldest:oldest + first]
+        self.samples[first:n] = self.ring[:n - first]
+        self.length = n
+        self.started = True
+        return self.samples[:n]
+
+    def append(self, chunk: bytes) -> np.ndarray:
+        """
+        Append a chunk to the utterance, truncating at capacity.
+        Returns a view of the samples actually written.
+        """
+        data = np.frombuffer(chunk, dtype=np.int16)
+        n = min(data.size, self.capacity - self.length)
+        start = self.length
+        self.samples[start:start + n] = data[:n]
+        self.length += n
+        return self.samples[start:start + n]
+
+    def view(self) -> np.ndarray:
+        """Zero-copy view of the captured samples."""
+        return self.samples[:self.length]
+
+    def wav(self, channels: int = config.CHANNELS) -> memoryview:
+        """
+        Zero-copy WAV view of the utterance (header written in place).
+        Valid until the buffer is reset or reused.
+        """
+        data_size = self.length * 2
+        self.raw[:HEADER_SIZE] = wav_header(
+            data_size, self.sample_rate, channels, 2
+        )
+        return memoryview(self.raw)[:HEADER_SIZE + data_size]
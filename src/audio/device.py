@@ -0,0 +1,223 @@
+"""
+Long-lived audio device manager
+"""
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+from ..utils.lazy import lazy_import
+from ..utils.tracing import record_span
+import config
+
+# PortAudio is only loaded once a device is opened
+pyaudio = lazy_import("pyaudio")
+
+
+class CaptureQueue:
+    """
+    Consumer side of a callback-mode input stream. Offers the blocking
+    `read` interface of a PyAudio stream, backed by the bounded queue the
+    PortAudio callback fills, so capture keeps running while the consumer
+    does VAD, logging and callbacks.
+    """
+
+    def __init__(self, manager: "AudioDeviceManager"):
+        self.manager = manager
+        self._silence = bytes(config.CHUNK_SIZE * 2)
+
+    def read(self, num_frames: int, exception_on_overflow: bool = False) -> bytes:
+        # Wait a few chunk periods before declaring the device starved
+        timeout = 4 * num_frames / config.SAMPLE_RATE
+        try:
+            return self.manager.chunks.get(timeout=timeout)
+        except queue.Empty:
+            self.manager.underruns += 1
+            if len(self._silence) != num_frames * 2:
+                self._silence = bytes(num_frames * 2)
+            return self._silence
+
+
+class AudioDeviceManager:
+    """
+    Keeps PyAudio initialized and the input stream open for the lifetime of
+    the process, so recorders lease a warm stream instead of initializing
+    PortAudio, enumerating devices and opening a stream on every turn.
+
+    Between leases the stream is stopped (not closed) so no stale audio is
+    buffered; a lease only has to restart it.
+
+    In callback mode PortAudio pushes chunks into a bounded queue from its own
+    thread; input overflows, chunks dropped on a full queue and consumer
+    underruns are counted rather than lost silently.
+
+    Output streams for playback are opened on demand, one per format, and
+    kept open alongside the input stream.
+    """
+
+    def __init__(
+        self,
+        audio=None,
+        callback_mode: bool = config.CAPTURE_CALLBACK_MODE,
+        queue_chunks: int = config.CAPTURE_QUEUE_CHUNKS,
+    ):
+        """
+        :param audio: PyAudio-compatible backend (defaults to pyaudio.PyAudio())
+        :param callback_mode: Capture on the PortAudio callback thread; otherwise
+            the lessee reads the stream directly (blocking reads)
+        :param queue_chunks: Capacity of the callback queue, in chunks
+        """
+        self.audio = audio or pyaudio.PyAudio()
+        # Stand-in backends (ReplaySource) name their formats, so replay runs without PortAudio
+        self.format = getattr(audio, config.AUDIO_FORMAT, None)
+        if self.format is None:
+            self.format = getattr(pyaudio, config.AUDIO_FORMAT)
+        self.callback_mode = callback_mode
+        self.stream = None
+        self.outputs: Dict[Tuple[int, int, int], object] = {}
+        self.chunks: "queue.Queue[bytes]" = queue.Queue(maxsize=queue_chunks)
+
+        self.acquires = 0
+        self.last_acquire_ms = 0.0
+        self.total_acquire_ms = 0.0
+        self.overflows = 0
+        self.dropped_chunks = 0
+        self.underruns = 0
+        self._lock = threading.Lock()
+        self._output_lock = threading.Lock()
+
+    @property
+    def sample_width(self) -> int:
+        return self.audio.get_sample_size(self.format)
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PortAudio callback: enqueue the chunk without blocking."""
+        if status & pyaudio.paInputOverflow:
+            self.overflows += 1
+        if status & pyaudio.paInputUnderflow:
+            self.underruns += 1
+        try:
+            self.chunks.put_nowait(in_data)
+        except queue.Full:
+            self.dropped_chunks += 1
+        return None, pyaudio.paContinue
+
+    def _open_stream(self):
+        kwargs = {}
+        if self.callback_mode:
+            kwargs["stream_callback"] = self._on_audio
+        self.stream = self.audio.open(
+            format=self.format,
+            channels=config.CHANNELS,
+            rate=config.SAMPLE_RATE,
+            input=True,
+            frames_per_buffer=config.CHUNK_SIZE,
+            start=False,
+            **kwargs,
+        )
+
+    def _clear_queue(self):
+        while True:
+            try:
+                self.chunks.get_nowait()
+            except queue.Empty:
+                return
+
+    def warm(self):
+        """Open the input stream ahead of the first lease."""
+        with self._lock:
+            if self.stream is None:
+                self._open_stream()
+
+    @contextmanager
+    def lease(self) -> Iterator:
+        """
+        Exclusive use of the started input stream. Yields an object with the
+        blocking `read(num_frames, exception_on_overflow)` stream interface.
+        """
+        with self._lock:
+            start = time.perf_counter_ns()
+            if self.stream is None:
+                self._open_stream()
+            self._clear_queue()
+            self.stream.start_stream()
+            end = time.perf_counter_ns()
+
+            self.acquires += 1
+            self.last_acquire_ms = (end - start) / 1e6
+            self.total_acquire_ms += self.last_acquire_ms
+            record_span("acquire", start, end)
+
+            try:
+                yield CaptureQueue(self) if self.callback_mode else self.stream
+            finally:
+                try:
+                    self.stream.stop_stream()
+                except Exception:
+                    # Device went away: reopen on the next lease
+                    self._discard_stream()
+
+    def output_stream(self, rate: int, channels: int, sample_width: int):
+        """Return the (started, blocking) output stream for a PCM format."""
+        key = (rate, channels, sample_width)
+        with self._output_lock:
+            stream = self.outputs.get(key)
+            if stream is None:
+                stream = self.audio.open(
+                    format=self.audio.get_format_from_width(sample_width),
+                    channels=channels,
+                    rate=rate,
+                    output=True,
+                    frames_per_buffer=config.CHUNK_SIZE,
+                )
+                self.outputs[key] = stream
+            return stream
+
+    def _discard_stream(self):
+        try:
+            self.stream.close()
+        except Exception:
+            pass
+        self.stream = None
+
+    def stats(self) -> Dict:
+        """Stream acquisition timings and frame-loss counters."""
+        return {
+            "acquires": self.acquires,
+            "last_acquire_ms": round(self.last_acquire_ms, 2),
+            "mean_acquire_ms": round(
+                self.total_acquire_ms / self.acquires, 2
+            ) if self.acquires else 0.0,
+            "overflows": self.overflows,
+            "dropped_chunks": self.dropped_chunks,
+            "underruns": self.underruns,
+            "queued_chunks": self.chunks.qsize(),
+        }
+
+    def close(self):
+        """Close the streams and terminate PyAudio."""
+        with self._lock:
+            if self.stream is not None:
+                self._discard_stream()
+        with self._output_lock:
+            for stream in self.outputs.values():
+                try:
+                    stream.close()
+                except Exception:
+                    pass
+            self.outputs.clear()
+            self.audio.terminate()
+
+
+_default_manager: Optional[AudioDeviceManager] = None
+_default_lock = threading.Lock()
+
+
+def get_device_manager() -> AudioDeviceManager:
+    """Return the process-wide AudioDeviceManager (created warm)."""
+    global _default_manager
+    with _default_lock:
+        if _default_manager is None:
+            _default_manager = AudioDeviceManager()
+            _default_manager.warm()
+        return _default_manager
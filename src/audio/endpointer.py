@@ -0,0 +1,116 @@
+"""
+Incremental speech endpointing over a capture buffer
+"""
+import time
+from typing import Callable, Optional
+from .buffer import CaptureBuffer
+from .vad import VAD
+from ..utils.tracing import record_span
+import config
+
+# Events returned by Endpointer.feed
+SPEECH_START = "speech_start"
+ENDPOINT = "endpoint"
+FULL = "full"
+TIMEOUT = "timeout"
+
+
+class Endpointer:
+    """
+    Finds one utterance in a stream of fixed-size chunks: feed each chunk and
+    act on the returned event. Audio from just before speech (pre-roll) and
+    the utterance itself are collected in the capture buffer.
+
+    Used by the microphone recorder and by network sessions, which push
+    chunks as they arrive instead of reading a device.
+    """
+
+    def __init__(
+        self,
+        vad: VAD,
+        buffer: CaptureBuffer,
+        silence_duration: float = config.DEFAULT_SILENCE_DURATION,
+        no_speech_timeout: Optional[float] = config.NO_SPEECH_TIMEOUT,
+        chunk_size: int = config.CHUNK_SIZE,
+        sample_rate: int = config.SAMPLE_RATE,
+    ):
+        """
+        :param silence_duration: Seconds of silence after speech that end the utterance
+        :param no_speech_timeout: Seconds without speech before giving up (None = never)
+        """
+        self.vad = vad
+        self.buffer = buffer
+        self.silence_duration = silence_duration
+
+        # How many chunks correspond to the allowed trailing silence?
+        self.max_silence_chunks = int(silence_duration * sample_rate / chunk_size)
+        self.max_total_chunks = (
+            int(no_speech_timeout * sample_rate / chunk_size)
+            if no_speech_timeout is not None else None
+        )
+        self.reset()
+
+    def reset(self):
+        """Start looking for a new utterance."""
+        self.buffer.reset()
+        self.vad.reset()
+        self.speech_detected = False
+        self.silence_chunks = 0
+        self.total_chunks = 0
+        self.is_speech = False
+        self._last_speech_ns = 0
+
+    def feed(
+        self,
+        data: bytes,
+        chunk_callback: Optional[Callable[[memoryview], None]] = None,
+    ) -> Optional[str]:
+        """
+        Process one chunk; returns SPEECH_START, ENDPOINT, FULL, TIMEOUT or None.
+        Newly buffered audio (pre-roll first) is passed to `chunk_callback`.
+        """
+        self.is_speech = is_speech = self.vad.is_speech(data)
+        self.total_chunks += 1
+
+        # If no speech was detected for too long, bail out
+        if (
+            not self.speech_detected
+            and self.max_total_chunks is not None
+            and self.total_chunks > self.max_total_chunks
+        ):
+            return TIMEOUT
+
+        event = None
+        if is_speech:
+            if not self.speech_detected:
+                self.speech_detected = True
+                event = SPEECH_START
+                pre_roll = self.buffer.start()
+                if chunk_callback and pre_roll.size:
+                    chunk_callback(pre_roll.data.cast("B"))
+
+            self.silence_chunks = 0
+            self._last_speech_ns = time.perf_counter_ns()
+
+        elif self.speech_detected:
+            # After we've detected speech once, track silence
+            self.silence_chunks += 1
+
+        else:
+            # Keep a short window of pre-speech audio
+            self.buffer.push_preroll(data)
+            return None
+
+        written = self.buffer.append(data)
+        if chunk_callback and written.size:
+            chunk_callback(written.data.cast("B"))
+
+        if self.silence_chunks > self.max_silence_chunks:
+            # Time spent confirming end of speech
+            record_span("vad_endpoint", self._last_speech_ns, time.perf_counter_ns())
+            return ENDPOINT
+
+        if self.buffer.full:
+            return FULL
+
+        return event
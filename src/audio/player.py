@@ -1,27 +1,109 @@
 """
 Audio playback utilities
 """
-import tempfile
-from typing import Optional
+import io
+import threading
+import wave
+from typing import Optional, List
+from .artifacts import ArtifactStore, get_artifact_store
+from .device import AudioDeviceManager, get_device_manager
 from ..utils.logger import Logger
+import config
+
+
+def merge_wav_clips(clips: List[bytes]) -> bytes:
+    """
+    Concatenate WAV clips (same format) into a single WAV.
+    Used to join sentence-by-sentence TTS output for playback.
+    """
+    if len(clips) == 1:
+        return clips[0]
+
+    output = io.BytesIO()
+    writer = None
+
+    for clip in clips:
+        with wave.open(io.BytesIO(clip), "rb") as reader:
+            if writer is None:
+                writer = wave.open(output, "wb")
+                writer.setparams(reader.getparams())
+            writer.writeframes(reader.readframes(reader.getnframes()))
+
+    if writer is not None:
+        writer.close()
+    return output.getvalue()
+
 
 class AudioPlayer:
     """Handles audio playback"""
     
-    def __init__(self, logger: Logger):
+    def __init__(
+        self,
+        logger: Logger,
+        store: Optional[ArtifactStore] = None,
+        device: Optional[AudioDeviceManager] = None,
+    ):
+        """
+        :param store: Artifact store for saved audio
+        :param device: Device manager providing the output stream
+            (defaults to the process-wide one, on first playback)
+        """
         self.logger = logger
+        self.store = store or get_artifact_store()
+        self.device = device
+        self._stopped = threading.Event()
+        self._playing = threading.Event()
+    
+    @property
+    def playing(self) -> bool:
+        """Whether a clip is being written to the output device right now"""
+        return self._playing.is_set()
+    
+    def play(self, audio_data: bytes) -> bool:
+        """
+        Play a WAV clip on the local output device, chunk by chunk.
+        Blocks until the clip ends or stop() is called.
+        Returns True if the clip played to the end.
+        """
+        if self._stopped.is_set():
+            return False
+        
+        try:
+            device = self.device or get_device_manager()
+            with wave.open(io.BytesIO(audio_data), 'rb') as reader:
+                stream = device.output_stream(
+                    reader.getframerate(), reader.getnchannels(), reader.getsampwidth()
+                )
+                # Small writes so stop() takes effect within a chunk
+                self._playing.set()
+                try:
+                    while not self._stopped.is_set():
+                        frames = reader.readframes(config.CHUNK_SIZE)
+                        if not frames:
+                            return True
+                        stream.write(frames)
+                finally:
+                    self._playing.clear()
+            return False
+        except Exception as e:
+            self.logger.error(f"Playback error: {str(e)}")
+            return False
+    
+    def stop(self):
+        """Interrupt playback; later clips are skipped until reset()."""
+        self._stopped.set()
+    
+    def reset(self):
+        """Allow playback again after stop()."""
+        self._stopped.clear()
     
     def save_audio(self, audio_data: bytes, format: str = 'wav') -> Optional[str]:
         """
-        Save audio data to temporary file
-        Returns path to temporary file
+        Save audio data to the managed artifact store
+        Returns path to the stored file (evicted automatically)
         """
         try:
-            print("audio being saved.")
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=f'.{format}')
-            temp_file.write(audio_data)
-            temp_file.close()
-            return temp_file.name
+            return self.store.put(audio_data, suffix=f'.{format}')
         except Exception as e:
             self.logger.error(f"Failed to save audio: {str(e)}")
             return None
@@ -0,0 +1,169 @@
+"""
+Upload preprocessing: shrink a recorded utterance before batch STT
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional, Union
+from .buffer import HEADER_SIZE
+from .vad import VAD, EnergyVAD, create_vad
+from .wav import build_wav
+from ..utils.lazy import lazy_import
+import config
+
+np = lazy_import("numpy")
+
+UPLOAD_ENCODINGS = ("linear16", "mulaw")
+
+# Windowed-sinc low-pass taps used before decimating
+RESAMPLE_TAPS = 63
+
+
+@dataclass
+class PreparedAudio:
+    """An utterance ready to upload, and what preprocessing saved."""
+    data: Union[bytes, memoryview]
+    # None: a self-describing WAV file; otherwise raw samples in this encoding
+    encoding: Optional[str]
+    sample_rate: int
+    original_bytes: int
+    trimmed_seconds: float = 0.0
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - len(self.data)
+
+
+def speech_bounds(
+    samples: np.ndarray,
+    threshold: float,
+    frame_size: int,
+    padding: int,
+    vad: Optional[VAD] = None,
+) -> Optional[tuple]:
+    """
+    (start, end) sample range from `padding` samples before the first speech
+    frame to `padding` after the last one, or None if there is none. Frames
+    are classified by `vad` if given (fed in order, as while recording),
+    otherwise by their mean absolute amplitude reaching `threshold`.
+    """
+    frames = samples.size // frame_size
+    if frames == 0:
+        return None
+    blocks = samples[:frames * frame_size].reshape(frames, frame_size)
+    if vad is None:
+        # int32 so abs(-32768) does not wrap
+        levels = np.abs(blocks, dtype=np.int32).mean(axis=1)
+        voiced = np.flatnonzero(levels >= threshold)
+    else:
+        vad.reset()
+        voiced = np.flatnonzero([vad.is_speech(block.tobytes()) for block in blocks])
+    if voiced.size == 0:
+        return None
+    start = max(int(voiced[0]) * frame_size - padding, 0)
+    end = min((int(voiced[-1]) + 1) * frame_size + padding, samples.size)
+    return start, end
+
+
+def downsample(samples: np.ndarray, factor: int) -> np.ndarray:
+    """Low-pass below the new Nyquist frequency, then keep every `factor`th sample."""
+    if factor == 1:
+        return samples
+    n = np.arange(RESAMPLE_TAPS) - (RESAMPLE_TAPS - 1) / 2
+    taps = np.sinc(n / factor) / factor * np.hamming(RESAMPLE_TAPS)
+    filtered = np.convolve(samples.astype(np.float32), taps.astype(np.float32), mode="same")
+    return np.clip(np.rint(filtered[::factor]), -32768, 32767).astype(np.int16)
+
+
+def mulaw_encode(samples: np.ndarray) -> np.ndarray:
+    """G.711 mu-law: 8-bit codes for int16 samples (bit-exact with g711.c)."""
+    pcm = samples.astype(np.int32) >> 2  # 14-bit
+    negative = pcm < 0
+    magnitude = np.minimum(np.where(negative, -pcm, pcm), 8159) + 0x21
+    segment = np.floor(np.log2(magnitude)).astype(np.int32) - 5
+    code = (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F)
+    code = np.where(segment > 7, 0x7F, code)  # past the last segment: clip
+    return (code ^ np.where(negative, 0x7F, 0xFF)).astype(np.uint8)
+
+
+class UploadPreprocessor:
+    """
+    Prepares a recorded WAV utterance for the batch /listen upload: trims
+    leading and trailing silence (the endpointing tail alone is up to
+    MAX_SILENCE_DURATION seconds) with the same VAD backend that endpointed
+    it, and optionally re-encodes it at a lower
+    sample rate and/or as 8-bit mu-law.
+    """
+
+    def __init__(
+        self,
+        threshold: float = config.DEFAULT_VAD_THRESHOLD,
+        trim: bool = config.UPLOAD_TRIM_SILENCE,
+        padding: float = config.UPLOAD_TRIM_PADDING,
+        frame_ms: int = config.UPLOAD_TRIM_FRAME_MS,
+        encoding: str = config.UPLOAD_ENCODING,
+        sample_rate: int = config.UPLOAD_SAMPLE_RATE,
+        source_rate: int = config.SAMPLE_RATE,
+        vad_backend: str = config.DEFAULT_VAD_BACKEND,
+    ):
+        """
+        :param threshold: Mean absolute amplitude of a speech frame (as in the energy VAD)
+        :param trim: Whether to cut leading/trailing silence
+        :param padding: Seconds of silence kept on each side of the speech
+        :param frame_ms: Frame length used to measure levels (energy backend)
+        :param encoding: 'linear16' (WAV) or 'mulaw' (raw 8-bit)
+        :param sample_rate: Upload sample rate; must divide `source_rate`
+        :param vad_backend: VAD used to find the speech; other backends than
+            'energy' classify whole CHUNK_SIZE chunks, as they are tuned for them
+        """
+        if encoding not in UPLOAD_ENCODINGS:
+            raise ValueError(f"Unknown upload encoding '{encoding}'")
+        if source_rate % sample_rate:
+            raise ValueError(f"Upload rate {sample_rate} must divide {source_rate}")
+        # Fails early on an unknown backend or a missing webrtcvad
+        create_vad(vad_backend, threshold)
+        self.threshold = threshold
+        self.trim = trim
+        self.padding = int(padding * source_rate)
+        self.frame_size = max(source_rate * frame_ms // 1000, 1)
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.source_rate = source_rate
+        self.vad_backend = vad_backend
+
+    @property
+    def passthrough(self) -> bool:
+        """Whether uploads are sent exactly as recorded."""
+        return not self.trim and self.encoding == "linear16" and self.sample_rate == self.source_rate
+
+    def _speech_bounds(self, samples: np.ndarray) -> Optional[tuple]:
+        if self.vad_backend == EnergyVAD.name:
+            return speech_bounds(samples, self.threshold, self.frame_size, self.padding)
+        # A fresh VAD per upload: uploads may be processed concurrently
+        vad = create_vad(self.vad_backend, self.threshold)
+        return speech_bounds(samples, self.threshold, config.CHUNK_SIZE, self.padding, vad)
+
+    def process(self, wav: Union[bytes, memoryview]) -> PreparedAudio:
+        """Prepare a 16-bit mono WAV (as recorded) for upload."""
+        view = memoryview(wav).cast("B")
+        prepared = PreparedAudio(view, None, self.source_rate, len(view))
+        if self.passthrough:
+            return prepared
+
+        samples = np.frombuffer(view, dtype=np.int16, offset=HEADER_SIZE)
+        trimmed = False
+        if self.trim:
+            bounds = self._speech_bounds(samples)
+            if bounds is not None and bounds[1] - bounds[0] < samples.size:
+                start, end = bounds
+                prepared.trimmed_seconds = (samples.size - (end - start)) / self.source_rate
+                samples = samples[start:end]
+                trimmed = True
+
+        samples = downsample(samples, self.source_rate // self.sample_rate)
+        prepared.sample_rate = self.sample_rate
+        if self.encoding == "mulaw":
+            prepared.encoding = "mulaw"
+            prepared.data = mulaw_encode(samples).tobytes()
+        elif trimmed or self.sample_rate != self.source_rate:
+            prepared.data = build_wav([samples], self.sample_rate)
+        return prepared
@@ -1,37 +1,61 @@
 """
 Audio recording with Voice Activity Detection (VAD)
-using mean absolute amplitude instead of RMS.
+using a pluggable detector (see src/audio/vad.py).
 """
 
-import pyaudio
-import wave
-import numpy as np
-import tempfile
 from typing import Optional, Callable
+from .buffer import CaptureBuffer
+from .endpointer import Endpointer, ENDPOINT, FULL, SPEECH_START, TIMEOUT
+from .device import AudioDeviceManager, get_device_manager
+from .vad import VAD, EnergyVAD, create_vad
 from ..utils.logger import Logger
 import config
 
 
 class AudioRecorder:
-    """Records audio with simple VAD based on mean absolute amplitude."""
+    """Records audio, using a VAD backend to find the utterance."""
 
     def __init__(
         self,
         logger: Logger,
         vad_threshold: int = config.DEFAULT_VAD_THRESHOLD,
         silence_duration: float = config.DEFAULT_SILENCE_DURATION,
+        pre_roll: float = config.PRE_ROLL_DURATION,
+        max_duration: float = config.MAX_UTTERANCE_DURATION,
+        vad_backend: str = config.DEFAULT_VAD_BACKEND,
+        vad: Optional[VAD] = None,
+        audio=None,
+        device: Optional[AudioDeviceManager] = None,
     ):
         """
         :param logger: Logger instance
-        :param vad_threshold: Threshold for detecting speech based on amplitude
+        :param vad_threshold: Threshold for detecting speech based on amplitude (energy backend)
         :param silence_duration: Duration (seconds) of silence after speech to stop recording
+        :param pre_roll: Seconds of audio kept from before speech is detected
+        :param max_duration: Max utterance length (seconds)
+        :param vad_backend: VAD backend name (see config.VAD_BACKENDS)
+        :param vad: Prebuilt VAD instance (overrides vad_backend)
+        :param audio: PyAudio-compatible input source, wrapped in a private device
+            manager (see src/audio/replay.py for WAV replay)
+        :param device: Device manager to lease the input stream from
+            (defaults to the process-wide, already warm one)
         """
         self.logger = logger
         self.vad_threshold = vad_threshold
         self.silence_duration = silence_duration
-
-        self.audio = pyaudio.PyAudio()
-        self.audio_buffer = []
+        self.vad = vad or create_vad(vad_backend, vad_threshold)
+        self._meter = self.vad if isinstance(self.vad, EnergyVAD) else EnergyVAD()
+
+        # A private manager is closed by cleanup(); a shared one stays warm
+        self.owns_device = device is None and audio is not None
+        if device is None:
+            # Injected sources are read directly so replay is not paced by a queue
+            device = (
+                AudioDeviceManager(audio, callback_mode=False)
+                if audio is not None else get_device_manager()
+            )
+        self.device = device
+        self.audio_buffer = CaptureBuffer(pre_roll, max_duration)
         self.is_recording = False
 
     # ---------- Volume / VAD helpers ----------
@@ -40,122 +64,85 @@ class AudioRecorder:
         """
         Simpler volume measure: mean absolute amplitude of int16 samples.
 
-        Returns a float that you compare with self.vad_threshold.
+        Computed in preallocated scratch space (no per-chunk copy).
         """
-        audio_array = np.frombuffer(audio_data, dtype=np.int16)
-
-        if audio_array.size == 0:
-            return 0.0
-
-        # convert to float to avoid overflow issues
-        audio_f = audio_array.astype(np.float32)
-        level = float(np.mean(np.abs(audio_f)))
-        return level
+        return self._meter.measure(audio_data)
 
     # ---------- Main VAD recording loop ----------
 
     def record_with_vad(
         self,
         status_callback: Optional[Callable[[str], None]] = None,
-    ) -> Optional[str]:
+        chunk_callback: Optional[Callable[[memoryview], None]] = None,
+    ) -> Optional[memoryview]:
         """
         Record audio with Voice Activity Detection.
         - Starts in 'listening' mode.
-        - When level > vad_threshold, it considers that as speech.
-        - Continues recording until there's `silence_duration` seconds of silence after speech.
-        - Returns path to a temporary WAV file if speech was detected, else None.
+        - When the VAD backend classifies a chunk as speech, recording starts; the pre-roll
+          window captured just before it is kept so word onsets are not clipped.
+        - Continues recording until there's `silence_duration` seconds of silence
+          after speech, or the utterance reaches its maximum length.
+        - Every buffered chunk (pre-roll first) is also passed to `chunk_callback`
+          as it is captured (e.g. to stream it to a live transcription socket).
+        - Returns a zero-copy WAV view of the utterance if speech was detected,
+          else None. The view is only valid until the next recording starts.
         """
 
-        print("record-vad-start")
-
-        audio_format = getattr(pyaudio, config.AUDIO_FORMAT)
+        lost_before = self.device.dropped_chunks + self.device.overflows
 
-        stream = self.audio.open(
-            format=audio_format,
-            channels=config.CHANNELS,
-            rate=config.SAMPLE_RATE,
-            input=True,
-            frames_per_buffer=config.CHUNK_SIZE,
-        )
-
-        self.logger.info("Started listening...")
-        if status_callback:
-            status_callback("listening")
-
-        self.audio_buffer = []
-        silence_chunks = 0
-        speech_detected = False
-
-        # How many chunks correspond to the allowed trailing silence?
-        max_silence_chunks = int(
-            self.silence_duration * config.SAMPLE_RATE / config.CHUNK_SIZE
-        )
-
-        # Safety: maximum total time to wait if no speech is ever detected (e.g. 10 seconds)
-        max_total_chunks = int(10 * config.SAMPLE_RATE / config.CHUNK_SIZE)
-        total_chunks = 0
-
-        try:
-            self.is_recording = True
-
-            while self.is_recording:
-                data = stream.read(config.CHUNK_SIZE, exception_on_overflow=False)
-                level = self.calculate_level(data)
-                total_chunks += 1
+        # Lease the warm input stream from the device manager
+        with self.device.lease() as stream:
+            speech_detected = self._capture(stream, status_callback, chunk_callback)
 
-                # Debug print – helpful while tuning threshold
-                print(f"Level: {level:.2f}, threshold: {self.vad_threshold}")
+        lost = self.device.dropped_chunks + self.device.overflows - lost_before
+        if lost:
+            self.logger.warning(f"Capture lost {lost} chunk(s) to overflow")
 
-                # If no speech was detected for too long, bail out
-                if total_chunks > max_total_chunks and not speech_detected:
-                    self.logger.info("No speech detected within timeout, stopping.")
-                    break
-
-                # ---- VAD logic ----
-                if level > self.vad_threshold:
-                    # We consider this as speech
-                    if not speech_detected:
-                        speech_detected = True
-                        self.logger.info("Speech detected")
-                        if status_callback:
-                            status_callback("speaking")
-
-                    silence_chunks = 0
-                    self.audio_buffer.append(data)
-
-                elif speech_detected:
-                    # After we've detected speech once, track silence
-                    silence_chunks += 1
-                    self.audio_buffer.append(data)
-
-                    if silence_chunks > max_silence_chunks:
-                        self.logger.info("Silence detected, processing speech...")
-                        break
-
-        finally:
-            stream.stop_stream()
-            stream.close()
-
-        if speech_detected and self.audio_buffer:
-            return self._save_audio_buffer(audio_format)
+        if speech_detected and self.audio_buffer.length:
+            return self.audio_buffer.wav()
 
         return None
 
-    # ---------- File saving ----------
-
-    def _save_audio_buffer(self, audio_format) -> str:
-        """Save audio buffer to a temporary WAV file and return its path."""
-        print("audio-buffer-save")
-
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-
-        with wave.open(temp_file.name, "wb") as wf:
-            wf.setnchannels(config.CHANNELS)
-            wf.setsampwidth(self.audio.get_sample_size(audio_format))
-            wf.setframerate(config.SAMPLE_RATE)
-            wf.writeframes(b"".join(self.audio_buffer))
+    def _capture(
+        self,
+        stream,
+        status_callback: Optional[Callable[[str], None]],
+        chunk_callback: Optional[Callable[[memoryview], None]],
+    ) -> bool:
+        """Read chunks until the utterance ends; returns whether speech was found."""
+        self.logger.info("Started listening...")
+        if status_callback:
+            status_callback("listening")
 
-        return temp_file.name
+        endpointer = Endpointer(self.vad, self.audio_buffer, self.silence_duration)
+        self.is_recording = True
+
+        while self.is_recording:
+            data = stream.read(config.CHUNK_SIZE, exception_on_overflow=False)
+            event = endpointer.feed(data, chunk_callback)
+
+            # Per-chunk debug output – helpful while tuning threshold.
+            # Guarded so the message is not even formatted unless enabled.
+            if self.logger.debug_enabled:
+                self.logger.debug(
+                    f"Level: {self.vad.level:.2f}, speech: {endpointer.is_speech}"
+                )
+
+            if event == SPEECH_START:
+                self.logger.info("Speech detected")
+                if status_callback:
+                    status_callback("speaking")
+            elif event == TIMEOUT:
+                self.logger.info("No speech detected within timeout, stopping.")
+                break
+            elif event == ENDPOINT:
+                self.logger.info("Silence detected, processing speech...")
+                break
+            elif event == FULL:
+                self.logger.warning("Max utterance length reached, processing speech...")
+                break
+
+        return endpointer.speech_detected
 
     # ---------- Control / cleanup ----------
 
@@ -164,8 +151,9 @@ class AudioRecorder:
         self.is_recording = False
 
     def cleanup(self):
-        """Clean up audio resources."""
-        self.audio.terminate()
+        """Clean up audio resources (a shared device manager is left warm)."""
+        if self.owns_device:
+            self.device.close()
 
     # ---------- Optional: helper to tune threshold ----------
 
@@ -174,23 +162,11 @@ class AudioRecorder:
         Helper to see typical levels for noise vs speech.
         Call this once and talk normally to choose a good vad_threshold.
         """
-        audio_format = getattr(pyaudio, config.AUDIO_FORMAT)
-        stream = self.audio.open(
-            format=audio_format,
-            channels=config.CHANNELS,
-            rate=config.SAMPLE_RATE,
-            input=True,
-            frames_per_buffer=config.CHUNK_SIZE,
-        )
-
         num_chunks = int(seconds * config.SAMPLE_RATE / config.CHUNK_SIZE)
         print(f"Collecting levels for {seconds} seconds...")
 
-        try:
+        with self.device.lease() as stream:
             for i in range(num_chunks):
                 data = stream.read(config.CHUNK_SIZE, exception_on_overflow=False)
                 level = self.calculate_level(data)
                 print(f"Chunk {i}: level = {level:.2f}")
-        finally:
-            stream.stop_stream()
-            stream.close()
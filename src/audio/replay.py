@@ -0,0 +1,106 @@
+"""
+WAV replay input source: a stand-in for `pyaudio.PyAudio` that feeds WAV
+samples to `AudioRecorder` instead of a microphone, optionally faster than
+real time. Used for offline VAD and endpointing benchmarks.
+"""
+from __future__ import annotations
+import time
+import wave
+from ..utils.lazy import lazy_import
+import config
+
+np = lazy_import("numpy")
+
+
+def load_wav(path: str, sample_rate: int = config.SAMPLE_RATE) -> np.ndarray:
+    """Load a 16-bit WAV as mono int16 at `sample_rate` (downmixed/resampled)."""
+    with wave.open(path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate != sample_rate and samples.size:
+        duration = samples.size / rate
+        target = np.arange(int(duration * sample_rate)) / sample_rate
+        source = np.arange(samples.size) / rate
+        samples = np.interp(target, source, samples).astype(np.int16)
+    return samples
+
+
+class ReplayStream:
+    """Input stream reading from the shared cursor of a ReplaySource."""
+
+    def __init__(self, source: "ReplaySource"):
+        self.source = source
+
+    def read(self, num_frames: int, exception_on_overflow: bool = True) -> bytes:
+        return self.source.read(num_frames)
+
+    def is_active(self) -> bool:
+        return True
+
+    def start_stream(self):
+        pass
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ReplaySource:
+    """
+    PyAudio-compatible source replaying int16 samples. Streams opened from it
+    share one cursor, so consecutive recordings continue where the last one
+    stopped. Past the end it returns silence and sets `exhausted`.
+    """
+
+    def __init__(self, samples: np.ndarray, speed: float = 0.0):
+        """
+        :param samples: Mono int16 samples at config.SAMPLE_RATE
+        :param speed: Real-time factor (e.g. 10 = 10x faster); 0 = no pacing
+        """
+        self.samples = samples
+        self.speed = speed
+        self.position = 0
+        self.exhausted = False
+        self._silence = bytes(config.CHUNK_SIZE * 2)
+
+    @classmethod
+    def from_wav(cls, path: str, speed: float = 0.0) -> "ReplaySource":
+        return cls(load_wav(path), speed)
+
+    def read(self, num_frames: int) -> bytes:
+        if self.speed:
+            time.sleep(num_frames / config.SAMPLE_RATE / self.speed)
+
+        start = self.position
+        self.position += num_frames
+        if start >= self.samples.size:
+            self.exhausted = True
+            if len(self._silence) != num_frames * 2:
+                self._silence = bytes(num_frames * 2)
+            return self._silence
+
+        chunk = self.samples[start:start + num_frames].tobytes()
+        if len(chunk) < num_frames * 2:
+            chunk += bytes(num_frames * 2 - len(chunk))
+        return chunk
+
+    # ---------- pyaudio.PyAudio interface ----------
+
+    paInt16 = 8  # PortAudio's id for 16-bit samples
+
+    def open(self, **kwargs) -> ReplayStream:
+        return ReplayStream(self)
+
+    def get_sample_size(self, audio_format) -> int:
+        return 2
+
+    def terminate(self):
+        pass
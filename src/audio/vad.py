@@ -0,0 +1,254 @@
+"""
+Voice Activity Detection backends.
+
+All backends take raw int16 chunks as captured and reuse preallocated
+scratch space, so classifying a chunk does not allocate sample arrays.
+"""
+from typing import Callable, Dict, Optional, Type
+from ..utils.lazy import lazy_import
+import config
+
+np = lazy_import("numpy")
+
+
+class VAD:
+    """Base class: classifies one chunk of int16 audio as speech or not."""
+
+    name = ""
+
+    def __init__(self):
+        # Last measured value, for debugging/tuning (meaning depends on backend)
+        self.level = 0.0
+
+    def is_speech(self, chunk: bytes) -> bool:
+        raise NotImplementedError
+
+    def reset(self):
+        """Clear per-recording state."""
+
+
+class EnergyVAD(VAD):
+    """Mean absolute amplitude compared against a fixed threshold."""
+
+    name = "energy"
+
+    def __init__(self, threshold: float = config.DEFAULT_VAD_THRESHOLD):
+        super().__init__()
+        self.threshold = threshold
+        self._scratch = np.empty(config.CHUNK_SIZE, dtype=np.int64)
+
+    def measure(self, chunk: bytes) -> float:
+        """Mean absolute amplitude of the chunk, computed in scratch space."""
+        samples = np.frombuffer(chunk, dtype=np.int16)
+        n = samples.size
+        if n == 0:
+            return 0.0
+        if self._scratch.size < n:
+            self._scratch = np.empty(n, dtype=np.int64)
+
+        # Widen to int64 in place: abs(-32768) cannot overflow and the sum
+        # reduces in its own dtype without a casting buffer
+        scratch = self._scratch[:n]
+        np.copyto(scratch, samples)
+        np.abs(scratch, out=scratch)
+        return float(np.add.reduce(scratch)) / n
+
+    def is_speech(self, chunk: bytes) -> bool:
+        self.level = self.measure(chunk)
+        return self.level > self.threshold
+
+
+class AdaptiveEnergyVAD(EnergyVAD):
+    """
+    Energy detector with a tracked noise floor: speech is a chunk well above
+    the floor, so no manual threshold tuning is needed. The floor follows
+    non-speech chunks quickly and drifts slowly during speech, so a sustained
+    rise in background noise is eventually absorbed.
+    """
+
+    name = "adaptive"
+
+    def __init__(
+        self,
+        ratio: float = config.ADAPTIVE_VAD_RATIO,
+        margin: float = config.ADAPTIVE_VAD_MARGIN,
+        adapt_rate: float = config.ADAPTIVE_VAD_ADAPT_RATE,
+    ):
+        """
+        :param ratio: Speech must exceed noise_floor * ratio ...
+        :param margin: ... and noise_floor + margin
+        :param adapt_rate: EMA rate at which the floor follows non-speech chunks
+        """
+        super().__init__()
+        self.ratio = ratio
+        self.margin = margin
+        self.adapt_rate = adapt_rate
+        self.noise_floor: Optional[float] = None
+
+    def is_speech(self, chunk: bytes) -> bool:
+        self.level = self.measure(chunk)
+        if self.noise_floor is None:
+            self.noise_floor = self.level
+
+        self.threshold = max(
+            self.noise_floor * self.ratio, self.noise_floor + self.margin
+        )
+        speech = self.level > self.threshold
+
+        rate = self.adapt_rate * (0.1 if speech else 1.0)
+        self.noise_floor += rate * (self.level - self.noise_floor)
+        return speech
+
+
+class WebRTCVAD(VAD):
+    """
+    webrtcvad on 10/20/30 ms frames. A chunk is speech when at least
+    `speech_ratio` of its frames are; partial frames carry over to the next chunk.
+    """
+
+    name = "webrtc"
+
+    def __init__(
+        self,
+        aggressiveness: int = config.WEBRTC_VAD_AGGRESSIVENESS,
+        frame_ms: int = config.WEBRTC_VAD_FRAME_MS,
+        speech_ratio: float = 0.5,
+        sample_rate: int = config.SAMPLE_RATE,
+    ):
+        """
+        :param aggressiveness: 0 (least) to 3 (most aggressive filtering of non-speech)
+        :param frame_ms: Frame length, 10, 20 or 30 ms
+        :param speech_ratio: Fraction of speech frames for a chunk to count as speech
+        :param sample_rate: 8000, 16000, 32000 or 48000 Hz
+        """
+        import webrtcvad
+
+        if frame_ms not in (10, 20, 30):
+            raise ValueError("webrtcvad frames must be 10, 20 or 30 ms")
+
+        super().__init__()
+        self.vad = webrtcvad.Vad(aggressiveness)
+        self.sample_rate = sample_rate
+        self.speech_ratio = speech_ratio
+        self.frame_bytes = sample_rate * frame_ms // 1000 * 2
+
+        self._pending = bytearray(self.frame_bytes)
+        self._pending_view = memoryview(self._pending)
+        self._pending_len = 0
+
+    def reset(self):
+        self._pending_len = 0
+
+    def is_speech(self, chunk: bytes) -> bool:
+        view = memoryview(chunk).cast("B")
+        size = self.frame_bytes
+        frames = 0
+        voiced = 0
+        pos = 0
+
+        # Complete the frame left over from the previous chunk
+        if self._pending_len:
+            take = min(size - self._pending_len, len(view))
+            self._pending_view[self._pending_len:self._pending_len + take] = view[:take]
+            self._pending_len += take
+            pos = take
+            if self._pending_len == size:
+                frames += 1
+                voiced += self.vad.is_speech(self._pending_view, self.sample_rate)
+                self._pending_len = 0
+
+        while pos + size <= len(view):
+            frames += 1
+            voiced += self.vad.is_speech(view[pos:pos + size], self.sample_rate)
+            pos += size
+
+        rest = len(view) - pos
+        if rest:
+            self._pending_view[:rest] = view[pos:]
+            self._pending_len = rest
+
+        if frames:
+            self.level = voiced / frames
+        return self.level >= self.speech_ratio
+
+
+class PlaybackGate(VAD):
+    """
+    Wraps a VAD while replies play on the local speaker, which the microphone
+    also hears (there is no echo cancellation). During playback a chunk only
+    counts as speech if the wrapped VAD agrees, its level is above both
+    `min_level` and `echo_ratio` times the echo level measured during
+    playback, and this holds for `min_chunks` chunks in a row. Otherwise the
+    wrapped VAD's decision is returned unchanged.
+    """
+
+    def __init__(
+        self,
+        vad: VAD,
+        playing: Callable[[], bool],
+        min_level: float = config.BARGE_IN_MIN_LEVEL,
+        echo_ratio: float = config.BARGE_IN_ECHO_RATIO,
+        min_chunks: int = config.BARGE_IN_MIN_CHUNKS,
+        adapt_rate: float = config.BARGE_IN_ECHO_ADAPT_RATE,
+    ):
+        """
+        :param playing: Whether playback is active right now
+        :param min_level: Mean absolute amplitude speech must exceed during playback
+        :param echo_ratio: ... and the tracked echo level times this
+        :param min_chunks: Consecutive qualifying chunks before speech is reported
+        :param adapt_rate: EMA rate at which the echo level follows non-speech chunks
+        """
+        super().__init__()
+        self.vad = vad
+        self.playing = playing
+        self.min_level = min_level
+        self.echo_ratio = echo_ratio
+        self.min_chunks = min_chunks
+        self.adapt_rate = adapt_rate
+        # Learned across playbacks: the speaker-to-microphone coupling hardly changes
+        self.echo_level: Optional[float] = None
+        self.run = 0
+        self._meter = EnergyVAD()
+
+    def reset(self):
+        self.vad.reset()
+        self.run = 0
+
+    def is_speech(self, chunk: bytes) -> bool:
+        speech = self.vad.is_speech(chunk)
+        self.level = self.vad.level
+        if not self.playing():
+            self.run = 0
+            return speech
+
+        level = self._meter.measure(chunk)
+        if self.echo_level is None:
+            self.echo_level = level
+        threshold = max(self.min_level, self.echo_level * self.echo_ratio)
+        candidate = speech and level > threshold
+
+        # The echo estimate drifts slowly while someone may be talking over it
+        rate = self.adapt_rate * (0.1 if candidate else 1.0)
+        self.echo_level += rate * (level - self.echo_level)
+
+        self.run = self.run + 1 if candidate else 0
+        return self.run >= self.min_chunks
+
+
+VAD_BACKENDS: Dict[str, Type[VAD]] = {
+    EnergyVAD.name: EnergyVAD,
+    WebRTCVAD.name: WebRTCVAD,
+    AdaptiveEnergyVAD.name: AdaptiveEnergyVAD,
+}
+
+
+def create_vad(
+    backend: str = config.DEFAULT_VAD_BACKEND,
+    threshold: float = config.DEFAULT_VAD_THRESHOLD,
+) -> VAD:
+    """Build a VAD backend by name; `threshold` applies to the energy backend."""
+    if backend not in VAD_BACKENDS:
+        raise ValueError(f"Unknown VAD backend: {backend}")
+    if backend == EnergyVAD.name:
+        return EnergyVAD(threshold)
+    return VAD_BACKENDS[backend]()
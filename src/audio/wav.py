@@ -0,0 +1,46 @@
+"""
+In-memory WAV helpers
+"""
+import io
+import struct
+import wave
+from typing import Iterable, Union
+import config
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+def wav_header(
+    data_size: int,
+    sample_rate: int = config.SAMPLE_RATE,
+    channels: int = config.CHANNELS,
+    sample_width: int = 2,
+) -> bytes:
+    """Build a 44-byte PCM WAV header for `data_size` bytes of samples."""
+    block_align = channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate,
+        sample_rate * block_align, block_align, sample_width * 8,
+        b"data", data_size,
+    )
+
+
+def build_wav(
+    chunks: Iterable[BytesLike],
+    sample_rate: int = config.SAMPLE_RATE,
+    channels: int = config.CHANNELS,
+    sample_width: int = 2,
+) -> bytes:
+    """Assemble PCM chunks into a WAV file in memory, copying them once."""
+    chunks = list(chunks)
+    data_size = sum(memoryview(chunk).nbytes for chunk in chunks)
+    header = wav_header(data_size, sample_rate, channels, sample_width)
+    return b"".join([header, *chunks])
+
+
+def wav_duration(clip: bytes) -> float:
+    """Playing time of a WAV clip in seconds."""
+    with wave.open(io.BytesIO(clip), "rb") as reader:
+        return reader.getnframes() / reader.getframerate()
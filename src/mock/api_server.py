@@ -0,0 +1,356 @@
+"""
+Local stand-in for the Deepgram and Groq HTTP APIs, for load and latency tests.
+
+Serves the endpoints the services call, with configurable latency
+distributions, error rates and token streaming:
+
+    POST /v1/listen                    Deepgram pre-recorded STT
+    POST /v1/speak                     Deepgram TTS (a WAV of silence)
+    POST /openai/v1/chat/completions   Groq chat, streamed (SSE) or not
+
+Point the services at it with base_url=f"{server.url}/v1" (Deepgram) and
+base_url=f"{server.url}/openai/v1" (Groq); any API key is accepted.
+
+Usage:
+    python -m src.mock.api_server --port 8787 --stt-latency lognormal:0.3,0.4 --error-rate 0.02
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from ..audio.wav import wav_header
+
+# Deepgram Aura returns 24 kHz linear16
+TTS_SAMPLE_RATE = 24000
+
+DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """
+    A latency distribution in seconds:
+    fixed (a), uniform (a..b), normal (mean a, stddev b) or
+    lognormal (median a, sigma b; a long right tail).
+    """
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "Distribution":
+        """Parse 'kind:a,b' (e.g. 'lognormal:0.3,0.4'); a bare number is fixed."""
+        kind, _, args = spec.partition(":")
+        if not args:
+            return cls("fixed", float(kind))
+        if kind not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution '{kind}'")
+        values = [float(value) for value in args.split(",")]
+        return cls(kind, *values)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            value = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            value = rng.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            value = self.a * math.exp(rng.gauss(0.0, self.b))
+        else:
+            value = self.a
+        return max(value, 0.0)
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{self.a},{self.b}" if self.kind != "fixed" else str(self.a)
+
+
+@dataclass
+class MockProfile:
+    """How the mock APIs behave."""
+    stt_latency: Distribution = Distribution("lognormal", 0.25, 0.3)
+    tts_latency: Distribution = Distribution("lognormal", 0.2, 0.3)
+    llm_first_token: Distribution = Distribution("lognormal", 0.3, 0.4)
+    llm_token_interval: Distribution = Distribution("fixed", 0.02)
+    # Fraction of requests answered with `error_status` (after the usual latency)
+    error_rate: float = 0.0
+    error_status: int = 503
+    # Fraction of streamed replies cut off midway
+    drop_rate: float = 0.0
+    tts_seconds_per_char: float = 0.06
+    transcript: str = "What is the weather like today?"
+    reply: str = (
+        "It looks sunny with a light breeze this afternoon. "
+        "Expect a high of twenty two degrees. "
+        "You might want a jacket in the evening."
+    )
+
+
+@dataclass
+class EndpointCounters:
+    requests: int = 0
+    errors: int = 0
+    drops: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_HTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        mock = self.server.mock
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        path = self.path.split("?", 1)[0]
+        routes = {
+            "/v1/listen": mock.listen,
+            "/v1/speak": mock.speak,
+            "/openai/v1/chat/completions": mock.chat,
+        }
+        route = routes.get(path)
+        if route is None:
+            self.send_json(404, {"error": f"no route {path}"})
+            return
+        route(self, body)
+
+    def send_json(self, status: int, payload: Dict) -> int:
+        return self.send_body(status, json.dumps(payload).encode(), "application/json")
+
+    def send_body(self, status: int, data: bytes, content_type: str) -> int:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        return len(data)
+
+    def send_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    mock: "MockApiServer"
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on purpose (hedge losers, cancelled streams)
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class MockApiServer:
+    """Threaded HTTP server playing Deepgram and Groq; one thread per connection."""
+
+    def __init__(
+        self,
+        profile: Optional[MockProfile] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+    ):
+        """
+        :param profile: Latencies, error rates and canned content
+        :param port: Port to listen on (0 = any free port)
+        :param seed: Seed for reproducible latency samples and errors
+        """
+        self.profile = profile or MockProfile()
+        self.rng = random.Random(seed)
+        self.counters: Dict[str, EndpointCounters] = {
+            "listen": EndpointCounters(),
+            "speak": EndpointCounters(),
+            "chat": EndpointCounters(),
+        }
+        self._lock = threading.Lock()
+        self._httpd = _HTTPServer((host, port), _Handler)
+        self._httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockApiServer":
+        """Serve on a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="mock-api", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockApiServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---------- Behaviour ----------
+
+    def _sample(self, distribution: Distribution) -> float:
+        with self._lock:
+            return distribution.sample(self.rng)
+
+    def _chance(self, probability: float) -> bool:
+        if probability <= 0:
+            return False
+        with self._lock:
+            return self.rng.random() < probability
+
+    def _count(self, endpoint: str, **amounts: int):
+        with self._lock:
+            counters = self.counters[endpoint]
+            for name, amount in amounts.items():
+                setattr(counters, name, getattr(counters, name) + amount)
+
+    def _fail(self, request: _Handler, endpoint: str) -> bool:
+        """Answer with the configured error status, sometimes."""
+        if not self._chance(self.profile.error_rate):
+            return False
+        self._count(endpoint, errors=1)
+        request.send_json(self.profile.error_status, {"error": "injected failure"})
+        return True
+
+    def listen(self, request: _Handler, body: bytes):
+        self._count("listen", requests=1, bytes_in=len(body))
+        time.sleep(self._sample(self.profile.stt_latency))
+        if self._fail(request, "listen"):
+            return
+        sent = request.send_json(200, {
+            "results": {"channels": [{"alternatives": [{
+                "transcript": self.profile.transcript, "confidence": 0.99,
+            }]}]},
+        })
+        self._count("listen", bytes_out=sent)
+
+    def speak(self, request: _Handler, body: bytes):
+        self._count("speak", requests=1, bytes_in=len(body))
+        text = json.loads(body or b"{}").get("text", "")
+        time.sleep(self._sample(self.profile.tts_latency))
+        if self._fail(request, "speak"):
+            return
+        frames = int(len(text) * self.profile.tts_seconds_per_char * TTS_SAMPLE_RATE)
+        wav = wav_header(frames * 2, TTS_SAMPLE_RATE, 1) + bytes(frames * 2)
+        self._count("speak", bytes_out=request.send_body(200, wav, "audio/wav"))
+
+    def _tokens(self) -> List[str]:
+        words = self.profile.reply.split(" ")
+        return [word + " " for word in words[:-1]] + words[-1:]
+
+    def chat(self, request: _Handler, body: bytes):
+        self._count("chat", requests=1, bytes_in=len(body))
+        payload = json.loads(body or b"{}")
+        time.sleep(self._sample(self.profile.llm_first_token))
+        if self._fail(request, "chat"):
+            return
+
+        tokens = self._tokens()
+        if not payload.get("stream"):
+            time.sleep(sum(self._sample(self.profile.llm_token_interval) for _ in tokens))
+            sent = request.send_json(200, {
+                "choices": [{"message": {"role": "assistant", "content": self.profile.reply}}],
+            })
+            self._count("chat", bytes_out=sent)
+            return
+
+        request.send_response(200)
+        request.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        request.send_header("Transfer-Encoding", "chunked")
+        request.end_headers()
+
+        drop_at = len(tokens) // 2 if self._chance(self.profile.drop_rate) else None
+        sent = 0
+        for i, token in enumerate(tokens):
+            if i == drop_at:
+                # Cut the stream without the terminating chunk
+                self._count("chat", drops=1, bytes_out=sent)
+                request.close_connection = True
+                return
+            if i:
+                time.sleep(self._sample(self.profile.llm_token_interval))
+            event = {"choices": [{"index": 0, "delta": {"content": token}}]}
+            data = f"data: {json.dumps(event)}\n\n".encode()
+            request.send_chunk(data)
+            sent += len(data)
+        request.send_chunk(b"data: [DONE]\n\n")
+        request.send_chunk(b"")
+        self._count("chat", bytes_out=sent)
+
+    # ---------- Stats ----------
+
+    def stats(self) -> Dict[str, Dict]:
+        """Requests, injected errors/drops and bytes per endpoint."""
+        with self._lock:
+            return {name: dict(vars(counters)) for name, counters in self.counters.items()}
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    """CLI options for a MockProfile (shared with benchmarks/loadgen.py)."""
+    defaults = MockProfile()
+    for name, help_text in (
+        ("stt_latency", "STT response time"),
+        ("tts_latency", "TTS response time"),
+        ("llm_first_token", "Time to the first LLM token"),
+        ("llm_token_interval", "Time between LLM tokens"),
+    ):
+        parser.add_argument(
+            f"--{name.replace('_', '-')}",
+            type=Distribution.parse,
+            default=getattr(defaults, name),
+            help=f"{help_text}: fixed seconds or kind:a,b with kind in "
+                 f"{', '.join(DISTRIBUTIONS)} (default {getattr(defaults, name)})",
+        )
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate,
+                        help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=defaults.error_status)
+    parser.add_argument("--drop-rate", type=float, default=defaults.drop_rate,
+                        help="Fraction of streamed replies cut off midway")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible runs")
+
+
+def profile_from_args(args: argparse.Namespace) -> MockProfile:
+    return MockProfile(
+        stt_latency=args.stt_latency,
+        tts_latency=args.tts_latency,
+        llm_first_token=args.llm_first_token,
+        llm_token_interval=args.llm_token_interval,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        drop_rate=args.drop_rate,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockApiServer(profile_from_args(args), args.host, args.port, args.seed)
+    print(f"Mock APIs on {server.url}: Deepgram {server.url}/v1, Groq {server.url}/openai/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
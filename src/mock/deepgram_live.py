@@ -0,0 +1,164 @@
+"""
+Local stand-in for the Deepgram live transcription socket.
+
+Speaks the subset of the streaming protocol used by `LiveTranscription`:
+binary linear16 audio in, JSON `Results` messages out, `CloseStream` to
+flush the final transcript, `KeepAlive` to hold an idle stream open. Like
+the real service, a stream that receives neither audio nor KeepAlive for
+`idle_timeout` seconds is closed. Useful for exercising streaming STT offline.
+
+Run standalone:
+    python -m src.mock.deepgram_live --port 8765 --transcript "hello there"
+
+Then point `config.DEEPGRAM_LIVE_URL` at ws://127.0.0.1:8765/v1/listen.
+"""
+import argparse
+import json
+import threading
+import time
+from typing import Optional
+from websockets.exceptions import ConnectionClosed
+from websockets.sync.server import serve, ServerConnection
+
+
+class MockLiveServer:
+    """Fake live STT server revealing a fixed transcript as audio arrives."""
+
+    def __init__(
+        self,
+        transcript: str = "hello from the mock transcription server",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        bytes_per_word: int = 8000,
+        finalize_delay: float = 0.05,
+        idle_timeout: float = 10.0,
+    ):
+        """
+        :param transcript: Text returned as the final transcript
+        :param host: Interface to bind
+        :param port: Port to bind (0 picks a free port)
+        :param bytes_per_word: Audio bytes received per interim word revealed
+        :param finalize_delay: Simulated recognition delay after CloseStream
+        :param idle_timeout: Seconds without audio or KeepAlive before the
+            stream is closed (0 = never)
+        """
+        self.transcript = transcript
+        self.host = host
+        self.port = port
+        self.bytes_per_word = bytes_per_word
+        self.finalize_delay = finalize_delay
+        self.idle_timeout = idle_timeout
+
+        self.sessions = 0
+        self.keepalives = 0
+        self.idle_closes = 0
+        self.server = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v1/listen"
+
+    # ---------- Protocol ----------
+
+    def _results(self, transcript: str, is_final: bool) -> str:
+        return json.dumps(
+            {
+                "type": "Results",
+                "is_final": is_final,
+                "speech_final": is_final,
+                "channel": {"alternatives": [{"transcript": transcript}]},
+            }
+        )
+
+    def _handle(self, connection: ServerConnection):
+        """Handle one live session."""
+        self.sessions += 1
+        words = self.transcript.split()
+        received = 0
+        revealed = 0
+
+        while True:
+            try:
+                message = connection.recv(timeout=self.idle_timeout or None)
+            except TimeoutError:
+                self.idle_closes += 1
+                connection.close(1011, "NET-0001: no audio received within the timeout")
+                return
+            except ConnectionClosed:
+                return
+            if isinstance(message, bytes):
+                received += len(message)
+                target = min(len(words), received // self.bytes_per_word)
+                if target > revealed:
+                    revealed = target
+                    connection.send(
+                        self._results(" ".join(words[:revealed]), False)
+                    )
+                continue
+
+            kind = json.loads(message).get("type")
+            if kind == "KeepAlive":
+                self.keepalives += 1
+            elif kind == "CloseStream":
+                break
+
+        time.sleep(self.finalize_delay)
+        if received:
+            connection.send(self._results(self.transcript, True))
+        connection.send(
+            json.dumps({"type": "Metadata", "duration": received / 32000})
+        )
+        connection.close()
+
+    # ---------- Lifecycle ----------
+
+    def start(self) -> "MockLiveServer":
+        """Start serving on a background thread."""
+        self.server = serve(self._handle, self.host, self.port)
+        self.port = self.server.socket.getsockname()[1]
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        if self.server:
+            self.server.shutdown()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--transcript", default="hello from the mock transcription server"
+    )
+    parser.add_argument("--bytes-per-word", type=int, default=8000)
+    parser.add_argument("--finalize-delay", type=float, default=0.05)
+    parser.add_argument("--idle-timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    server = MockLiveServer(
+        transcript=args.transcript,
+        host=args.host,
+        port=args.port,
+        bytes_per_word=args.bytes_per_word,
+        finalize_delay=args.finalize_delay,
+        idle_timeout=args.idle_timeout,
+    )
+    server.start()
+    print(f"Mock Deepgram live server listening on {server.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Batch transcription and synthesis: many files or prompts through a bounded
+thread pool, with rate limiting, incremental output and resumable progress
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, Optional, Set
+from ..services.deepgram import DeepgramService
+from ..utils.logger import Logger
+import config
+
+UNSAFE_NAME = re.compile(r"[^\w.-]+")
+
+
+@dataclass
+class BatchItem:
+    """One file to transcribe or prompt to synthesize."""
+    id: str
+    path: Optional[str] = None
+    text: Optional[str] = None
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all workers: `rate` acquisitions per second,
+    bursts up to `burst`. Given to the Resilience layer (`limiter=`), so
+    retries and hedged requests are limited too.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available (returns at once when unlimited)."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_for = (1 - self.tokens) / self.rate
+            time.sleep(wait_for)
+
+
+def safe_name(item_id: str) -> str:
+    """
+    A file name for an item id. A short hash of the id is appended, so ids
+    that sanitize alike (e.g. "a/b" and "a_b") do not overwrite each other.
+    """
+    digest = hashlib.sha256(item_id.encode("utf-8")).hexdigest()[:8]
+    return f"{UNSAFE_NAME.sub('_', item_id).strip('._') or 'item'}-{digest}"
+
+
+def audio_items(source: str) -> Iterator[BatchItem]:
+    """
+    WAV files to transcribe, lazily: every *.wav under a directory (ids are
+    relative paths without the extension), or a manifest with one path per
+    line or JSON lines {"id": ..., "path": ...} (relative to the manifest).
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(".wav"):
+                    path = os.path.join(root, name)
+                    item_id = os.path.splitext(os.path.relpath(path, source))[0]
+                    yield BatchItem(item_id.replace(os.sep, "/"), path=path)
+        return
+
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                entry = json.loads(line)
+                path = entry["path"]
+                item_id = entry.get("id") or os.path.splitext(path)[0]
+            else:
+                path = line
+                item_id = os.path.splitext(line)[0]
+            yield BatchItem(str(item_id), path=os.path.join(base, path))
+
+
+def text_items(source: str) -> Iterator[BatchItem]:
+    """
+    Prompts to synthesize, lazily: one per line, or JSON lines
+    {"id": ..., "text": ...}. Plain lines get an id derived from their text,
+    so editing the file does not renumber (and re-render) the rest.
+    """
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                entry = json.loads(line)
+                text = entry["text"]
+                item_id = entry.get("id")
+            else:
+                text, item_id = line, None
+            if not item_id:
+                item_id = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+            yield BatchItem(str(item_id), text=text)
+
+
+def completed_ids(output: str) -> Set[str]:
+    """Ids already processed successfully according to a results file."""
+    done: Set[str] = set()
+    if not os.path.exists(output):
+        return done
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by an interrupted run
+                continue
+            if record.get("status") == "ok":
+                done.add(record["id"])
+    return done
+
+
+class BatchRunner:
+    """
+    Runs items through a DeepgramService on a bounded pool (rate limited
+    by its Resilience layer, see RateLimiter). At most
+    `workers` items are in flight and the source is consumed lazily, so
+    manifests of any size stream through in constant memory. Results are
+    appended to a JSON lines file as each item finishes; items recorded
+    there as "ok" are skipped on the next run, so an interrupted batch
+    resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        deepgram: DeepgramService,
+        logger: Logger,
+        output: str,
+        workers: int = config.BATCH_WORKERS,
+        progress_every: int = config.BATCH_PROGRESS_EVERY,
+        progress_callback: Optional[Callable[[Dict], None]] = None,
+    ):
+        """
+        :param output: Results file (JSON lines), appended to
+        :param workers: Items processed concurrently
+        :param progress_callback: Called with the counters every `progress_every` items
+        """
+        self.deepgram = deepgram
+        self.logger = logger
+        self.output = output
+        self.workers = workers
+        self.progress_every = progress_every
+        self.progress_callback = progress_callback
+        self.counters = {"ok": 0, "failed": 0, "skipped": 0}
+        self.started = time.perf_counter()
+
+    # ---------- Work ----------
+
+    def transcribe(self, item: BatchItem) -> Dict:
+        with open(item.path, "rb") as f:
+            audio = f.read()
+        start = time.perf_counter()
+        transcript = self.deepgram.transcribe(audio)
+        return {
+            "id": item.id,
+            "path": item.path,
+            # "" is a file without speech, not a failure
+            "status": "ok" if transcript is not None else "failed",
+            "transcript": transcript,
+            "bytes": len(audio),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+    def synthesize(self, item: BatchItem, audio_dir: str) -> Dict:
+        start = time.perf_counter()
+        audio = self.deepgram.synthesize(item.text)
+        record = {
+            "id": item.id,
+            "text": item.text,
+            "status": "failed",
+            "path": None,
+            "bytes": 0,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        if audio:
+            path = os.path.join(audio_dir, f"{safe_name(item.id)}.wav")
+            # Write then rename: an interrupted run never leaves a truncated WAV
+            partial = f"{path}.part"
+            with open(partial, "wb") as f:
+                f.write(audio)
+            os.replace(partial, path)
+            record.update(status="ok", path=path, bytes=len(audio))
+        return record
+
+    # ---------- Driving ----------
+
+    def run(self, items: Iterable[BatchItem], work: Callable[[BatchItem], Dict]) -> Dict:
+        """
+        Process `items` with `work`, appending one result line per item.
+        Returns the counters; safe to interrupt (Ctrl+C) and run again.
+        """
+        done = completed_ids(self.output)
+        if done:
+            self.logger.info(f"Resuming: {len(done)} items already done")
+        directory = os.path.dirname(os.path.abspath(self.output))
+        os.makedirs(directory, exist_ok=True)
+
+        pending: Set[Future] = set()
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch")
+        try:
+            with open(self.output, "a", encoding="utf-8") as out:
+                for item in items:
+                    if item.id in done:
+                        self.counters["skipped"] += 1
+                        continue
+                    # Bounded: never more than `workers` items read ahead
+                    while len(pending) >= self.workers:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        self._write(out, finished)
+                    done.add(item.id)  # duplicate ids in the source run once
+                    pending.add(executor.submit(self._attempt, work, item))
+                while pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self._write(out, finished)
+        finally:
+            # On interrupt, drop queued work; unfinished items run again next time
+            executor.shutdown(wait=True, cancel_futures=True)
+        return self.stats()
+
+    def _attempt(self, work: Callable[[BatchItem], Dict], item: BatchItem) -> Dict:
+        try:
+            return work(item)
+        except Exception as e:
+            self.logger.error(f"Batch item {item.id} failed: {str(e)}")
+            return {"id": item.id, "status": "failed", "error": str(e)}
+
+    def _write(self, out, finished: Set[Future]):
+        for future in finished:
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.counters[record["status"]] += 1
+        # Flushed per batch of completions so progress survives a crash
+        out.flush()
+        processed = self.counters["ok"] + self.counters["failed"]
+        if self.progress_callback and processed % self.progress_every < len(finished):
+            self.progress_callback(self.stats())
+
+    def stats(self) -> Dict:
+        """Counters and throughput of this run."""
+        elapsed = time.perf_counter() - self.started
+        processed = self.counters["ok"] + self.counters["failed"]
+        return {
+            **self.counters,
+            "elapsed": elapsed,
+            "items_per_second": processed / elapsed if elapsed else 0.0,
+        }
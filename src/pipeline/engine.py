@@ -0,0 +1,313 @@
+"""
+Asyncio pipeline engine.
+
+Stages are connected by bounded queues: each stage takes items from its
+inbox, runs its (blocking) handler on a worker thread and puts the results
+into the next stage's inbox. A full inbox blocks the upstream stage, which
+gives backpressure; stages run concurrently, so e.g. TTS of one sentence
+overlaps generation of the next.
+
+Handlers run on the pipeline's executor, if one is given (e.g. a pool
+shared by all sessions of a server), or else on one owned by the run.
+Either way, handler threads see the caller's context vars (trace,
+deadline). A stage timeout or a cancel abandons the handler's result
+without waiting for its thread: the run returns at once and the handler
+finishes (or notices the cancel token or its deadline) in the background.
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any, Callable, Dict, Generic, Iterable, List, Optional, TypeVar,
+)
+from ..utils.deadline import deadline
+from ..utils.logger import Logger
+
+In = TypeVar("In")
+Out = TypeVar("Out")
+
+# End-of-stream marker passed down the queues
+_END = object()
+
+
+class StageTimeout(Exception):
+    """A stage took longer than its timeout to process an item."""
+
+    def __init__(self, stage: str, timeout: float):
+        super().__init__(f"Stage '{stage}' timed out after {timeout:.1f}s")
+        self.stage = stage
+        self.timeout = timeout
+
+
+class PipelineCancelled(Exception):
+    """The pipeline was cancelled while running."""
+
+
+class CancelToken:
+    """Thread-safe cancellation flag shared by all stages of a run."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def add_callback(self, callback: Callable[[], None]):
+        """Register a callback run once on cancellation (e.g. stop a recorder)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def cancel(self):
+        """Cancel the run and fire the registered callbacks."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise PipelineCancelled()
+
+
+@dataclass
+class Stage(Generic[In, Out]):
+    """
+    A pipeline stage.
+
+    :param name: Stage name used in events and timings
+    :param handler: Blocking callable taking one input item. Returns one output,
+        or None to drop the item. With `streaming=True` it returns an iterable
+        and every yielded value is passed downstream as soon as it is produced.
+    :param timeout: Max seconds to process one input item (None = no limit);
+        propagated to the handler as its deadline (see src/utils/deadline.py).
+        For a streaming handler it bounds the wait for the first output and
+        between outputs; time blocked on a full downstream queue is not counted
+    :param queue_size: Capacity of the stage's inbox
+    :param streaming: Whether the handler yields several outputs per input
+    """
+    name: str
+    handler: Callable[[In], Any]
+    timeout: Optional[float] = None
+    queue_size: int = 4
+    streaming: bool = False
+
+
+@dataclass
+class PipelineResult:
+    """Outputs of the last stage plus run status and per-stage busy time."""
+    outputs: List[Any] = field(default_factory=list)
+    error: Optional[BaseException] = None
+    cancelled: bool = False
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.cancelled
+
+
+class Pipeline:
+    """Runs items through a chain of stages concurrently."""
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        logger: Logger,
+        event_callback: Optional[Callable[[str, str], None]] = None,
+        executor: Optional[concurrent.futures.Executor] = None,
+    ):
+        """
+        :param stages: Stages in order
+        :param logger: Logger instance
+        :param event_callback: Called with (event, stage_name) for
+            'start', 'output' and 'done' events, from the engine thread
+        :param executor: Runs the stage handlers; not shut down by the
+            pipeline. None = a thread per stage, created for each run
+        """
+        self.stages = stages
+        self.logger = logger
+        self.event_callback = event_callback
+        self.executor = executor
+        self.token = CancelToken()
+
+    def cancel(self):
+        """Cancel the current run (safe to call from any thread)."""
+        self.token.cancel()
+
+    def _emit(self, event: str, stage: str):
+        if self.event_callback:
+            self.event_callback(event, stage)
+
+    # ---------- Stage workers ----------
+
+    async def _put(self, queue: asyncio.Queue, item: Any):
+        """Put an item downstream, giving up if the run is cancelled."""
+        while True:
+            self.token.raise_if_cancelled()
+            try:
+                await asyncio.wait_for(queue.put(item), timeout=0.1)
+                return
+            except asyncio.TimeoutError:
+                continue
+
+    @staticmethod
+    def _submit(executor: concurrent.futures.Executor, func, *args
+                ) -> concurrent.futures.Future:
+        """Submit `func` to the run's executor with the current context vars."""
+        return executor.submit(contextvars.copy_context().run, func, *args)
+
+    async def _call(self, stage: Stage, executor: concurrent.futures.Executor,
+                    func, *args, submitted: Optional[list] = None):
+        """Run one blocking call for `stage` on a worker thread, within its timeout."""
+        # The stage timeout is also the deadline service calls see, so
+        # retries and network timeouts stop within the stage's budget
+        with deadline(stage.timeout):
+            future = self._submit(executor, func, *args)
+        if submitted is not None:
+            submitted.append(future)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), stage.timeout)
+        except asyncio.TimeoutError:
+            raise StageTimeout(stage.name, stage.timeout)
+
+    async def _stream(self, stage: Stage, item: Any, outbox: asyncio.Queue,
+                      executor: concurrent.futures.Executor):
+        """Pass a streaming handler's outputs downstream as they are produced."""
+        outputs = iter(await self._call(stage, executor, stage.handler, item) or ())
+        # Each output is pulled on a worker thread and put downstream from the
+        # loop, so no thread is held while the outbox is full and the timeout
+        # covers only the wait for the first output and between outputs
+        steps: List[concurrent.futures.Future] = []
+        try:
+            while True:
+                self.token.raise_if_cancelled()
+                output = await self._call(
+                    stage, executor, next, outputs, _END, submitted=steps
+                )
+                if output is _END:
+                    return
+                await self._put(outbox, output)
+                self._emit("output", stage.name)
+        finally:
+            close = getattr(outputs, "close", None)
+            if close:
+                if steps and not steps[-1].done():
+                    # An abandoned step is still running: close the generator
+                    # once it returns, on that step's thread
+                    steps[-1].add_done_callback(lambda _: close())
+                else:
+                    close()
+
+    async def _process(self, stage: Stage, item: Any, outbox: asyncio.Queue,
+                       executor: concurrent.futures.Executor):
+        if stage.streaming:
+            await self._stream(stage, item, outbox, executor)
+            return
+
+        output = await self._call(stage, executor, stage.handler, item)
+        if output is not None:
+            await self._put(outbox, output)
+            self._emit("output", stage.name)
+
+    async def _run_stage(self, stage: Stage, inbox: asyncio.Queue,
+                         outbox: asyncio.Queue, timings: Dict[str, float],
+                         executor: concurrent.futures.Executor):
+        started = False
+        while True:
+            item = await inbox.get()
+            if item is _END:
+                await self._put(outbox, _END)
+                self._emit("done", stage.name)
+                return
+
+            self.token.raise_if_cancelled()
+            if not started:
+                started = True
+                self._emit("start", stage.name)
+
+            begin = time.perf_counter()
+            try:
+                await self._process(stage, item, outbox, executor)
+            finally:
+                timings[stage.name] = (
+                    timings.get(stage.name, 0.0) + time.perf_counter() - begin
+                )
+
+    async def _feed(self, inputs: Iterable[Any], inbox: asyncio.Queue):
+        for item in inputs:
+            await self._put(inbox, item)
+        await self._put(inbox, _END)
+
+    async def _collect(self, inbox: asyncio.Queue, outputs: List[Any]):
+        while True:
+            item = await inbox.get()
+            if item is _END:
+                return
+            outputs.append(item)
+
+    # ---------- Running ----------
+
+    async def run_async(self, inputs: Iterable[Any]) -> PipelineResult:
+        """Run all inputs through the pipeline and return the final outputs."""
+        result = PipelineResult()
+        queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        queues.append(asyncio.Queue())
+        executor = self.executor
+        if executor is None:
+            # Each stage handles one item at a time, so one thread per stage
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(self.stages), thread_name_prefix="stage"
+            )
+
+        tasks = [asyncio.create_task(self._feed(inputs, queues[0]))]
+        for i, stage in enumerate(self.stages):
+            tasks.append(asyncio.create_task(
+                self._run_stage(
+                    stage, queues[i], queues[i + 1], result.timings, executor
+                )
+            ))
+        tasks.append(asyncio.create_task(self._collect(queues[-1], result.outputs)))
+
+        try:
+            await asyncio.gather(*tasks)
+        except PipelineCancelled:
+            result.cancelled = True
+        except asyncio.CancelledError:
+            # The run itself was cancelled (e.g. Ctrl+C under asyncio.run)
+            result.cancelled = True
+            raise
+        except Exception as e:
+            result.error = e
+            self.logger.error(f"Pipeline error: {str(e)}")
+        finally:
+            if not result.ok:
+                self.token.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if executor is not self.executor:
+                # After a timeout, error or cancel, do not wait for handlers
+                # that are still running; their results are discarded
+                executor.shutdown(wait=result.ok, cancel_futures=True)
+
+        if self.token.cancelled and result.error is None:
+            result.cancelled = True
+        return result
+
+    def run(self, inputs: Iterable[Any]) -> PipelineResult:
+        """Blocking wrapper around `run_async`."""
+        return asyncio.run(self.run_async(inputs))
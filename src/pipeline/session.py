@@ -0,0 +1,264 @@
+"""
+Hands-free conversation session: listen -> answer -> listen, on a worker thread
+"""
+import threading
+from dataclasses import dataclass, replace
+from typing import List, Optional
+from .voice import Utterance, VoicePipeline, VoiceTurnResult
+from ..audio.player import merge_wav_clips
+from ..audio.vad import PlaybackGate
+from ..audio.wav import wav_duration
+from ..utils.logger import Logger
+from ..utils.tracing import Tracer
+import config
+
+
+@dataclass(frozen=True)
+class SessionSnapshot:
+    """Immutable view of the session, safe to read from the UI thread."""
+    running: bool = False
+    status: str = "idle"
+    transcript: str = ""
+    response: str = ""
+    audio_data: Optional[bytes] = None
+    latency: Optional[dict] = None
+    # Utterances run through the pipeline, answered or not
+    turns: int = 0
+    barge_ins: int = 0
+    version: int = 0
+    error: Optional[str] = None
+
+
+class ConversationSession:
+    """
+    Runs voice turns back to back on a background thread, reusing one
+    VoicePipeline (and its recorder and services) for every turn.
+
+    The UI polls `snapshot()` instead of rerunning the app per turn; each
+    change bumps `version` so readers can skip redundant redraws.
+
+    With barge-in, the next utterance is captured while the current one is
+    being answered: as soon as it is heard, the answer is cancelled (LLM
+    stream closed, playback stopped) and the new utterance is answered next.
+    There is no echo cancellation, so while a reply plays the recorder's VAD
+    is wrapped in a PlaybackGate (louder, sustained speech only). Barge-in
+    needs the pipeline's local player: replies played elsewhere (the
+    browser) can be neither gated nor stopped, so it is disabled then.
+    With `remote_playback` the session instead waits out each reply (status
+    'playing') before listening again, so the microphone does not pick it up.
+    """
+
+    def __init__(
+        self,
+        voice: VoicePipeline,
+        logger: Logger,
+        tracer: Optional[Tracer] = None,
+        max_turns: int = 0,
+        idle_turns: int = config.CONTINUOUS_IDLE_TURNS,
+        barge_in: bool = config.BARGE_IN_ENABLED,
+        remote_playback: bool = False,
+        remote_playback_margin: float = config.REMOTE_PLAYBACK_MARGIN,
+    ):
+        """
+        :param voice: Pipeline used for every turn (its status_callback is replaced)
+        :param tracer: Receives each turn's trace
+        :param max_turns: Stop after this many turns, answered or not (0 = no limit)
+        :param idle_turns: Stop after this many consecutive turns without speech
+            (0 = never)
+        :param barge_in: Keep listening while answering; speech interrupts the answer
+            (only with a local player on the pipeline)
+        :param remote_playback: Replies are played elsewhere (e.g. autoplayed
+            by the browser); wait for their duration before listening again
+        :param remote_playback_margin: Extra seconds waited per reply, for the
+            player to pick it up and start
+        """
+        self.voice = voice
+        self.logger = logger
+        self.tracer = tracer
+        self.max_turns = max_turns
+        self.idle_turns = idle_turns
+        self.barge_in = barge_in and voice.player is not None
+        self.remote_playback = remote_playback and voice.player is None
+        self.remote_playback_margin = remote_playback_margin
+
+        if self.barge_in and not isinstance(voice.recorder.vad, PlaybackGate):
+            player = voice.player
+            voice.recorder.vad = PlaybackGate(
+                voice.recorder.vad, lambda: getattr(player, "playing", False)
+            )
+        self.voice.status_callback = self._on_turn_status
+        self._snapshot = SessionSnapshot()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Barge-in monitor: captures the next utterance during a turn
+        self._answering = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        self._monitored: List[Optional[Utterance]] = []
+
+    # ---------- State channel ----------
+
+    def _update(self, *counters: str, **changes):
+        """Replace the snapshot, adding one to each field named in `counters`."""
+        with self._lock:
+            for name in counters:
+                changes[name] = getattr(self._snapshot, name) + 1
+            self._snapshot = replace(
+                self._snapshot, version=self._snapshot.version + 1, **changes
+            )
+
+    def _set_status(self, status: str):
+        self._update(status=status)
+
+    def snapshot(self) -> SessionSnapshot:
+        """Latest session state."""
+        with self._lock:
+            return self._snapshot
+
+    # ---------- Control ----------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the conversation loop (no-op if already running)."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._update(running=True, status="starting", error=None)
+        self._thread = threading.Thread(
+            target=self._run, name="conversation-session", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop after cancelling the turn in progress."""
+        self._stop.set()
+        self.voice.cancel()
+        self.voice.recorder.stop()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    # ---------- Barge-in ----------
+
+    def _on_turn_status(self, status: str):
+        self._set_status(status)
+        if status == "thinking" and self.barge_in and self._monitor is None:
+            # The utterance is transcribed: the recorder is free to listen again
+            self._monitored = []
+            self._monitor = threading.Thread(
+                target=self._listen_ahead, name="barge-in-monitor", daemon=True
+            )
+            self._monitor.start()
+
+    def _listen_ahead(self):
+        try:
+            self._monitored.append(self.voice.listen(
+                self._on_monitor_status, hold_speculation=self._answering.is_set
+            ))
+        except Exception as e:
+            self.logger.error(f"Barge-in monitor error: {str(e)}")
+
+    def _on_monitor_status(self, status: str):
+        if status != "speaking":
+            return
+        if self._answering.is_set():
+            self.logger.info("Barge-in: interrupting the response")
+            self._update("barge_ins")
+            self.voice.cancel()
+        self._set_status("speaking")
+
+    def _await_monitor(self) -> Optional[Utterance]:
+        """Wait for the utterance captured during the last turn."""
+        monitor, self._monitor = self._monitor, None
+        if monitor.is_alive() and self._snapshot.status != "speaking":
+            self._set_status("listening")
+        while monitor.is_alive():
+            monitor.join(0.1)
+            if self._stop.is_set():
+                self.voice.recorder.stop()
+        return self._monitored[0] if self._monitored else None
+
+    # ---------- Worker ----------
+
+    def _run(self):
+        self.logger.info("Hands-free session started")
+        idle = 0
+        utterance = None
+        try:
+            while not self._stop.is_set():
+                if utterance is None:
+                    utterance = self.voice.listen()
+                    if self._stop.is_set():
+                        break
+                if utterance is None:
+                    idle += 1
+                    if self.idle_turns and idle >= self.idle_turns:
+                        self.logger.info("No speech for a while, ending session")
+                        break
+                    continue
+                idle = 0
+
+                self._answering.set()
+                try:
+                    result = self.voice.run(utterance)
+                finally:
+                    self._answering.clear()
+                utterance = None
+
+                if self._stop.is_set():
+                    break
+                # Publish before waiting on the monitor, which may listen for seconds
+                self._publish(result)
+                if self.max_turns and self._snapshot.turns >= self.max_turns:
+                    break
+                if self.remote_playback and result.audio_clips:
+                    self._wait_for_playback(result.audio_clips)
+
+                # The monitor's capture (if any) is the next turn's utterance
+                if self._monitor is not None:
+                    utterance = self._await_monitor()
+                    if utterance is None:
+                        idle += 1
+        except Exception as e:
+            self.logger.error(f"Session error: {str(e)}")
+            self._update(error=str(e))
+        finally:
+            if self._monitor is not None:
+                # Nobody will answer what it captures
+                self.voice.recorder.stop()
+                utterance = self._await_monitor()
+            if utterance is not None and utterance.live:
+                utterance.live.close()
+            self.voice.recorder.cleanup()
+            self._update(running=False, status="idle")
+            self.logger.info("Hands-free session stopped")
+
+    def _wait_for_playback(self, clips: List[bytes]):
+        """Hold (interruptibly) while a reply plays outside the pipeline."""
+        try:
+            duration = sum(wav_duration(clip) for clip in clips)
+        except Exception as e:
+            self.logger.warning(f"Could not read reply duration: {str(e)}")
+            return
+        self._set_status("playing")
+        self._stop.wait(duration + self.remote_playback_margin)
+
+    def _publish(self, result: VoiceTurnResult):
+        """Fold one finished turn (answered or not) into the snapshot."""
+        changes = {}
+        if result.transcript:
+            changes["transcript"] = result.transcript
+        if result.response:
+            changes["response"] = result.response
+            changes["latency"] = result.metrics()
+            changes["audio_data"] = None
+            if result.audio_clips:
+                with result.trace.span("save"):
+                    changes["audio_data"] = merge_wav_clips(result.audio_clips)
+        self._update("turns", **changes)
+
+        if self.tracer and result.trace.spans:
+            self.tracer.finish(result.trace)
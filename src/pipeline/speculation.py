@@ -0,0 +1,253 @@
+"""
+Speculative LLM requests on stable interim transcripts
+"""
+import contextvars
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+from .engine import CancelToken
+from ..services.groq import GroqService
+from ..services.memory import ConversationMemory, MESSAGE_OVERHEAD, estimate_tokens
+from ..utils.logger import Logger
+from ..utils.text import normalize_transcript
+import config
+
+# End-of-stream marker on a speculation's token queue
+_DONE = None
+
+
+class SpeculationStats:
+    """Outcome counters shared by all speculators (thread-safe)."""
+
+    def __init__(self):
+        self.launched = 0
+        self.hits = 0
+        self.wasted = 0
+        self.wasted_prompt_tokens = 0
+        self.wasted_completion_tokens = 0
+        self.head_start = 0.0
+        self._lock = threading.Lock()
+
+    def record_launch(self):
+        with self._lock:
+            self.launched += 1
+
+    def record_hit(self, head_start: float):
+        with self._lock:
+            self.hits += 1
+            self.head_start += head_start
+
+    def record_waste(self, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            self.wasted += 1
+            self.wasted_prompt_tokens += prompt_tokens
+            self.wasted_completion_tokens += completion_tokens
+
+    def stats(self) -> Dict:
+        """Hit rate, wasted token cost and mean head start of hits."""
+        with self._lock:
+            return {
+                "launched": self.launched,
+                "hits": self.hits,
+                "wasted": self.wasted,
+                "hit_rate": self.hits / self.launched if self.launched else 0.0,
+                "wasted_prompt_tokens": self.wasted_prompt_tokens,
+                "wasted_completion_tokens": self.wasted_completion_tokens,
+                "mean_head_start_ms": round(
+                    1000 * self.head_start / self.hits, 1
+                ) if self.hits else 0.0,
+            }
+
+
+class Speculation:
+    """One speculative streaming request; tokens are buffered until taken."""
+
+    def __init__(
+        self,
+        groq: GroqService,
+        text: str,
+        history: Optional[List[Dict]],
+        prompt_tokens: int,
+    ):
+        self.text = text
+        self.key = normalize_transcript(text)
+        self.history = history
+        self.prompt_tokens = prompt_tokens
+        self.started = time.perf_counter()
+        self.token = CancelToken()
+        self.parts: List[str] = []
+        # Set if the request failed or the stream was cut short
+        self.error: Optional[str] = None
+        self._tokens: "queue.Queue[Optional[str]]" = queue.Queue()
+        # Carries the caller's trace (and deadline) into the request
+        self._thread = threading.Thread(
+            target=contextvars.copy_context().run, args=(self._run, groq),
+            name="llm-speculation", daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self, groq: GroqService):
+        try:
+            for token in groq.chat_stream(
+                self.text, self.history, cancel=self.token, on_error=self._failed
+            ):
+                self.parts.append(token)
+                self._tokens.put(token)
+        finally:
+            self._tokens.put(_DONE)
+
+    def _failed(self, error: str):
+        self.error = error
+
+    def stream(self) -> Iterator[str]:
+        """Yield buffered tokens, then the rest as they arrive."""
+        while True:
+            token = self._tokens.get()
+            if token is _DONE:
+                return
+            yield token
+
+    def completion_tokens(self) -> int:
+        return estimate_tokens("".join(self.parts))
+
+    def cancel(self):
+        self.token.cancel()
+
+
+class Speculator:
+    """
+    Watches the running transcript of one utterance. Once it has not changed
+    for `stable_time`, starts the Groq request for it ahead of the endpoint;
+    `take` commits that request if the final transcript (and history) match,
+    otherwise cancels it and counts the tokens it cost.
+    Transcript callbacks arrive on the live socket's reader thread; timers
+    and requests run in the context of the thread that created the
+    speculator (the turn's trace and deadline).
+    """
+
+    def __init__(
+        self,
+        groq: GroqService,
+        logger: Logger,
+        stats: SpeculationStats,
+        memory: Optional[ConversationMemory] = None,
+        stable_time: float = config.SPECULATION_STABLE_TIME,
+        min_words: int = config.SPECULATION_MIN_WORDS,
+        max_attempts: int = config.SPECULATION_MAX_ATTEMPTS,
+        hold: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        :param stats: Shared outcome counters
+        :param memory: Conversation history the request is sent with
+        :param stable_time: Seconds the transcript must stay unchanged
+        :param min_words: Don't speculate on shorter transcripts
+        :param max_attempts: Speculative requests allowed per utterance
+        :param hold: While it returns True, launching is postponed; e.g. the
+            previous turn is still being answered (barge-in), so the history
+            is about to change and a request sent now could never match
+        """
+        self.groq = groq
+        self.logger = logger
+        self.stats = stats
+        self.memory = memory
+        self.stable_time = stable_time
+        self.min_words = min_words
+        self.max_attempts = max_attempts
+        self.hold = hold
+        self._context = contextvars.copy_context()
+
+        self.attempts = 0
+        self.active: Optional[Speculation] = None
+        self._candidate = ""
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _history(self) -> Optional[List[Dict]]:
+        return self.memory.history() if self.memory else None
+
+    def _prompt_tokens(self, text: str) -> int:
+        if self.memory:
+            return self.memory.prompt_tokens(text)
+        return estimate_tokens(text) + MESSAGE_OVERHEAD
+
+    def on_transcript(self, text: str):
+        """Running-transcript callback (see LiveTranscription)."""
+        key = normalize_transcript(text)
+        with self._lock:
+            if self._closed or key == self._candidate:
+                return
+            self._candidate = key
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if self.active and self.active.key != key:
+                # The user kept talking: the request is for a stale transcript
+                self._discard()
+            if len(key.split()) < self.min_words or self.attempts >= self.max_attempts:
+                return
+            self._schedule(text, key)
+
+    def _schedule(self, text: str, key: str):
+        # A fresh copy each time: a context can only be entered by one thread
+        self._timer = threading.Timer(
+            self.stable_time, self._context.copy().run, (self._launch, text, key)
+        )
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _launch(self, text: str, key: str):
+        with self._lock:
+            if self._closed or key != self._candidate or self.active:
+                return
+            if self.hold and self.hold():
+                # Try again once the hold is likely over
+                self._schedule(text, key)
+                return
+            self.attempts += 1
+            self.stats.record_launch()
+            self.logger.info(f'Speculating on: "{text}"')
+            self.active = Speculation(
+                self.groq, text, self._history(), self._prompt_tokens(text)
+            )
+
+    def _discard(self):
+        speculation, self.active = self.active, None
+        speculation.cancel()
+        self.stats.record_waste(
+            speculation.prompt_tokens, speculation.completion_tokens()
+        )
+
+    def take(self, transcript: str) -> Optional[Speculation]:
+        """Commit the speculation for the final transcript, or None on a miss."""
+        with self._lock:
+            self._close()
+            speculation = self.active
+            if speculation is None:
+                return None
+            if (
+                speculation.key == normalize_transcript(transcript)
+                and speculation.history == self._history()
+            ):
+                self.active = None
+                head_start = time.perf_counter() - speculation.started
+                self.stats.record_hit(head_start)
+                self.logger.info(f"Speculation hit ({head_start * 1000:.0f} ms ahead)")
+                return speculation
+            self.logger.info("Speculation missed, discarding")
+            self._discard()
+            return None
+
+    def _close(self):
+        self._closed = True
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def cancel(self):
+        """Stop speculating and discard any request in flight."""
+        with self._lock:
+            self._close()
+            if self.active:
+                self._discard()
@@ -0,0 +1,369 @@
+"""
+Voice turn pipeline: capture -> transcribe -> respond -> synthesize
+"""
+import asyncio
+import concurrent.futures
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional
+from .engine import Pipeline, PipelineResult, Stage
+from .speculation import SpeculationStats, Speculator
+from ..audio.player import AudioPlayer
+from ..audio.preprocess import UploadPreprocessor
+from ..audio.recorder import AudioRecorder
+from ..audio.vad import VAD_BACKENDS
+from ..services.deepgram import DeepgramService, LiveTranscription
+from ..services.groq import GroqService
+from ..services.memory import ConversationMemory
+from ..utils.logger import Logger
+from ..utils.segmenter import SentenceSegmenter
+from ..utils.tracing import Trace, activate, span
+import config
+
+
+@dataclass
+class Utterance:
+    """Captured speech (zero-copy WAV view), plus the live session if streaming."""
+    audio: memoryview
+    live: Optional[LiveTranscription] = None
+    speculator: Optional[Speculator] = None
+    # End of speech (perf_counter / perf_counter_ns), the latency origin
+    end: float = field(default_factory=time.perf_counter)
+    end_ns: int = field(default_factory=time.perf_counter_ns)
+
+
+@dataclass
+class VoiceTurnResult:
+    """Outcome of one voice turn, with latency measurements (seconds)."""
+    transcript: Optional[str] = None
+    response: Optional[str] = None
+    sentences: List[str] = field(default_factory=list)
+    audio_clips: List[bytes] = field(default_factory=list)
+    time_to_first_token: Optional[float] = None
+    time_to_first_audio: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    # Batch STT upload (None when the audio was streamed live)
+    upload_bytes: Optional[int] = None
+    upload_saved_bytes: Optional[int] = None
+    upload_time: Optional[float] = None
+    # The LLM request failed or its stream was cut short (the reply may be partial)
+    llm_error: Optional[str] = None
+    pipeline: Optional[PipelineResult] = None
+    trace: Optional[Trace] = None
+
+    def metrics(self) -> dict:
+        """Per-turn latency and size figures, e.g. for the UI or a client."""
+        return {
+            "ttft": self.time_to_first_token,
+            "ttfa": self.time_to_first_audio,
+            "prompt_tokens": self.prompt_tokens,
+            "upload_bytes": self.upload_bytes,
+            "upload_saved_bytes": self.upload_saved_bytes,
+            "upload_time": self.upload_time,
+        }
+
+
+class VoicePipeline:
+    """
+    Runs one voice interaction as a concurrent pipeline. The LLM reply is
+    split into sentences and each is synthesized while generation continues.
+    With a player, each clip is also played locally as soon as it is ready;
+    cancelling the turn stops playback and closes the LLM stream.
+    With a memory, earlier turns are sent as history and each turn is
+    remembered (an interrupted reply is kept as far as it got).
+    With speculation stats, the LLM request may start on a stable interim
+    transcript before the endpoint (see speculation.py).
+    """
+
+    def __init__(
+        self,
+        recorder: Optional[AudioRecorder],
+        deepgram: DeepgramService,
+        groq: GroqService,
+        logger: Logger,
+        status_callback: Optional[Callable[[str], None]] = None,
+        timeouts: Optional[dict] = None,
+        queue_size: int = config.PIPELINE_QUEUE_SIZE,
+        player: Optional[AudioPlayer] = None,
+        memory: Optional[ConversationMemory] = None,
+        speculation: Optional[SpeculationStats] = None,
+        preprocessor: Optional[UploadPreprocessor] = None,
+        executor: Optional[concurrent.futures.Executor] = None,
+    ):
+        """
+        :param recorder: Microphone capture; may be None if every run is given
+            an already captured utterance (e.g. audio received over a network)
+        :param status_callback: Receives 'listening', 'speaking', 'thinking'
+            and 'responding' as the turn progresses
+        :param player: Plays each synthesized clip locally (adds a 'play' stage);
+            anything with play(clip), stop() and reset() will do
+        :param memory: Conversation history shared across turns
+        :param speculation: Enables speculative LLM requests (needs streaming
+            STT and LLM) and collects their outcomes
+        :param preprocessor: Trims/re-encodes audio uploaded for batch STT
+            (defaults to one using the recorder's VAD backend and threshold)
+        :param executor: Runs the stage handlers (e.g. a pool shared by all
+            sessions of a server); None = a thread per stage for each turn
+        :param timeouts: Per-stage timeouts (seconds), keyed by stage name
+        :param queue_size: Capacity of each inter-stage queue
+        """
+        self.recorder = recorder
+        self.deepgram = deepgram
+        self.groq = groq
+        self.logger = logger
+        self.status_callback = status_callback
+        self.timeouts = {**config.PIPELINE_STAGE_TIMEOUTS, **(timeouts or {})}
+        self.queue_size = queue_size
+        self.player = player
+        self.memory = memory
+        self.speculation = speculation
+        self.executor = executor
+        if preprocessor is None:
+            backend = getattr(recorder, "vad", None)
+            backend = getattr(backend, "name", config.DEFAULT_VAD_BACKEND)
+            preprocessor = UploadPreprocessor(
+                recorder.vad_threshold if recorder else config.DEFAULT_VAD_THRESHOLD,
+                vad_backend=backend if backend in VAD_BACKENDS else config.DEFAULT_VAD_BACKEND,
+            )
+        self.preprocessor = preprocessor
+        self._speculator: Optional[Speculator] = None
+
+        self.pipeline: Optional[Pipeline] = None
+        self.result = VoiceTurnResult()
+        self._start = 0.0
+        self._start_ns = 0
+
+    def _status(self, status: str):
+        if self.status_callback:
+            self.status_callback(status)
+
+    # ---------- Stages ----------
+
+    def listen(
+        self,
+        status_callback: Optional[Callable[[str], None]] = None,
+        on_live: Optional[Callable[[LiveTranscription], None]] = None,
+        hold_speculation: Optional[Callable[[], bool]] = None,
+    ) -> Optional[Utterance]:
+        """
+        Capture one utterance, streaming it to live STT if configured.
+        Also usable outside a run, e.g. to capture the next utterance while
+        the current one is still being answered (barge-in); pass
+        `hold_speculation` then, so no speculative request is sent until
+        that turn is in the history.
+        """
+        speculator = (
+            Speculator(
+                self.groq, self.logger, self.speculation, self.memory,
+                hold=hold_speculation,
+            )
+            if self.speculation is not None
+            and config.STREAMING_STT and config.STREAMING_LLM else None
+        )
+        # Open the live socket before listening so the handshake overlaps capture
+        live = (
+            self.deepgram.start_live_transcription(
+                speculator.on_transcript if speculator else None
+            )
+            if config.STREAMING_STT else None
+        )
+        if live and on_live:
+            on_live(live)
+
+        with span("capture"):
+            audio = self.recorder.record_with_vad(
+                status_callback or self._status,
+                chunk_callback=live.send if live else None,
+            )
+        if not audio:
+            if live:
+                live.close()
+            if speculator:
+                speculator.cancel()
+            return None
+
+        return Utterance(audio, live, speculator)
+
+    def _capture(self, utterance: Optional[Utterance]) -> Optional[Utterance]:
+        token = self.pipeline.token
+        if utterance is None:
+            token.add_callback(self.recorder.stop)
+            utterance = self.listen(
+                on_live=lambda live: token.add_callback(live.close)
+            )
+            if not utterance:
+                return None
+        elif utterance.live:
+            # Captured ahead of the run (see listen)
+            token.add_callback(utterance.live.close)
+
+        self._speculator = utterance.speculator
+        if self._speculator:
+            token.add_callback(self._speculator.cancel)
+
+        self._start = utterance.end
+        self._start_ns = utterance.end_ns
+        return utterance
+
+    def _transcribe(self, utterance: Utterance) -> Optional[str]:
+        with span("stt"):
+            if utterance.live:
+                transcript = utterance.live.finish()
+            else:
+                transcript = self._upload(utterance.audio)
+
+        self.result.transcript = transcript
+        if transcript:
+            self._status("thinking")
+            return transcript
+        if self._speculator:
+            self._speculator.cancel()
+        # Nothing to answer ("" = no speech, None = STT failed)
+        return None
+
+    def _upload(self, audio: memoryview) -> Optional[str]:
+        """Batch STT of a finished recording, shrunk first."""
+        with span("preprocess"):
+            prepared = self.preprocessor.process(audio)
+        transcript = self.deepgram.transcribe(
+            prepared.data, prepared.encoding, prepared.sample_rate
+        )
+
+        upload_ms = self.result.trace.durations().get("upload")
+        self.result.upload_bytes = len(prepared.data)
+        self.result.upload_saved_bytes = prepared.saved_bytes
+        self.result.upload_time = upload_ms / 1000 if upload_ms is not None else None
+        self.logger.info(
+            f"Upload: {len(prepared.data) / 1024:.1f} KB, saved "
+            f"{prepared.saved_bytes / 1024:.1f} KB "
+            f"({prepared.saved_bytes / prepared.original_bytes:.0%}; "
+            f"{prepared.trimmed_seconds:.1f}s trimmed)"
+            + (f" in {upload_ms:.0f} ms" if upload_ms is not None else "")
+        )
+        return transcript
+
+    def _respond(self, transcript: str) -> Iterator[str]:
+        history = None
+        if self.memory:
+            history = self.memory.history()
+            self.result.prompt_tokens = self.memory.prompt_tokens(transcript)
+            self.logger.info(f"Prompt: ~{self.result.prompt_tokens} tokens")
+
+        try:
+            yield from self._generate(transcript, history)
+        finally:
+            if self.memory and self.result.response:
+                self.memory.add_turn(transcript, self.result.response)
+
+    def _generate(self, transcript: str, history: Optional[list]) -> Iterator[str]:
+        if not config.STREAMING_LLM:
+            response = self.groq.chat(transcript, history)
+            self.result.time_to_first_token = time.perf_counter() - self._start
+            if response:
+                self.result.response = response
+                self.result.sentences.append(response)
+                yield response
+            return
+
+        speculation = self._speculator.take(transcript) if self._speculator else None
+        if speculation:
+            self.pipeline.token.add_callback(speculation.cancel)
+            tokens = speculation.stream()
+        else:
+            tokens = self.groq.chat_stream(
+                transcript, history, cancel=self.pipeline.token,
+                on_error=self._llm_failed,
+            )
+
+        segmenter = SentenceSegmenter()
+        parts = []
+        for token in tokens:
+            if self.pipeline.token.cancelled:
+                return
+            if self.result.time_to_first_token is None:
+                self.result.time_to_first_token = time.perf_counter() - self._start
+            parts.append(token)
+            self.result.response = "".join(parts).strip()
+            for sentence in segmenter.feed(token):
+                self.result.sentences.append(sentence)
+                yield sentence
+
+        if speculation and speculation.error:
+            self._llm_failed(speculation.error)
+
+        remainder = segmenter.flush()
+        if remainder:
+            self.result.sentences.append(remainder)
+            yield remainder
+
+    def _llm_failed(self, error: str):
+        self.result.llm_error = error
+
+    def _synthesize(self, sentence: str) -> Optional[bytes]:
+        audio = self.deepgram.synthesize(sentence)
+        if audio and self.result.time_to_first_audio is None:
+            self.result.time_to_first_audio = time.perf_counter() - self._start
+            self._status("responding")
+        return audio
+
+    def _play(self, clip: bytes) -> bytes:
+        self.player.play(clip)
+        return clip
+
+    # ---------- Running ----------
+
+    def build(self) -> Pipeline:
+        """Build the stage chain for one turn."""
+        stages = [
+            Stage("capture", self._capture, self.timeouts.get("capture"), 1),
+            Stage("transcribe", self._transcribe, self.timeouts.get("transcribe"), 1),
+            Stage("respond", self._respond, self.timeouts.get("respond"), 1,
+                  streaming=True),
+            Stage("synthesize", self._synthesize, self.timeouts.get("synthesize"),
+                  self.queue_size),
+        ]
+        if self.player:
+            stages.append(
+                Stage("play", self._play, self.timeouts.get("play"), self.queue_size)
+            )
+        self.pipeline = Pipeline(stages, self.logger, executor=self.executor)
+        if self.player:
+            self.player.reset()
+            self.pipeline.token.add_callback(self.player.stop)
+        return self.pipeline
+
+    def cancel(self):
+        """Cancel the turn in progress (safe to call from any thread)."""
+        if self.pipeline:
+            self.pipeline.cancel()
+
+    async def run_async(self, utterance: Optional[Utterance] = None) -> VoiceTurnResult:
+        """
+        Run one turn on the current event loop, listening first unless an
+        already captured utterance is given.
+        Stage spans are recorded into `result.trace`; the caller finishes it
+        (e.g. after saving the audio) with `Tracer.finish`.
+        """
+        self.result = VoiceTurnResult(trace=Trace())
+        self._start_ns = 0
+        self._speculator = None
+        pipeline = self.build()
+        with activate(self.result.trace):
+            self.result.pipeline = await pipeline.run_async([utterance])
+        self.result.audio_clips = self.result.pipeline.outputs
+
+        if self._start_ns:
+            # End of speech -> reply fully synthesized (and played, with a player)
+            self.result.trace.add("response", self._start_ns, time.perf_counter_ns())
+
+        if self.result.time_to_first_token is not None:
+            ttfa = self.result.time_to_first_audio
+            self.logger.info(
+                f"TTFT {self.result.time_to_first_token:.2f}s, "
+                f"TTFA {f'{ttfa:.2f}s' if ttfa is not None else 'n/a'}"
+            )
+        return self.result
+
+    def run(self, utterance: Optional[Utterance] = None) -> VoiceTurnResult:
+        """Run one turn, blocking until it completes."""
+        return asyncio.run(self.run_async(utterance))
@@ -0,0 +1,306 @@
+"""
+Multi-session voice server over WebSocket.
+
+Protocol (one connection per session):
+    client -> server: binary linear16 mono PCM at config.SAMPLE_RATE (any
+                      frame size); JSON {"type": "CloseStream"} to finish
+    server -> client: JSON {"type": "ready" | "status" | "turn" | "error", ...}
+                      and one binary WAV clip per synthesized sentence
+
+Every utterance gets either a "turn" or an "error" with "scope": "turn"
+(nothing recognized, or the pipeline or LLM failed; the session goes on).
+An error with "scope": "session" ends the connection.
+
+Each session has its own VAD, capture buffer, conversation memory and
+pipeline; the Deepgram/Groq services and their connection pool are shared.
+Backpressure is end to end: a slow client stalls synthesis through the
+bounded send queue, and a session still answering stops reading its socket
+once one more utterance is waiting.
+"""
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Union
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+from ..audio.buffer import CaptureBuffer
+from ..audio.endpointer import Endpointer, ENDPOINT, FULL, SPEECH_START
+from ..audio.preprocess import UploadPreprocessor
+from ..audio.vad import create_vad
+from ..pipeline.voice import Utterance, VoicePipeline
+from ..services.deepgram import DeepgramService
+from ..services.groq import GroqService
+from ..services.memory import ConversationMemory
+from ..utils.logger import Logger
+from ..utils.tracing import Tracer
+import config
+
+# End-of-session marker on the turn and send queues
+_CLOSE = None
+
+
+class SocketSink:
+    """
+    Pipeline 'player' that sends each clip to the client. Blocks the play
+    stage while the session's send queue is full.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, outbox: asyncio.Queue):
+        self.loop = loop
+        self.outbox = outbox
+        self._stopped = threading.Event()
+
+    def play(self, audio_data: bytes) -> bool:
+        future = asyncio.run_coroutine_threadsafe(self.outbox.put(audio_data), self.loop)
+        while not self._stopped.is_set():
+            try:
+                future.result(timeout=0.1)
+                return True
+            except concurrent.futures.TimeoutError:
+                continue
+        future.cancel()
+        return False
+
+    def stop(self):
+        self._stopped.set()
+
+    def reset(self):
+        self._stopped.clear()
+
+
+class ClientSession:
+    """State and tasks of one connected client."""
+
+    def __init__(self, server: "VoiceServer", connection: ServerConnection, session_id: int):
+        self.server = server
+        self.connection = connection
+        self.id = session_id
+        self.logger = server.logger
+
+        self.loop = asyncio.get_running_loop()
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=config.SERVER_SEND_QUEUE)
+        self.turns: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.buffer = CaptureBuffer()
+        self.endpointer = Endpointer(
+            create_vad(server.vad_backend, server.vad_threshold),
+            self.buffer,
+            server.silence_duration,
+            no_speech_timeout=None,
+        )
+        self.voice = VoicePipeline(
+            None,
+            server.deepgram,
+            server.groq,
+            self.logger,
+            status_callback=self._on_status,
+            player=SocketSink(self.loop, self.outbox),
+            memory=ConversationMemory(),
+            preprocessor=UploadPreprocessor(
+                server.vad_threshold, vad_backend=server.vad_backend
+            ),
+            executor=server.executor,
+        )
+        self.dropped_statuses = 0
+
+    # ---------- Outbound ----------
+
+    def _post(self, message: Dict):
+        """Queue a control message without blocking (dropped if the client lags)."""
+        try:
+            self.outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped_statuses += 1
+
+    def _on_status(self, status: str):
+        # Called from pipeline worker threads
+        self.loop.call_soon_threadsafe(self._post, {"type": "status", "status": status})
+
+    async def _write(self):
+        while True:
+            item: Union[bytes, Dict, None] = await self.outbox.get()
+            if item is _CLOSE:
+                return
+            if isinstance(item, bytes):
+                await self.connection.send(item)
+            else:
+                await self.connection.send(json.dumps(item))
+
+    # ---------- Inbound ----------
+
+    async def _read(self):
+        """Endpoint incoming audio; returns on CloseStream or disconnect."""
+        chunk_bytes = config.CHUNK_SIZE * 2
+        pending = bytearray()
+
+        async for message in self.connection:
+            if isinstance(message, str):
+                if json.loads(message).get("type") == "CloseStream":
+                    return
+                continue
+
+            pending += message
+            while len(pending) >= chunk_bytes:
+                event = self.endpointer.feed(bytes(pending[:chunk_bytes]))
+                del pending[:chunk_bytes]
+
+                if event == SPEECH_START:
+                    self._post({"type": "status", "status": "speaking"})
+                elif event in (ENDPOINT, FULL):
+                    # Copy out: the buffer is reused for the next utterance
+                    utterance = Utterance(memoryview(bytes(self.buffer.wav())))
+                    # Waits while a previous utterance is still queued (backpressure)
+                    await self.turns.put(utterance)
+                    self.endpointer.reset()
+
+    # ---------- Turns ----------
+
+    async def _respond(self):
+        while True:
+            utterance = await self.turns.get()
+            if utterance is _CLOSE:
+                return
+            result = await self.voice.run_async(utterance)
+            if result.trace.spans:
+                self.server.tracer.finish(result.trace)
+            if result.pipeline.cancelled:
+                # The session is closing
+                pass
+            elif result.transcript and result.pipeline.ok and not result.llm_error:
+                await self.outbox.put({
+                    "type": "turn",
+                    "transcript": result.transcript,
+                    "response": result.response,
+                    **result.metrics(),
+                })
+            else:
+                error = result.pipeline.error or result.llm_error
+                await self.outbox.put({
+                    "type": "error",
+                    "scope": "turn",
+                    "message": str(error) if error else "No speech recognized",
+                    "transcript": result.transcript or "",
+                    "response": result.response,
+                })
+            self._post({"type": "status", "status": "listening"})
+
+    async def run(self):
+        """Serve the client until it finishes or disconnects."""
+        writer = asyncio.create_task(self._write())
+        responder = asyncio.create_task(self._respond())
+        await self.outbox.put({"type": "ready", "session": self.id})
+        self.logger.info(f"Session {self.id} started")
+
+        try:
+            await self._read()
+            # Graceful finish: answer what was already heard, then flush
+            await self.turns.put(_CLOSE)
+            done, _ = await asyncio.wait(
+                {responder, writer}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if writer not in done:
+                await self.outbox.put(_CLOSE)
+                await writer
+        except ConnectionClosed:
+            pass
+        except Exception as e:
+            self.logger.error(f"Session {self.id} error: {str(e)}")
+            try:
+                await self.connection.send(
+                    json.dumps({"type": "error", "scope": "session", "message": str(e)})
+                )
+            except ConnectionClosed:
+                pass
+        finally:
+            self.voice.cancel()
+            for task in (responder, writer):
+                task.cancel()
+            await asyncio.gather(responder, writer, return_exceptions=True)
+            self.logger.info(f"Session {self.id} ended")
+
+
+class VoiceServer:
+    """Accepts WebSocket sessions and runs them concurrently on one event loop."""
+
+    def __init__(
+        self,
+        deepgram: DeepgramService,
+        groq: GroqService,
+        logger: Logger,
+        tracer: Optional[Tracer] = None,
+        max_sessions: int = config.SERVER_MAX_SESSIONS,
+        vad_backend: str = config.DEFAULT_VAD_BACKEND,
+        vad_threshold: int = config.DEFAULT_VAD_THRESHOLD,
+        silence_duration: float = config.DEFAULT_SILENCE_DURATION,
+        workers: int = config.SERVER_WORKERS,
+    ):
+        """
+        :param deepgram: STT/TTS service shared by all sessions
+        :param groq: LLM service shared by all sessions
+        :param tracer: Collects per-turn latency traces
+        :param max_sessions: Concurrent sessions; further connections are refused
+        :param workers: Threads running the pipeline stages of all sessions
+        """
+        self.deepgram = deepgram
+        self.groq = groq
+        self.logger = logger
+        self.tracer = tracer or Tracer()
+        self.max_sessions = max_sessions
+        self.vad_backend = vad_backend
+        self.vad_threshold = vad_threshold
+        self.silence_duration = silence_duration
+        # Blocking service calls of every session share this pool, so the
+        # server's thread count stays bounded however many sessions it has
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="session"
+        )
+
+        self.sessions: Dict[int, ClientSession] = {}
+        self.total_sessions = 0
+        self.rejected = 0
+        self._ids = itertools.count(1)
+
+    async def _handle(self, connection: ServerConnection):
+        if len(self.sessions) >= self.max_sessions:
+            self.rejected += 1
+            # 1013: try again later
+            await connection.close(1013, "server busy")
+            return
+
+        session = ClientSession(self, connection, next(self._ids))
+        self.sessions[session.id] = session
+        self.total_sessions += 1
+        try:
+            await session.run()
+        finally:
+            del self.sessions[session.id]
+
+    def stats(self) -> Dict:
+        """Session counters."""
+        return {
+            "active": len(self.sessions),
+            "total": self.total_sessions,
+            "rejected": self.rejected,
+        }
+
+    async def serve(
+        self,
+        host: str = config.SERVER_HOST,
+        port: int = config.SERVER_PORT,
+        ready: Optional[asyncio.Event] = None,
+    ):
+        """Serve until cancelled."""
+        try:
+            async with serve(
+                self._handle, host, port, max_queue=config.SERVER_RECV_QUEUE
+            ) as server:
+                self.port = server.sockets[0].getsockname()[1]
+                self.logger.info(f"Voice server listening on ws://{host}:{self.port}")
+                if ready:
+                    ready.set()
+                await asyncio.Future()
+        finally:
+            # Handlers of abandoned turns are not waited for
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,41 +1,278 @@
 """
 Deepgram API service for STT and TTS
 """
-import requests
-import os
-from typing import Optional
+from __future__ import annotations
+import json
+import threading
+import time
+from typing import Optional, Callable, List, Union
+from urllib.parse import urlencode
+from .http import HttpClient, UploadBody, get_http_client
+from .resilience import Resilience, get_resilience
+from .tts_cache import TTSCache
+from ..utils.deadline import bounded
+from ..utils.lazy import lazy_import
 from ..utils.logger import Logger
+from ..utils.tracing import record_span, span
 import config
 
+requests = lazy_import("requests")
+websocket_client = lazy_import("websockets.sync.client")
+
+
+class LiveTranscription:
+    """
+    Live transcription session over the Deepgram streaming socket.
+
+    Audio chunks are pushed with `send` while recording; `finish` closes the
+    stream and returns the final transcript once the server flushes it.
+    `interim_callback` receives the running transcript (final segments plus
+    the current interim result) whenever it changes.
+
+    The socket is opened before listening, and the recorder only streams
+    audio once speech starts; until then a KeepAlive message is sent every
+    `keepalive_interval` seconds without audio, since the server closes
+    streams that stay idle for about 10 seconds.
+    """
+
+    def __init__(
+        self,
+        connection,
+        logger: Logger,
+        interim_callback: Optional[Callable[[str], None]] = None,
+        keepalive_interval: float = config.LIVE_KEEPALIVE_INTERVAL,
+    ):
+        self.connection = connection
+        self.logger = logger
+        self.interim_callback = interim_callback
+        self.keepalive_interval = keepalive_interval
+
+        self.final_segments: List[str] = []
+        self.bytes_sent = 0
+        self.keepalives = 0
+        self.closed = False
+        self._done = threading.Event()
+        # Set once no more KeepAlives are wanted (stream finishing or closed)
+        self._quiet = threading.Event()
+        self._last_send = time.monotonic()
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+        self._keeper = threading.Thread(target=self._keep_alive, daemon=True)
+        self._keeper.start()
+
+    def _read_results(self):
+        """Collect results from the socket until the server closes it."""
+        try:
+            for message in self.connection:
+                if isinstance(message, bytes):
+                    continue
+                data = json.loads(message)
+                if data.get("type") != "Results":
+                    continue
+
+                transcript = (
+                    data.get("channel", {})
+                    .get("alternatives", [{}])[0]
+                    .get("transcript", "")
+                )
+                if not transcript.strip():
+                    continue
+                if data.get("is_final"):
+                    self.final_segments.append(transcript.strip())
+                    running = self.final_segments
+                else:
+                    running = self.final_segments + [transcript.strip()]
+                if self.interim_callback:
+                    self.interim_callback(" ".join(running))
+        except Exception as e:
+            if not self.closed:
+                self.logger.error(f"Live transcription error: {str(e)}")
+        finally:
+            self._done.set()
+            self._quiet.set()
+
+    def _keep_alive(self):
+        """Send a KeepAlive whenever no audio was sent for `keepalive_interval`."""
+        wait = self.keepalive_interval
+        while not self._quiet.wait(wait):
+            idle = time.monotonic() - self._last_send
+            if idle < self.keepalive_interval:
+                wait = self.keepalive_interval - idle
+                continue
+            try:
+                self.connection.send(json.dumps({"type": "KeepAlive"}))
+                self.keepalives += 1
+            except Exception:
+                # The reader notices the closed socket and reports it
+                return
+            self._last_send = time.monotonic()
+            wait = self.keepalive_interval
+
+    def send(self, chunk: bytes):
+        """Push a chunk of raw linear16 audio to the socket."""
+        if self.closed or self._done.is_set():
+            return
+        try:
+            self.connection.send(chunk)
+            self.bytes_sent += len(chunk)
+            self._last_send = time.monotonic()
+        except Exception as e:
+            self.logger.error(f"Live transcription send failed: {str(e)}")
+            self.close()
+
+    def finish(
+        self, timeout: float = config.LIVE_FINALIZE_TIMEOUT
+    ) -> Optional[str]:
+        """Close the audio stream and wait for the final transcript."""
+        # The audio was streamed during capture; what is left is the server
+        # flushing its final results after CloseStream
+        self._quiet.set()
+        with span("finalize"):
+            try:
+                if not self._done.is_set():
+                    self.connection.send(json.dumps({"type": "CloseStream"}))
+            except Exception as e:
+                self.logger.error(f"Live transcription close failed: {str(e)}")
+
+            if not self._done.wait(bounded(timeout)):
+                self.logger.warning("Timed out waiting for final transcript")
+        self.close()
+
+        transcript = " ".join(self.final_segments)
+        if transcript.strip():
+            self.logger.success(f'Transcribed: "{transcript}"')
+            return transcript
+
+        self.logger.warning("No speech detected in audio")
+        return None
+
+    def close(self):
+        """Close the socket without waiting for results."""
+        self.closed = True
+        self._quiet.set()
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
 
 class DeepgramService:
     """Deepgram API service"""
 
-    def __init__(self, api_key: str, logger: Logger):
+    def __init__(
+        self,
+        api_key: str,
+        logger: Logger,
+        base_url: Optional[str] = None,
+        live_url: Optional[str] = None,
+        http: Optional[HttpClient] = None,
+        tts_cache: Optional[TTSCache] = None,
+        resilience: Optional[Resilience] = None,
+    ):
         self.api_key = api_key
         self.logger = logger
-        self.base_url = "https://api.deepgram.com/v1"
+        self.http = http or get_http_client()
+        self.resilience = resilience or get_resilience()
+        self.tts_cache = tts_cache
+        self.base_url = base_url or config.DEEPGRAM_BASE_URL
+        self.live_url = live_url or config.DEEPGRAM_LIVE_URL
 
-    def transcribe(self, audio_file_path: str) -> Optional[str]:
-        """Transcribe audio file to text"""
+    def start_live_transcription(
+        self,
+        interim_callback: Optional[Callable[[str], None]] = None,
+    ) -> Optional[LiveTranscription]:
+        """
+        Open a live transcription socket for linear16 audio.
+        Returns None if the connection could not be established.
+        """
+        if not self.api_key:
+            self.logger.error("Deepgram API key not set")
+            return None
+
+        params = urlencode(
+            {
+                "model": config.DEEPGRAM_STT_MODEL,
+                "smart_format": "true",
+                "interim_results": "true",
+                "encoding": "linear16",
+                "sample_rate": config.SAMPLE_RATE,
+                "channels": config.CHANNELS,
+            }
+        )
+
+        endpoint = self.resilience.endpoint("deepgram.live")
+        endpoint.count("calls")
+        if not endpoint.breaker.allow():
+            # The caller falls back to uploading the recording
+            endpoint.count("short_circuits")
+            self.logger.warning("Live transcription circuit open, skipping the socket")
+            return None
+
+        try:
+            connection = websocket_client.connect(
+                f"{self.live_url}?{params}",
+                additional_headers={"Authorization": f"Token {self.api_key}"},
+                open_timeout=bounded(10),
+            )
+        except Exception as e:
+            endpoint.count("failures")
+            endpoint.breaker.record_failure()
+            self.logger.error(f"Live transcription connect failed: {str(e)}")
+            return None
+
+        endpoint.breaker.record_success()
+        self.logger.info("Live transcription connected")
+        return LiveTranscription(connection, self.logger, interim_callback)
+
+    def transcribe(
+        self,
+        audio: Union[bytes, memoryview],
+        encoding: Optional[str] = None,
+        sample_rate: Optional[int] = None,
+    ) -> Optional[str]:
+        """
+        Transcribe in-memory audio to text: a WAV file, or raw mono samples
+        in `encoding` (e.g. 'mulaw') at `sample_rate`. Returns "" if no
+        speech was recognized and None if the request failed.
+        """
         if not self.api_key:
             self.logger.error("Deepgram API key not set")
             return None
 
         self.logger.info("Transcribing audio...")
 
+        query = f"model={config.DEEPGRAM_STT_MODEL}&smart_format=true"
+        content_type = "audio/wav"
+        if encoding:
+            # Headerless audio must be described in the query
+            query += f"&encoding={encoding}&sample_rate={sample_rate}&channels=1"
+            content_type = "application/octet-stream"
+
+        bodies: List[UploadBody] = []
+
+        def send(timeout) -> requests.Response:
+            # Bytes-like bodies are streamed from memory without an extra copy;
+            # each attempt (retry or hedge) reads the audio from the start
+            body = UploadBody(audio)
+            bodies.append(body)
+            return self.http.post(
+                f"{self.base_url}/listen?{query}",
+                headers={
+                    "Authorization": f"Token {self.api_key}",
+                    "Content-Type": content_type,
+                },
+                data=body,
+                timeout=timeout,
+            )
+
         try:
-            with open(audio_file_path, "rb") as audio_file:
-                response = requests.post(
-                    f"{self.base_url}/listen"
-                    f"?model={config.DEEPGRAM_STT_MODEL}&smart_format=true",
-                    headers={
-                        "Authorization": f"Token {self.api_key}",
-                        "Content-Type": "audio/wav",
-                    },
-                    data=audio_file,
-                    timeout=30,
-                )
+            start = time.perf_counter_ns()
+            response = self.resilience.call(
+                "deepgram.listen", send, hedge=config.HEDGE_ENABLED
+            )
+            sent = [body.sent_ns for body in bodies if body.sent_ns]
+            if sent:
+                record_span("upload", start, min(sent))
 
             if response.status_code == 200:
                 data = response.json()
@@ -51,7 +288,7 @@ class DeepgramService:
                     return transcript
                 else:
                     self.logger.warning("No speech detected in audio")
-                    return None
+                    return ""
             else:
                 self.logger.error(
                     f"Transcription failed: {response.status_code} - {response.text}"
@@ -62,39 +299,48 @@ class DeepgramService:
             self.logger.error(f"Transcription error: {str(e)}")
             return None
 
-        finally:
-            # Clean up temp file
-            if os.path.exists(audio_file_path):
-                os.unlink(audio_file_path)
-
     def synthesize(self, text: str) -> Optional[bytes]:
         """Convert text to speech (WAV)"""
         if not self.api_key:
             self.logger.error("Deepgram API key not set")
             return None
 
+        model = config.DEEPGRAM_TTS_MODEL
+        encoding = config.DEEPGRAM_TTS_ENCODING
+
+        if self.tts_cache:
+            cached = self.tts_cache.get(model, encoding, text)
+            if cached is not None:
+                self.logger.info("Speech served from cache")
+                return cached
+
         self.logger.info("Synthesizing speech...")
 
         try:
             # Request WAV explicitly
-            response = requests.post(
-                f"{self.base_url}/speak"
-                f"?model={config.DEEPGRAM_TTS_MODEL}&encoding=linear16",
-                headers={
-                    "Authorization": f"Token {self.api_key}",
-                    "Content-Type": "application/json",
-                    "Accept": "audio/wav",
-                },
-                json={"text": text},
-                timeout=30,
-            )
+            with span("tts"):
+                response = self.resilience.call(
+                    "deepgram.speak",
+                    lambda timeout: self.http.post(
+                        f"{self.base_url}/speak"
+                        f"?model={model}&encoding={encoding}",
+                        headers={
+                            "Authorization": f"Token {self.api_key}",
+                            "Content-Type": "application/json",
+                            "Accept": "audio/wav",
+                        },
+                        json={"text": text},
+                        timeout=timeout,
+                    ),
+                    hedge=config.HEDGE_ENABLED,
+                )
 
             if response.status_code == 200:
-                print("tts-success")
                 self.logger.success("Speech synthesis complete")
+                if self.tts_cache:
+                    self.tts_cache.put(model, encoding, text, response.content)
                 return response.content  # raw WAV bytes
             else:
-                print("tts-fail")
                 self.logger.error(
                     f"TTS failed: {response.status_code} - {response.text}"
                 )
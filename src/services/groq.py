@@ -1,28 +1,41 @@
 """
 Groq API service for LLM
 """
-import requests
-from typing import Optional, List, Dict
+import json
+from typing import Callable, Optional, List, Dict, Iterator
+from .http import HttpClient, get_http_client
+from .resilience import Resilience, get_resilience
+from .response_cache import ResponseCache
 from ..utils.logger import Logger
+from ..utils.tracing import span
 import config
 
 class GroqService:
     """Groq API service"""
     
-    def __init__(self, api_key: str, logger: Logger):
+    def __init__(self, api_key: str, logger: Logger, base_url: Optional[str] = None, http: Optional[HttpClient] = None, resilience: Optional[Resilience] = None, response_cache: Optional[ResponseCache] = None):
         self.api_key = api_key
         self.logger = logger
-        self.base_url = 'https://api.groq.com/openai/v1'
+        self.base_url = base_url or config.GROQ_BASE_URL
+        self.http = http or get_http_client()
+        self.resilience = resilience or get_resilience()
+        self.response_cache = response_cache
     
-    def chat(self, message: str, conversation_history: Optional[List[Dict]] = None) -> Optional[str]:
-        """Get chat completion from Groq"""
-        if not self.api_key:
-            self.logger.error("Groq API key not set")
+    def _cached(self, message: str, conversation_history: Optional[List[Dict]]) -> Optional[str]:
+        """Look up a cached reply"""
+        if not self.response_cache:
             return None
-        
-        self.logger.info("Getting AI response...")
-        
-        # Build messages
+        reply = self.response_cache.get(config.GROQ_MODEL, config.SYSTEM_PROMPT, message, conversation_history)
+        if reply is not None:
+            self.logger.success(f'AI (cached): "{reply}"')
+        return reply
+    
+    def _remember(self, message: str, conversation_history: Optional[List[Dict]], reply: str):
+        if self.response_cache:
+            self.response_cache.put(config.GROQ_MODEL, config.SYSTEM_PROMPT, message, conversation_history, reply)
+    
+    def _build_messages(self, message: str, conversation_history: Optional[List[Dict]] = None) -> List[Dict]:
+        """Build the chat messages list"""
         messages = [
             {'role': 'system', 'content': config.SYSTEM_PROMPT}
         ]
@@ -31,22 +44,42 @@ class GroqService:
             messages.extend(conversation_history)
         
         messages.append({'role': 'user', 'content': message})
+        return messages
+    
+    def chat(self, message: str, conversation_history: Optional[List[Dict]] = None, use_cache: bool = True) -> Optional[str]:
+        """Get chat completion from Groq (or the response cache)"""
+        if not self.api_key:
+            self.logger.error("Groq API key not set")
+            return None
+        
+        cached = self._cached(message, conversation_history) if use_cache else None
+        if cached is not None:
+            return cached
+        
+        self.logger.info("Getting AI response...")
+        
+        messages = self._build_messages(message, conversation_history)
         
         try:
-            response = requests.post(
-                f'{self.base_url}/chat/completions',
-                headers={
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': config.GROQ_MODEL,
-                    'messages': messages,
-                    'max_tokens': config.LLM_MAX_TOKENS,
-                    'temperature': config.LLM_TEMPERATURE
-                },
-                timeout=30
-            )
+            with span('llm'):
+                response = self.resilience.call(
+                    'groq.chat',
+                    lambda timeout: self.http.post(
+                        f'{self.base_url}/chat/completions',
+                        headers={
+                            'Authorization': f'Bearer {self.api_key}',
+                            'Content-Type': 'application/json'
+                        },
+                        json={
+                            'model': config.GROQ_MODEL,
+                            'messages': messages,
+                            'max_tokens': config.LLM_MAX_TOKENS,
+                            'temperature': config.LLM_TEMPERATURE
+                        },
+                        timeout=timeout
+                    ),
+                    hedge=config.HEDGE_LLM
+                )
             
             if response.status_code == 200:
                 data = response.json()
@@ -54,6 +87,8 @@ class GroqService:
                 
                 if ai_response:
                     self.logger.success(f'AI: "{ai_response}"')
+                    if use_cache:
+                        self._remember(message, conversation_history, ai_response)
                     return ai_response
                 else:
                     self.logger.error("No response from AI")
@@ -65,4 +100,102 @@ class GroqService:
         except Exception as e:
             self.logger.error(f"LLM error: {str(e)}")
             return None
-
+    
+    def chat_stream(self, message: str, conversation_history: Optional[List[Dict]] = None, cancel=None, use_cache: bool = True, on_error: Optional[Callable[[str], None]] = None) -> Iterator[str]:
+        """
+        Stream chat completion tokens from Groq as they arrive.
+        Yields content deltas; on error stops (possibly after a partial reply).
+        A cached reply is yielded whole, as a single delta.
+        
+        `cancel` is an optional token with `cancelled` and `add_callback`
+        (e.g. the pipeline's CancelToken); cancelling it closes the stream.
+        `on_error` is called with the error message if the request fails or
+        the stream ends before its [DONE] marker (not on cancel).
+        """
+        if not self.api_key:
+            self.logger.error("Groq API key not set")
+            if on_error:
+                on_error("Groq API key not set")
+            return
+        
+        cached = self._cached(message, conversation_history) if use_cache else None
+        if cached is not None:
+            yield cached
+            return
+        
+        self.logger.info("Streaming AI response...")
+        
+        messages = self._build_messages(message, conversation_history)
+        parts = []
+        
+        try:
+            with span('llm'):
+                yield from self._stream_tokens(messages, parts, cancel)
+            
+            if cancel is not None and cancel.cancelled:
+                self.logger.info("AI response cancelled")
+            elif parts:
+                self.logger.success(f'AI: "{"".join(parts)}"')
+                if use_cache:
+                    # Only complete replies: a cancelled or broken stream never gets here
+                    self._remember(message, conversation_history, "".join(parts))
+            else:
+                self.logger.error("No response from AI")
+        
+        except Exception as e:
+            if cancel is not None and cancel.cancelled:
+                self.logger.info("AI response cancelled")
+            else:
+                self.logger.error(f"LLM error: {str(e)}")
+                if on_error:
+                    on_error(str(e))
+    
+    def _stream_tokens(self, messages: List[Dict], parts: List[str], cancel=None) -> Iterator[str]:
+        """Send a streaming request and yield content deltas into `parts`"""
+        # Retried only until the response starts; tokens are never replayed
+        response = self.resilience.call(
+            'groq.chat',
+            lambda timeout: self.http.post(
+                f'{self.base_url}/chat/completions',
+                headers={
+                    'Authorization': f'Bearer {self.api_key}',
+                    'Content-Type': 'application/json'
+                },
+                json={
+                    'model': config.GROQ_MODEL,
+                    'messages': messages,
+                    'max_tokens': config.LLM_MAX_TOKENS,
+                    'temperature': config.LLM_TEMPERATURE,
+                    'stream': True
+                },
+                stream=True,
+                timeout=timeout
+            ),
+            cancel=cancel
+        )
+        
+        with response:
+            if cancel is not None:
+                # Closing the response aborts the blocking read below
+                cancel.add_callback(response.close)
+            
+            if response.status_code != 200:
+                raise RuntimeError(f"request failed: {response.status_code} - {response.text}")
+            
+            # Server-sent events: one "data: {...}" line per chunk
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                payload = line[len('data:'):].strip()
+                if payload == '[DONE]' or (cancel is not None and cancel.cancelled):
+                    return
+                
+                delta = json.loads(payload).get('choices', [{}])[0].get('delta', {})
+                token = delta.get('content')
+                if token:
+                    parts.append(token)
+                    yield token
+            
+            # A dropped connection can also end the body cleanly; the reply is then cut short
+            if not (cancel is not None and cancel.cancelled):
+                raise RuntimeError('stream ended before [DONE]')
@@ -0,0 +1,135 @@
+"""
+Shared HTTP connection pool for API services
+"""
+from __future__ import annotations
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+from ..utils.lazy import lazy_import
+import config
+
+requests = lazy_import("requests")
+urllib3_connection = lazy_import("urllib3.connection")
+
+
+def keepalive_socket_options(keepalive_idle: int) -> List[Tuple[int, int, int]]:
+    """urllib3 socket options that enable TCP keep-alive on pooled sockets."""
+    options = list(urllib3_connection.HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # Platform-specific: start probing idle connections after keepalive_idle
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, keepalive_idle))
+    return options
+
+
+class UploadBody:
+    """
+    File-like request body over a bytes-like object (no copy) that records
+    when the last block was handed to the socket, to time the upload.
+    """
+
+    def __init__(self, data: Union[bytes, memoryview]):
+        self.view = memoryview(data).cast("B")
+        self.pos = 0
+        self.sent_ns: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def read(self, size: int = -1) -> memoryview:
+        if self.pos >= len(self.view):
+            if self.sent_ns is None:
+                self.sent_ns = time.perf_counter_ns()
+            return self.view[:0]
+        end = len(self.view) if size is None or size < 0 else self.pos + size
+        block = self.view[self.pos:end]
+        self.pos += len(block)
+        return block
+
+
+class HttpClient:
+    """
+    Pooled, keep-alive HTTP session shared by the Deepgram and Groq services,
+    so repeated requests reuse TCP/TLS connections instead of reconnecting.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = config.HTTP_POOL_SIZE,
+        keepalive_idle: int = config.HTTP_KEEPALIVE_IDLE,
+        connect_timeout: float = config.HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = config.HTTP_READ_TIMEOUT,
+    ):
+        """
+        :param pool_size: Max pooled connections per host
+        :param keepalive_idle: Seconds a connection may idle before TCP keep-alive probes
+        :param connect_timeout: Default connect timeout (seconds)
+        :param read_timeout: Default read timeout (seconds)
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+        )
+        # Every host pool the manager creates opens its sockets with these
+        self.adapter.poolmanager.connection_pool_kw["socket_options"] = (
+            keepalive_socket_options(keepalive_idle)
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the pooled session."""
+        kwargs.setdefault("timeout", self.timeout)
+        with self._lock:
+            self.requests += 1
+        return self.session.request(method, url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def stats(self) -> Dict:
+        """
+        Connection reuse counters.
+        `connections` counts TCP connections opened by the live host pools.
+        """
+        pools = self.adapter.poolmanager.pools
+        connections = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+
+        requests_sent = self.requests
+        reused = max(requests_sent - connections, 0)
+        return {
+            "requests": requests_sent,
+            "connections": connections,
+            "reused": reused,
+            "reuse_ratio": reused / requests_sent if requests_sent else 0.0,
+        }
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+_default_client: Optional[HttpClient] = None
+_default_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Return the process-wide default HttpClient."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
@@ -0,0 +1,169 @@
+"""
+Token-budgeted conversation memory for the LLM prompt
+"""
+import math
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List
+import config
+
+# Chat formatting overhead per message (role, separators)
+MESSAGE_OVERHEAD = 4
+
+# Words, and runs of punctuation, each cost at least one token
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate the token count of `text` without a tokenizer: one token per
+    word or punctuation run, plus one for every 4 characters of long words.
+    """
+    tokens = 0
+    for piece in TOKEN_PATTERN.findall(text):
+        tokens += max(1, math.ceil(len(piece) / 4)) if len(piece) > 6 else 1
+    return tokens
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """`text` cut to an estimated `max_tokens` or fewer, ending in '…' (one token) if cut."""
+    tokens = 0
+    # End of the longest prefix that leaves room for the marker
+    end = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        piece = match.group()
+        tokens += max(1, math.ceil(len(piece) / 4)) if len(piece) > 6 else 1
+        if tokens > max_tokens:
+            return text[:end].rstrip() + '…'
+        if tokens < max_tokens:
+            end = match.end()
+    return text
+
+
+@dataclass(frozen=True)
+class Message:
+    """A chat message with its token count, computed once."""
+    role: str
+    content: str
+    tokens: int
+
+    @classmethod
+    def create(cls, role: str, content: str) -> "Message":
+        return cls(role, content, estimate_tokens(content) + MESSAGE_OVERHEAD)
+
+    def to_dict(self) -> Dict:
+        return {'role': self.role, 'content': self.content}
+
+
+class ConversationMemory:
+    """
+    Keeps the turns of one conversation within a token budget.
+
+    Token counts are cached per message and the running total is updated
+    incrementally. When the budget is exceeded, the oldest turns are dropped
+    and their user messages folded into a short summary message, itself
+    capped at `summary_tokens`. A single message may take up at most half
+    of that (it is truncated), so one long message never wipes the summary.
+    """
+
+    def __init__(
+        self,
+        budget: int = config.MEMORY_TOKEN_BUDGET,
+        summary_tokens: int = config.MEMORY_SUMMARY_TOKENS,
+        system_prompt: str = config.SYSTEM_PROMPT,
+    ):
+        """
+        :param budget: Max tokens of history (summary included) sent per request
+        :param summary_tokens: Max tokens of the summary of dropped turns (0 = none)
+        :param system_prompt: Counted towards the prompt total, not the budget
+        """
+        self.budget = budget
+        self.summary_tokens = summary_tokens
+        self.system_tokens = estimate_tokens(system_prompt) + MESSAGE_OVERHEAD
+
+        self.messages: Deque[Message] = deque()
+        self.history_tokens = 0
+        self.summary = ""
+        self.dropped = 0
+        self._summary_message = None
+        self._lock = threading.Lock()
+
+    def add(self, role: str, content: str):
+        """Append a message, trimming old turns to stay within the budget."""
+        message = Message.create(role, content)
+        with self._lock:
+            self.messages.append(message)
+            self.history_tokens += message.tokens
+            self._trim()
+
+    def add_turn(self, user: str, assistant: str):
+        """Append one exchange."""
+        self.add('user', user)
+        self.add('assistant', assistant)
+
+    def _trim(self):
+        # Drop whole turns (a user message and its reply), oldest first
+        while self._total() > self.budget and len(self.messages) > 2:
+            message = self._drop()
+            if message.role == 'user':
+                self._summarize(message.content)
+            while self.messages and self.messages[0].role != 'user':
+                self._drop()
+
+    def _drop(self) -> Message:
+        message = self.messages.popleft()
+        self.history_tokens -= message.tokens
+        self.dropped += 1
+        return message
+
+    def _total(self) -> int:
+        summary = self._summary_message
+        return self.history_tokens + (summary.tokens if summary else 0)
+
+    def _summarize(self, content: str):
+        """Fold a dropped user message into the summary (oldest topics fall off)."""
+        if not self.summary_tokens:
+            return
+        topic = truncate_tokens(content.strip(), max(self.summary_tokens // 2, 1))
+        topics = [t for t in self.summary.split(' | ') if t] + [topic]
+        while topics and estimate_tokens(' | '.join(topics)) > self.summary_tokens:
+            topics.pop(0)
+        self.summary = ' | '.join(topics)
+        self._summary_message = Message.create(
+            'system', f'Earlier in this conversation the user said: {self.summary}'
+        ) if self.summary else None
+
+    def history(self) -> List[Dict]:
+        """Messages to send before the new user message."""
+        with self._lock:
+            messages = [m.to_dict() for m in self.messages]
+            if self._summary_message:
+                messages.insert(0, self._summary_message.to_dict())
+            return messages
+
+    def prompt_tokens(self, message: str) -> int:
+        """Estimated prompt size for `message` sent with the current history."""
+        with self._lock:
+            history = self._total()
+        return self.system_tokens + history + estimate_tokens(message) + MESSAGE_OVERHEAD
+
+    def stats(self) -> Dict:
+        """Sizes of the retained history."""
+        with self._lock:
+            return {
+                'messages': len(self.messages),
+                'history_tokens': self._total(),
+                'budget': self.budget,
+                'dropped': self.dropped,
+            }
+
+    def clear(self):
+        """Forget the conversation."""
+        with self._lock:
+            self.messages.clear()
+            self.history_tokens = 0
+            self.summary = ""
+            self.dropped = 0
+            self._summary_message = None
@@ -0,0 +1,425 @@
+"""
+Retries, hedged requests and circuit breakers for the API services
+"""
+from __future__ import annotations
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from ..utils.deadline import DeadlineExceeded, remaining
+from ..utils.lazy import lazy_import
+from ..utils.tracing import percentile
+import config
+
+requests = lazy_import("requests")
+tenacity = lazy_import("tenacity")
+
+# Rate limiting and server-side failures: worth another attempt
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# (connect, read) timeout handed to each attempt
+Timeout = Tuple[float, float]
+
+
+class CircuitOpenError(Exception):
+    """The endpoint's circuit is open; the request was not sent."""
+
+    def __init__(self, endpoint: str):
+        super().__init__(f"Circuit open for '{endpoint}'")
+        self.endpoint = endpoint
+
+
+class TransientError(Exception):
+    """The endpoint answered with a retryable status."""
+
+    def __init__(self, endpoint: str, response: requests.Response):
+        super().__init__(f"{response.status_code} - {response.text[:200]}")
+        self.endpoint = endpoint
+        self.status_code = response.status_code
+        response.close()
+
+
+def is_transient(error: BaseException) -> bool:
+    """Failures a retry (or another replica behind the endpoint) may not see."""
+    return isinstance(error, (
+        TransientError,
+        requests.ConnectionError,
+        requests.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+    ))
+
+
+class CircuitBreaker:
+    """
+    Closed: requests pass. After `failure_threshold` consecutive failed calls
+    the circuit opens and requests fail fast; after `reset_timeout` one trial
+    call is let through (half-open), and its outcome closes or reopens it.
+    A neutral outcome (e.g. a 4xx other than 429) changes neither.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = config.BREAKER_FAILURES,
+        reset_timeout: float = config.BREAKER_RESET,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opens = 0
+        self.opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._trial = False
+            if self.state == HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial = False
+
+    def record_neutral(self):
+        """The call says nothing about the endpoint's health; frees a half-open trial."""
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.opens += 1
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._trial = False
+
+
+class Endpoint:
+    """Latency window, circuit breaker and counters of one remote endpoint."""
+
+    def __init__(self, name: str, window: int, breaker: CircuitBreaker):
+        self.name = name
+        self.breaker = breaker
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.counters = {
+            "calls": 0,
+            "retries": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "failures": 0,
+            "short_circuits": 0,
+        }
+        self._lock = threading.Lock()
+
+    def count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def record_latency(self, seconds: float):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def latency_percentile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        """Seconds, or None until `min_samples` latencies were observed."""
+        with self._lock:
+            if len(self.latencies) < max(min_samples, 1):
+                return None
+            ordered = sorted(self.latencies)
+        return percentile(ordered, q)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            ordered = sorted(self.latencies)
+            counters = dict(self.counters)
+        return {
+            "endpoint": self.name,
+            **counters,
+            "state": self.breaker.state,
+            "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+        }
+
+
+def _close_response(future: Future):
+    """Done callback releasing the connection of a request that lost a hedge."""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class Resilience:
+    """
+    Wraps HTTP calls to named endpoints with:
+
+    - jittered exponential-backoff retries of transient failures
+      (idempotent calls only), never sleeping past the current deadline
+    - hedging: a duplicate request once the first one outlasts the endpoint's
+      latency percentile; the first good response wins
+    - a circuit breaker per endpoint, so a failing API is skipped quickly;
+      it sees one outcome per call, however many attempts the call made
+    - timeouts capped to the deadline of the current pipeline stage
+
+    Shared by all services so the latency windows and breakers see every call.
+    """
+
+    def __init__(
+        self,
+        attempts: int = config.RETRY_ATTEMPTS,
+        backoff: float = config.RETRY_BACKOFF,
+        backoff_max: float = config.RETRY_BACKOFF_MAX,
+        hedge_percentile: float = config.HEDGE_PERCENTILE,
+        hedge_min_samples: int = config.HEDGE_MIN_SAMPLES,
+        window: int = config.LATENCY_WINDOW,
+        breaker_failures: int = config.BREAKER_FAILURES,
+        breaker_reset: float = config.BREAKER_RESET,
+        connect_timeout: float = config.HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = config.HTTP_READ_TIMEOUT,
+        hedge_workers: int = 2 * config.HTTP_POOL_SIZE,
+        limiter=None,
+    ):
+        """
+        :param attempts: Attempts per idempotent call, including the first
+        :param backoff: Base seconds of the randomized exponential backoff
+        :param backoff_max: Max seconds slept between attempts
+        :param hedge_percentile: Latency percentile after which a request is hedged
+        :param hedge_min_samples: Latencies needed before an endpoint is hedged
+        :param window: Latencies kept per endpoint
+        :param breaker_failures: Consecutive failures that open a circuit
+        :param breaker_reset: Seconds before an open circuit lets a trial request through
+        :param hedge_workers: Threads running hedged requests
+        :param limiter: Optional rate limiter (anything with a blocking
+            acquire()), taken before every request sent: first attempts,
+            retries and hedges alike
+        """
+        self.attempts = attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.window = window
+        self.breaker_failures = breaker_failures
+        self.breaker_reset = breaker_reset
+        self.timeout = (connect_timeout, read_timeout)
+        self.hedge_workers = hedge_workers
+        self.limiter = limiter
+
+        self.endpoints: Dict[str, Endpoint] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def endpoint(self, name: str) -> Endpoint:
+        """Return the state of endpoint `name`, creating it on first use."""
+        with self._lock:
+            endpoint = self.endpoints.get(name)
+            if endpoint is None:
+                endpoint = self.endpoints[name] = Endpoint(
+                    name,
+                    self.window,
+                    CircuitBreaker(self.breaker_failures, self.breaker_reset),
+                )
+            return endpoint
+
+    # ---------- Calls ----------
+
+    def call(
+        self,
+        name: str,
+        send: Callable[[Timeout], requests.Response],
+        idempotent: bool = True,
+        hedge: bool = False,
+        cancel=None,
+    ) -> requests.Response:
+        """
+        Send a request to endpoint `name` and return the response.
+
+        `send` performs one attempt with the given (connect, read) timeout; it
+        may be called several times (retries) and concurrently (hedging), so
+        it must build a fresh request body each time. Raises the last error,
+        TransientError for a retryable status, CircuitOpenError or
+        DeadlineExceeded. `cancel` (see CancelToken) stops further retries.
+        """
+        endpoint = self.endpoint(name)
+        endpoint.count("calls")
+        if not endpoint.breaker.allow():
+            endpoint.count("short_circuits")
+            raise CircuitOpenError(endpoint.name)
+
+        def stop_early(retry_state: tenacity.RetryCallState) -> bool:
+            if cancel is not None and cancel.cancelled:
+                return True
+            # Don't back off past the deadline
+            left = remaining()
+            return left is not None and left <= (retry_state.upcoming_sleep or 0.0)
+
+        retrying = tenacity.Retrying(
+            stop=tenacity.stop_after_attempt(self.attempts if idempotent else 1) | stop_early,
+            wait=tenacity.wait_random_exponential(multiplier=self.backoff, max=self.backoff_max),
+            retry=tenacity.retry_if_exception(is_transient),
+            before_sleep=lambda retry_state: endpoint.count("retries"),
+            reraise=True,
+        )
+        try:
+            response = retrying(self._attempt, endpoint, send, hedge)
+        except Exception as e:
+            # Only transient errors count against the endpoint; e.g. a deadline
+            # that passed before anything was sent does not
+            if is_transient(e):
+                endpoint.count("failures")
+                endpoint.breaker.record_failure()
+            else:
+                endpoint.breaker.record_neutral()
+            raise
+
+        if response.status_code >= 500:
+            endpoint.count("failures")
+            endpoint.breaker.record_failure()
+        elif response.status_code >= 400:
+            # The request was at fault (bad key, bad input), not the endpoint
+            endpoint.breaker.record_neutral()
+        else:
+            endpoint.breaker.record_success()
+        return response
+
+    def _attempt(
+        self,
+        endpoint: Endpoint,
+        send: Callable[[Timeout], requests.Response],
+        hedge: bool,
+    ) -> requests.Response:
+        timeout = self._bounded_timeout()
+        delay = (
+            endpoint.latency_percentile(self.hedge_percentile, self.hedge_min_samples)
+            if hedge else None
+        )
+        if delay is None:
+            response = self._timed(endpoint, send, timeout)
+        else:
+            response = self._hedged(endpoint, send, timeout, delay)
+        if response.status_code in RETRYABLE_STATUS:
+            raise TransientError(endpoint.name, response)
+        return response
+
+    def _bounded_timeout(self) -> Timeout:
+        left = remaining()
+        if left is None:
+            return self.timeout
+        if left <= 0:
+            raise DeadlineExceeded("Deadline passed before the request was sent")
+        connect, read = self.timeout
+        return (min(connect, left), min(read, left))
+
+    def _timed(
+        self,
+        endpoint: Endpoint,
+        send: Callable[[Timeout], requests.Response],
+        timeout: Timeout,
+    ) -> requests.Response:
+        if self.limiter is not None:
+            self.limiter.acquire()
+        start = time.perf_counter()
+        response = send(timeout)
+        if response.status_code not in RETRYABLE_STATUS:
+            endpoint.record_latency(time.perf_counter() - start)
+        return response
+
+    def _submit(self, *args) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.hedge_workers, thread_name_prefix="hedge"
+                )
+        # Each request gets its own copy of the caller's context (trace, deadline)
+        return self._executor.submit(contextvars.copy_context().run, self._timed, *args)
+
+    def _hedged(
+        self,
+        endpoint: Endpoint,
+        send: Callable[[Timeout], requests.Response],
+        timeout: Timeout,
+        delay: float,
+    ) -> requests.Response:
+        """Send, and send again if no answer arrives within `delay` seconds."""
+        primary = self._submit(endpoint, send, timeout)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        endpoint.count("hedges")
+        backup = self._submit(endpoint, send, timeout)
+        pending = {primary, backup}
+        failure: Optional[BaseException] = None
+        rejected: Optional[requests.Response] = None
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    failure = e
+                    continue
+                if response.status_code in RETRYABLE_STATUS:
+                    if rejected is not None:
+                        rejected.close()
+                    rejected = response
+                    continue
+
+                if future is backup:
+                    endpoint.count("hedge_wins")
+                # The other request may still be running or have just finished
+                other = primary if future is backup else backup
+                other.add_done_callback(_close_response)
+                return response
+
+        if rejected is not None:
+            return rejected
+        raise failure
+
+    # ---------- Stats ----------
+
+    def stats(self) -> List[Dict]:
+        """Per-endpoint counters, breaker state and p50/p95 latency (ms)."""
+        with self._lock:
+            endpoints = list(self.endpoints.values())
+        return [endpoint.stats() for endpoint in endpoints]
+
+
+def format_resilience_stats(rows: List[Dict]) -> List[str]:
+    """One line per endpoint of `Resilience.stats()`, for console reports."""
+    return [
+        f"{row['endpoint']:<16} calls={row['calls']:<5} retries={row['retries']:<4} "
+        f"hedges={row['hedges']} (won {row['hedge_wins']}) failures={row['failures']} "
+        f"circuit={row['state']}"
+        for row in rows
+    ]
+
+
+_default_resilience: Optional[Resilience] = None
+_default_lock = threading.Lock()
+
+
+def get_resilience() -> Resilience:
+    """Return the process-wide default Resilience."""
+    global _default_resilience
+    with _default_lock:
+        if _default_resilience is None:
+            _default_resilience = Resilience()
+        return _default_resilience
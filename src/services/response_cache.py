@@ -0,0 +1,141 @@
+"""
+Cache of LLM replies for frequently asked questions
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
+from ..utils.text import normalize_transcript
+import config
+
+
+class CachedReply(NamedTuple):
+    text: str
+    size: int
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    In-memory LRU of LLM replies with a TTL and a byte budget, keyed by
+    (model, system prompt, normalized question, hash of the last
+    `context_turns` exchanges). Questions that refer back to the
+    conversation ("what about that?") are never cached or answered from it.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = config.RESPONSE_CACHE_BYTES,
+        ttl: float = config.RESPONSE_CACHE_TTL,
+        context_turns: int = config.RESPONSE_CACHE_CONTEXT_TURNS,
+        context_words=config.RESPONSE_CACHE_CONTEXT_WORDS,
+    ):
+        """
+        :param max_bytes: Byte budget of the cached reply texts
+        :param ttl: Seconds a reply may be served
+        :param context_turns: Previous exchanges that must also match (0 = question only)
+        :param context_words: Words that make a question context-dependent
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.context_turns = context_turns
+        self.context_words = frozenset(context_words)
+
+        self.entries: "OrderedDict[str, CachedReply]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._lock = threading.Lock()
+
+    def cacheable(self, message: str) -> bool:
+        """Whether the answer to `message` can be reused for other callers."""
+        words = normalize_transcript(message).split()
+        return bool(words) and not self.context_words.intersection(words)
+
+    def make_key(
+        self,
+        model: str,
+        system_prompt: str,
+        message: str,
+        history: Optional[List[Dict]] = None,
+    ) -> str:
+        context = (history or [])[-2 * self.context_turns:] if self.context_turns else []
+        raw = json.dumps(
+            [model, system_prompt, normalize_transcript(message), context],
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(
+        self,
+        model: str,
+        system_prompt: str,
+        message: str,
+        history: Optional[List[Dict]] = None,
+    ) -> Optional[str]:
+        """Return the cached reply or None (also for context-dependent questions)."""
+        if not self.cacheable(message):
+            with self._lock:
+                self.bypassed += 1
+            return None
+
+        key = self.make_key(model, system_prompt, message, history)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry.text
+
+    def put(
+        self,
+        model: str,
+        system_prompt: str,
+        message: str,
+        history: Optional[List[Dict]],
+        reply: str,
+    ):
+        """Remember a complete reply (ignored for context-dependent questions)."""
+        if not reply or not self.cacheable(message):
+            return
+        size = len(reply.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        key = self.make_key(model, system_prompt, message, history)
+        with self._lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = CachedReply(reply, size, time.monotonic() + self.ttl)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, key: str):
+        self.size -= self.entries.pop(key).size
+
+    def stats(self) -> Dict:
+        """Hit/miss/bypass counters and size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self.entries),
+                "bytes": self.size,
+            }
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.size = 0
@@ -0,0 +1,254 @@
+"""
+Two-tier (memory + disk) cache for synthesized speech
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import config
+
+# Temp files older than this were left by a crashed write, not one in progress
+STALE_TEMP_AGE = 60.0
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys: NFC, collapsed whitespace, stripped."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class MemoryTier:
+    """In-memory LRU with a byte budget."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        audio = self.entries.get(key)
+        if audio is not None:
+            self.entries.move_to_end(key)
+        return audio
+
+    def put(self, key: str, audio: bytes):
+        if len(audio) > self.max_bytes:
+            return
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+        self.entries[key] = audio
+        self.size += len(audio)
+
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+
+class DiskTier:
+    """
+    On-disk cache with TTL and size-based eviction.
+    The TTL counts from when an entry was written (its file's mtime, which
+    hits do not touch). Recency for LRU eviction is tracked in an in-memory
+    index; after a restart it starts out in write order, and temp files left
+    by interrupted writes are removed. Only the index is locked, so file
+    reads and writes run concurrently.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl: float):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+        # key -> (created, size), least recently used first
+        self.index: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        found = []
+        stale = []
+        now = time.time()
+        for entry in os.scandir(directory):
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            if entry.name.endswith(".wav"):
+                found.append((stat.st_mtime, entry.name[:-len(".wav")], stat.st_size))
+            elif entry.name.endswith(".tmp") and now - stat.st_mtime > STALE_TEMP_AGE:
+                stale.append(entry.path)
+        self._unlink(stale)
+        for created, key, size in sorted(found):
+            self.index[key] = (created, size)
+        self.size = sum(size for _, size in self.index.values())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.wav")
+
+    def _forget(self, key: str) -> Optional[str]:
+        """Drop an entry from the index (lock held); returns its path to unlink."""
+        entry = self.index.pop(key, None)
+        if entry is None:
+            return None
+        self.size -= entry[1]
+        return self._path(key)
+
+    @staticmethod
+    def _unlink(paths):
+        for path in paths:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self.index.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.ttl:
+                expired = self._forget(key)
+            else:
+                expired = None
+                self.index.move_to_end(key)
+        if expired:
+            self._unlink([expired])
+            return None
+
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            # Removed behind our back (e.g. by another process)
+            with self._lock:
+                if self.index.get(key) == entry:
+                    self._forget(key)
+            return None
+
+    def put(self, key: str, audio: bytes):
+        if len(audio) > self.max_bytes:
+            return
+        path = self._path(key)
+
+        # Write then rename so readers never see a partial file; the temp
+        # name is unique, so concurrent puts of one key do not collide
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(temp_path, path)
+        except OSError:
+            self._unlink([temp_path])
+            raise
+
+        with self._lock:
+            self._forget(key)
+            self.index[key] = (time.time(), len(audio))
+            self.size += len(audio)
+            victims = self._evict() if self.size > self.max_bytes else []
+        self._unlink(victims)
+
+    def _evict(self) -> List[str]:
+        """Drop expired entries, then least recently used ones until within budget (lock held)."""
+        now = time.time()
+        expired = [key for key, (created, _) in self.index.items() if now - created > self.ttl]
+        victims = [self._forget(key) for key in expired]
+        while self.size > self.max_bytes and self.index:
+            victims.append(self._forget(next(iter(self.index))))
+        return victims
+
+    def clear(self):
+        with self._lock:
+            victims = [self._path(key) for key in self.index]
+            self.index.clear()
+            self.size = 0
+        self._unlink(victims)
+
+
+class TTSCache:
+    """
+    Cache of synthesized audio keyed by (model, encoding, normalized text).
+    Lookups check memory first, then disk (promoting disk hits to memory).
+    The cache lock covers the memory tier and counters only; disk I/O runs
+    outside it.
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int = config.TTS_CACHE_MEMORY_BYTES,
+        disk_dir: Optional[str] = config.TTS_CACHE_DIR,
+        disk_bytes: int = config.TTS_CACHE_DISK_BYTES,
+        ttl: float = config.TTS_CACHE_TTL,
+    ):
+        """
+        :param memory_bytes: Byte budget of the in-memory LRU tier
+        :param disk_dir: Directory of the disk tier (None disables it)
+        :param disk_bytes: Byte budget of the disk tier
+        :param ttl: Max age (seconds) of disk entries
+        """
+        self.memory = MemoryTier(memory_bytes)
+        self.disk = DiskTier(disk_dir, disk_bytes, ttl) if disk_dir else None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, encoding: str, text: str) -> str:
+        raw = f"{model}\0{encoding}\0{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, encoding: str, text: str) -> Optional[bytes]:
+        """Return cached audio or None."""
+        key = self.make_key(model, encoding, text)
+        with self._lock:
+            audio = self.memory.get(key)
+            if audio is not None:
+                self.memory_hits += 1
+                return audio
+
+        audio = self.disk.get(key) if self.disk else None
+        with self._lock:
+            if audio is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self.memory.put(key, audio)
+            return audio
+
+    def put(self, model: str, encoding: str, text: str, audio: bytes):
+        """Store audio in both tiers."""
+        key = self.make_key(model, encoding, text)
+        with self._lock:
+            self.memory.put(key, audio)
+        if self.disk:
+            try:
+                self.disk.put(key, audio)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and tier sizes."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "memory_bytes": self.memory.size,
+                "memory_entries": len(self.memory.entries),
+                "disk_bytes": self.disk.size if self.disk else 0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self.memory.clear()
+        if self.disk:
+            self.disk.clear()
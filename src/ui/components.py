@@ -2,9 +2,11 @@
 Reusable UI components
 """
 import streamlit as st
-from typing import List, Dict
+from typing import List, Dict, Optional
+from ..utils.tracing import percentile
+import config
 
-def render_sidebar(vad_threshold: int, silence_duration: float) -> tuple:
+def render_sidebar(vad_threshold: int, silence_duration: float, vad_backend: str) -> tuple:
     """Render sidebar configuration"""
     with st.sidebar:
         st.header("⚙️ Configuration")
@@ -25,15 +27,21 @@ def render_sidebar(vad_threshold: int, silence_duration: float) -> tuple:
         
         st.subheader("VAD Settings")
         
-        import config
+        new_vad_backend = st.selectbox(
+            "VAD Engine",
+            options=config.VAD_BACKENDS,
+            index=config.VAD_BACKENDS.index(vad_backend),
+            help="energy: fixed amplitude threshold · webrtc: WebRTC speech model · adaptive: tracks the noise floor"
+        )
         
         new_vad_threshold = st.slider(
             "VAD Threshold",
             min_value=config.MIN_VAD_THRESHOLD,
             max_value=config.MAX_VAD_THRESHOLD,
             value=vad_threshold,
-            step=100,
-            help="Higher = less sensitive to background noise"
+            step=1,
+            disabled=new_vad_backend != 'energy',
+            help="Higher = less sensitive to background noise (energy engine only)"
         )
         
         new_silence_duration = st.slider(
@@ -49,29 +57,41 @@ def render_sidebar(vad_threshold: int, silence_duration: float) -> tuple:
         
         st.info("💡 **How to use:**\n1. Enter API keys\n2. Click 'Start Listening'\n3. Speak when ready\n4. Wait for AI response")
         
-        return deepgram_key, groq_key, new_vad_threshold, new_silence_duration
+        return deepgram_key, groq_key, new_vad_threshold, new_silence_duration, new_vad_backend
+
+LOG_EMOJI = {
+    'info': 'ℹ️',
+    'success': '✅',
+    'warning': '⚠️',
+    'error': '❌'
+}
+
+def format_logs(logs: List[Dict]) -> str:
+    """Log records as one block of text, newest first"""
+    return "\n".join(
+        f"{log['timestamp']} {LOG_EMOJI.get(log['type'], 'ℹ️')} {log['message']}"
+        for log in reversed(logs)
+    )
 
-def render_logs(logs: List[Dict]):
-    """Render system logs"""
+def render_logs(logs: List[Dict], stats: Optional[Dict] = None):
+    """Render system logs as a single text element"""
     st.markdown("### 📋 System Logs")
     
+    if stats and stats['dropped']:
+        st.caption(f"⚠️ {stats['dropped']} log records dropped (queue full)")
+    
     log_container = st.container(height=600)
     
     with log_container:
-        if not logs:
-            st.text("No logs yet...")
-        else:
-            for log in reversed(logs):
-                emoji = {
-                    'info': 'ℹ️',
-                    'success': '✅',
-                    'warning': '⚠️',
-                    'error': '❌'
-                }.get(log['type'], 'ℹ️')
-                
-                st.text(f"{log['timestamp']} {emoji} {log['message']}")
-
-def render_conversation(transcript: str, response: str, audio_file: str = None):
+        # One element however many records: reruns stay cheap as logs grow
+        st.text(format_logs(logs) if logs else "No logs yet...")
+
+def render_conversation(
+    transcript: str,
+    response: str,
+    audio_data: Optional[bytes] = None,
+    autoplay: bool = False,
+):
     """Render conversation display"""
     if transcript:
         st.markdown("### 💬 Conversation")
@@ -85,7 +105,121 @@ def render_conversation(transcript: str, response: str, audio_file: str = None):
                 st.markdown("**AI Response:**")
                 st.success(response)
             
-            if audio_file:
-                st.audio(audio_file, format='audio/wav')
+            if audio_data:
+                st.audio(audio_data, format='audio/wav', autoplay=autoplay)
 
+def render_history(turns: List[Dict]):
+    """Render earlier turns of the conversation as a single element"""
+    if not turns:
+        return
+    
+    with st.expander(f"🕘 Earlier Turns ({len(turns)})"):
+        st.markdown("\n\n".join(
+            f"**You:** {turn['transcript']}  \n**AI:** {turn['response']}"
+            for turn in reversed(turns)
+        ))
+
+def render_connection_stats(stats: Dict):
+    """Render HTTP connection pool reuse counters"""
+    with st.expander("🔌 Connection Pool"):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Requests", stats['requests'])
+        col2.metric("Connections", stats['connections'])
+        col3.metric("Reused", f"{stats['reuse_ratio']:.0%}")
+
+def render_resilience_stats(stats: List[Dict]):
+    """Render per-endpoint retries, hedges and circuit breaker states"""
+    with st.expander("🛡️ Resilience"):
+        if not stats:
+            st.caption("No API calls yet")
+            return
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Retries", sum(row['retries'] for row in stats))
+        col2.metric("Hedges Won", f"{sum(row['hedge_wins'] for row in stats)}/{sum(row['hedges'] for row in stats)}")
+        col3.metric("Open Circuits", sum(row['state'] != 'closed' for row in stats))
+        st.dataframe(stats, hide_index=True, use_container_width=True)
+
+def render_cache_stats(stats: Dict):
+    """Render TTS cache hit/miss counters"""
+    with st.expander("🗂️ TTS Cache"):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Hit Ratio", f"{stats['hit_ratio']:.0%}")
+        col2.metric("Memory Hits", stats['memory_hits'])
+        col3.metric("Disk Hits", stats['disk_hits'])
+        st.caption(
+            f"{stats['misses']} misses · "
+            f"memory {stats['memory_bytes'] / 1e6:.1f} MB "
+            f"({stats['memory_entries']} clips) · "
+            f"disk {stats['disk_bytes'] / 1e6:.1f} MB"
+        )
 
+def render_response_cache_stats(stats: Dict):
+    """Render LLM response cache hit/miss counters"""
+    with st.expander("💬 Response Cache"):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Hit Ratio", f"{stats['hit_ratio']:.0%}")
+        col2.metric("Hits", stats['hits'])
+        col3.metric("Context Bypasses", stats['bypassed'])
+        st.caption(
+            f"{stats['misses']} misses · {stats['entries']} replies "
+            f"({stats['bytes'] / 1e3:.1f} KB)"
+        )
+
+def render_latency_panel(summary: List[Dict], last_trace=None):
+    """Render per-stage latency percentiles and the last turn's breakdown"""
+    with st.expander("⏱️ Latency", expanded=bool(summary)):
+        if not summary:
+            st.caption("No completed turns yet")
+            return
+        
+        st.dataframe(summary, hide_index=True, use_container_width=True)
+        
+        if last_trace is not None:
+            st.caption("Last turn")
+            st.dataframe(
+                [
+                    {'span': span['name'], 'start_ms': round(span['start_ms'], 1), 'duration_ms': round(span['duration_ms'], 1)}
+                    for span in last_trace.to_dict()['spans']
+                ],
+                hide_index=True,
+                use_container_width=True,
+            )
+
+def render_speculation_stats(stats: Dict):
+    """Render speculative LLM request hit rate and wasted tokens"""
+    with st.expander("🔮 Speculation"):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Hit Rate", f"{stats['hit_rate']:.0%}")
+        col2.metric("Launched", stats['launched'])
+        col3.metric("Head Start", f"{stats['mean_head_start_ms']:.0f} ms")
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Wasted", stats['wasted'])
+        col2.metric("Wasted Prompt Tokens", stats['wasted_prompt_tokens'])
+        col3.metric("Wasted Output Tokens", stats['wasted_completion_tokens'])
+
+def render_device_stats(stats: Dict):
+    """Render audio input stream acquisition timings and frame-loss counters"""
+    with st.expander("🎙️ Audio Device"):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Leases", stats['acquires'])
+        col2.metric("Last Acquire", f"{stats['last_acquire_ms']:.1f} ms")
+        col3.metric("Mean Acquire", f"{stats['mean_acquire_ms']:.1f} ms")
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Overflows", stats['overflows'])
+        col2.metric("Dropped Chunks", stats['dropped_chunks'])
+        col3.metric("Underruns", stats['underruns'])
+
+def render_timing(render_times: List[float]):
+    """Render how long the script took on the last and recent reruns"""
+    if not render_times:
+        return
+    
+    ordered = sorted(render_times)
+    st.caption(
+        f"🖥️ Rendered in {render_times[-1]:.0f} ms · "
+        f"p50 {percentile(ordered, 50):.0f} ms · "
+        f"p95 {percentile(ordered, 95):.0f} ms over {len(ordered)} reruns"
+    )
@@ -0,0 +1,48 @@
+"""
+Deadline propagation: the time budget left for the current piece of work
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# Absolute time.monotonic() deadline of the current context. Like the current
+# trace, it follows asyncio tasks and the pipeline engine's handler threads
+# (which run in a copy of the caller's context) into pipeline stages.
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """No time is left for the work in the current context."""
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Bound the enclosed work to `seconds` from now (None = no new bound).
+    An outer deadline is never extended.
+    """
+    if seconds is None:
+        yield
+        return
+    at = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(at if outer is None else min(at, outer))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (None = unbounded)."""
+    at = _deadline.get()
+    if at is None:
+        return None
+    return max(at - time.monotonic(), 0.0)
+
+
+def bounded(timeout: float) -> float:
+    """`timeout` capped to the time left before the current deadline."""
+    left = remaining()
+    return timeout if left is None else min(timeout, left)
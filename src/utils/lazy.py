@@ -0,0 +1,55 @@
+"""
+Deferred imports for heavy dependencies
+"""
+import importlib
+import threading
+from typing import Any, Iterable
+
+# Imported on first use by src.audio and src.services
+CORE_DEPENDENCIES = ("numpy", "pyaudio", "requests", "tenacity", "websockets.sync.client")
+
+
+class LazyModule:
+    """
+    Stands in for a module until one of its attributes is first used, then
+    imports it. Attributes are copied onto the instance as they are looked
+    up, so later accesses cost the same as on the module itself. A missing
+    module raises ImportError at that first use instead of at import time.
+    """
+
+    def __init__(self, name: str):
+        self.__dict__["_lazy_name"] = name
+
+    def __getattr__(self, attr: str) -> Any:
+        # Only called for attributes not cached yet; the import lock makes
+        # concurrent first uses from several threads safe
+        module = importlib.import_module(self._lazy_name)
+        value = getattr(module, attr)
+        self.__dict__[attr] = value
+        return value
+
+    def __repr__(self) -> str:
+        return f"<lazy module '{self._lazy_name}'>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """A module that is imported when first used (e.g. `np = lazy_import("numpy")`)."""
+    return LazyModule(name)
+
+
+def preload(names: Iterable[str] = CORE_DEPENDENCIES) -> threading.Thread:
+    """
+    Import modules on a background thread, so an entry point starts fast and
+    the first turn does not pay for the imports either. Failures are left
+    to surface at first use.
+    """
+    def run():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    thread.start()
+    return thread
@@ -1,36 +1,162 @@
 """
 Logging utilities
 """
+import threading
 import time
-from typing import Callable, List, Dict
+import weakref
+from collections import deque
+from typing import Callable, Deque, Dict, List, Tuple
+import config
 
-class Logger:
-    """Simple logger for tracking events"""
+LEVELS = {
+    'debug': 10,
+    'info': 20,
+    'success': 25,
+    'warning': 30,
+    'error': 40,
+}
+
+
+class _Handler:
+    """
+    The one background thread draining the queues of all Loggers. Started
+    on the first record and stopped after LOG_HANDLER_IDLE seconds without
+    any, so idle processes (and abandoned Streamlit sessions) hold no thread.
+    Loggers are tracked weakly and drop out once garbage collected.
+    """
     
     def __init__(self):
-        self.logs: List[Dict] = []
+        self.loggers = weakref.WeakSet()
+        self.wake = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+    
+    def register(self, logger: 'Logger'):
+        with self.lock:
+            self.loggers.add(logger)
+    
+    def unregister(self, logger: 'Logger'):
+        with self.lock:
+            self.loggers.discard(logger)
+    
+    def notify(self):
+        """Wake the thread, starting it if it is not running"""
+        # Unlocked fast path: a stale non-None read is caught by the
+        # re-check in _run after the thread clears itself
+        if self.thread is None:
+            with self.lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._run, name='logger', daemon=True)
+                    self.thread.start()
+        if not self.wake.is_set():
+            self.wake.set()
+    
+    def _run(self):
+        idle_since = time.monotonic()
+        while True:
+            self.wake.wait(0.1)
+            self.wake.clear()
+            with self.lock:
+                loggers = list(self.loggers)
+            busy = any([logger._drain() for logger in loggers])
+            # No strong references while waiting, so dropped loggers can be collected
+            del loggers
+            if busy:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since >= config.LOG_HANDLER_IDLE:
+                with self.lock:
+                    if any(logger._queue for logger in self.loggers):
+                        continue
+                    self.thread = None
+                # A producer may have queued after the check above but read
+                # `thread` before it was cleared, and so started no thread:
+                # look again, or its record would wait for the next one
+                with self.lock:
+                    pending = any(logger._queue for logger in self.loggers)
+                if pending:
+                    self.notify()
+                return
+
+
+_handler = _Handler()
+
+
+class Logger:
+    """
+    Logger for tracking events, kept off the caller's hot path.
+    
+    `log` only filters by level and appends to a bounded deque under a short
+    lock (no formatting or I/O); a background thread shared by all loggers
+    formats records, stores them in a bounded ring, runs callbacks and prints. When the queue is full
+    new records are dropped and counted rather than blocking the caller.
+    """
+    
+    def __init__(
+        self,
+        level: str = config.LOG_LEVEL,
+        capacity: int = config.LOG_CAPACITY,
+        queue_size: int = config.LOG_QUEUE_SIZE,
+        console: bool = config.LOG_CONSOLE,
+    ):
+        """
+        :param level: Minimum level recorded ('debug', 'info', 'success', 'warning', 'error')
+        :param capacity: Number of recent records kept for get_logs
+        :param queue_size: Max records waiting for the handler thread
+        :param console: Whether records are printed
+        """
+        self.level = LEVELS[level]
+        self.console = console
+        self.queue_size = queue_size
+        self.logs: Deque[Dict] = deque(maxlen=capacity)
         self.callbacks: List[Callable] = []
+        
+        self.dropped = 0
+        self.filtered = 0
+        self.emitted = 0
+        
+        self._queue: Deque[Tuple[float, str, str]] = deque()
+        # Records ever queued / handled, for flush
+        self._queued = 0
+        self._handled = 0
+        self._count_lock = threading.Lock()
+        _handler.register(self)
+    
+    # ---------- Levels ----------
+    
+    def set_level(self, level: str):
+        self.level = LEVELS[level]
+    
+    def is_enabled(self, log_type: str) -> bool:
+        return LEVELS.get(log_type, LEVELS['info']) >= self.level
+    
+    @property
+    def debug_enabled(self) -> bool:
+        """Guard for hot paths: skip building debug messages when disabled"""
+        return self.level <= LEVELS['debug']
+    
+    # ---------- Producing ----------
     
     def add_callback(self, callback: Callable):
-        """Add a callback to be called when logging"""
+        """Add a callback, run on the handler thread for every record"""
         self.callbacks.append(callback)
     
     def log(self, log_type: str, message: str):
         """Log a message"""
-        timestamp = time.strftime("%H:%M:%S")
-        log_entry = {
-            'timestamp': timestamp,
-            'type': log_type,
-            'message': message
-        }
-        self.logs.append(log_entry)
+        if LEVELS.get(log_type, LEVELS['info']) < self.level:
+            with self._count_lock:
+                self.filtered += 1
+            return
         
-        # Call callbacks
-        for callback in self.callbacks:
-            callback(log_type, message)
-        
-        # Console output
-        print(f"[{timestamp}] [{log_type.upper()}] {message}")
+        with self._count_lock:
+            if len(self._queue) >= self.queue_size:
+                self.dropped += 1
+                return
+            self._queue.append((time.time(), log_type, message))
+            self._queued += 1
+        _handler.notify()
+    
+    def debug(self, message: str):
+        self.log('debug', message)
     
     def info(self, message: str):
         self.log('info', message)
@@ -44,11 +170,74 @@ class Logger:
     def error(self, message: str):
         self.log('error', message)
     
+    # ---------- Handler thread ----------
+    
+    def _drain(self) -> bool:
+        """Handle queued records; returns whether there were any"""
+        handled = False
+        while True:
+            try:
+                created, log_type, message = self._queue.popleft()
+            except IndexError:
+                return handled
+            handled = True
+            
+            timestamp = time.strftime("%H:%M:%S", time.localtime(created))
+            self.logs.append({
+                'timestamp': timestamp,
+                'type': log_type,
+                'message': message
+            })
+            
+            for callback in self.callbacks:
+                try:
+                    callback(log_type, message)
+                except Exception:
+                    pass
+            
+            if self.console:
+                print(f"[{timestamp}] [{log_type.upper()}] {message}")
+            
+            self.emitted += 1
+            # Only the handler thread writes it
+            self._handled += 1
+    
+    # ---------- Reading ----------
+    
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Wait until queued records are handled; returns False on timeout"""
+        with self._count_lock:
+            target = self._queued
+        deadline = time.monotonic() + timeout
+        if self._handled < target:
+            _handler.notify()
+        while self._handled < target:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.002)
+        return True
+    
     def get_logs(self, limit: int = 20) -> List[Dict]:
         """Get recent logs"""
-        return self.logs[-limit:]
+        logs = list(self.logs)
+        return logs[-limit:]
+    
+    def stats(self) -> Dict:
+        """Record counters"""
+        with self._count_lock:
+            dropped, filtered = self.dropped, self.filtered
+        return {
+            'emitted': self.emitted,
+            'dropped': dropped,
+            'filtered': filtered,
+            'queued': len(self._queue),
+        }
     
     def clear(self):
         """Clear all logs"""
         self.logs.clear()
-
+    
+    def close(self):
+        """Handle remaining records and detach from the handler thread"""
+        self.flush(timeout=1.0)
+        _handler.unregister(self)
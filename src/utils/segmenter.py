@@ -0,0 +1,52 @@
+"""
+Sentence segmentation for streamed LLM output
+"""
+import re
+from typing import List, Optional
+
+# Sentence end: terminal punctuation, optional closing quotes/brackets,
+# followed by whitespace. Requiring whitespace keeps "3.5" and "e.g" intact
+# until the next token shows how the text continues.
+SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+
+ABBREVIATIONS = {
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc', 'e.g', 'i.e',
+}
+
+
+class SentenceSegmenter:
+    """Incrementally splits a token stream into sentences"""
+    
+    def __init__(self, min_chars: int = 12):
+        """
+        :param min_chars: Sentences shorter than this are merged into the next one
+        """
+        self.min_chars = min_chars
+        self.buffer = ''
+    
+    def _is_abbreviation(self, text: str) -> bool:
+        """Check whether text ends in a known abbreviation"""
+        words = text.rstrip('.').split()
+        return bool(words) and words[-1].lower() in ABBREVIATIONS
+    
+    def feed(self, token: str) -> List[str]:
+        """Add a token and return any sentences it completed"""
+        self.buffer += token
+        sentences = []
+        start = 0
+        
+        for match in SENTENCE_END.finditer(self.buffer):
+            candidate = self.buffer[start:match.end()].strip()
+            if len(candidate) < self.min_chars or self._is_abbreviation(candidate):
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        
+        self.buffer = self.buffer[start:]
+        return sentences
+    
+    def flush(self) -> Optional[str]:
+        """Return whatever text is left once the stream ends"""
+        remainder = self.buffer.strip()
+        self.buffer = ''
+        return remainder or None
@@ -0,0 +1,11 @@
+"""
+Text normalization for transcript matching
+"""
+import re
+
+WORD = re.compile(r"\w+")
+
+
+def normalize_transcript(text: str) -> str:
+    """Lowercase words only, so punctuation/casing changes still match."""
+    return " ".join(WORD.findall(text.lower()))
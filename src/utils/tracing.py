@@ -0,0 +1,152 @@
+"""
+Latency tracing: per-interaction spans and percentile rollups
+"""
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, List, Optional
+import config
+
+# Trace of the interaction running in the current context. asyncio tasks and
+# the pipeline engine's handler threads run in a copy of the caller's
+# context, so pipeline stages record into it.
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+
+
+class Trace:
+    """Spans of one interaction, timed with a monotonic ns clock."""
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.origin_ns = time.perf_counter_ns()
+        self.spans: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start_ns: int, end_ns: int):
+        """Record a span from two time.perf_counter_ns() readings."""
+        with self._lock:
+            self.spans.append({
+                'name': name,
+                'start_ms': (start_ns - self.origin_ns) / 1e6,
+                'duration_ms': (end_ns - start_ns) / 1e6,
+            })
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter_ns())
+
+    def durations(self) -> Dict[str, float]:
+        """Total milliseconds per span name."""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span['name']] = totals.get(span['name'], 0.0) + span['duration_ms']
+        return totals
+
+    def to_dict(self) -> Dict:
+        return {
+            'trace_id': self.trace_id,
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+            'spans': sorted(self.spans, key=lambda span: span['start_ms']),
+        }
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def activate(trace: Trace) -> Iterator[Trace]:
+    """Make `trace` the current trace for this context."""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block as a span of the current trace (no-op without one)."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.span(name):
+        yield
+
+
+def record_span(name: str, start_ns: int, end_ns: int):
+    """Add a span with explicit bounds to the current trace, if any."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, start_ns, end_ns)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linear-interpolated percentile of pre-sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+class Tracer:
+    """
+    Collects finished traces into per-span latency windows (p50/p95/p99)
+    and optionally appends each trace to a JSON lines file.
+    """
+
+    def __init__(
+        self,
+        window: int = config.TRACE_WINDOW,
+        export_path: Optional[str] = config.TRACE_EXPORT_PATH,
+    ):
+        """
+        :param window: Samples kept per span name for percentiles
+        :param export_path: JSON lines file traces are appended to (None disables)
+        """
+        self.window = window
+        self.export_path = export_path
+        self.samples: Dict[str, Deque[float]] = {}
+        self.last_trace: Optional[Trace] = None
+        self._lock = threading.Lock()
+
+    def finish(self, trace: Trace):
+        """Roll a completed trace into the stats and export it."""
+        with self._lock:
+            for name, duration in trace.durations().items():
+                self.samples.setdefault(name, deque(maxlen=self.window)).append(duration)
+            self.last_trace = trace
+
+            if self.export_path:
+                try:
+                    with open(self.export_path, 'a') as f:
+                        f.write(json.dumps(trace.to_dict()) + '\n')
+                except OSError:
+                    pass
+
+    def summary(self) -> List[Dict]:
+        """Per-span count and p50/p95/p99 (milliseconds)."""
+        with self._lock:
+            rows = []
+            for name, values in self.samples.items():
+                ordered = sorted(values)
+                rows.append({
+                    'span': name,
+                    'count': len(ordered),
+                    'p50_ms': round(percentile(ordered, 50), 1),
+                    'p95_ms': round(percentile(ordered, 95), 1),
+                    'p99_ms': round(percentile(ordered, 99), 1),
+                })
+            return rows
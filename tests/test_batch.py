@@ -0,0 +1,86 @@
+"""
+Unit tests for src/pipeline/batch.py: result statuses (a file without
+speech is not a failure), resuming from the results file, file names and
+the rate limiter. Deepgram is faked.
+"""
+import json
+import time
+
+from src.pipeline.batch import BatchItem, BatchRunner, RateLimiter, safe_name
+from src.utils.logger import Logger
+
+
+class FakeDeepgram:
+    """Transcripts by file content: b"speech", b"silence" or b"error"."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio, encoding=None, sample_rate=None):
+        self.calls += 1
+        return {b"speech": "hello there", b"silence": "", b"error": None}[audio]
+
+
+def write_items(tmp_path, contents):
+    items = []
+    for name, content in contents.items():
+        path = tmp_path / f"{name}.wav"
+        path.write_bytes(content)
+        items.append(BatchItem(name, path=str(path)))
+    return items
+
+
+def read_results(path):
+    with open(path, encoding="utf-8") as f:
+        return {record["id"]: record for record in map(json.loads, f)}
+
+
+def make_runner(tmp_path, deepgram) -> BatchRunner:
+    return BatchRunner(
+        deepgram, Logger(level="error", console=False),
+        str(tmp_path / "results.jsonl"), workers=2,
+    )
+
+
+def test_file_without_speech_is_ok(tmp_path):
+    items = write_items(
+        tmp_path, {"a": b"speech", "b": b"silence", "c": b"error"}
+    )
+    runner = make_runner(tmp_path, FakeDeepgram())
+    stats = runner.run(items, runner.transcribe)
+
+    results = read_results(runner.output)
+    assert results["a"]["status"] == "ok" and results["a"]["transcript"] == "hello there"
+    assert results["b"]["status"] == "ok" and results["b"]["transcript"] == ""
+    assert results["c"]["status"] == "failed"
+    assert stats["ok"] == 2 and stats["failed"] == 1
+
+
+def test_rerun_skips_items_done_ok(tmp_path):
+    items = write_items(
+        tmp_path, {"a": b"speech", "b": b"silence", "c": b"error"}
+    )
+    runner = make_runner(tmp_path, FakeDeepgram())
+    runner.run(items, runner.transcribe)
+
+    deepgram = FakeDeepgram()
+    rerun = make_runner(tmp_path, deepgram)
+    stats = rerun.run(items, rerun.transcribe)
+    # Only the failed file is tried again
+    assert deepgram.calls == 1
+    assert stats["skipped"] == 2 and stats["failed"] == 1
+
+
+def test_safe_names_do_not_collide():
+    assert safe_name("a/b") != safe_name("a_b")
+    assert safe_name("a/b").startswith("a_b-")
+    assert safe_name("..").startswith("item-")
+
+
+def test_rate_limiter_spaces_acquisitions():
+    limiter = RateLimiter(rate=20, burst=2)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    # Two from the burst, then four at 20/s
+    assert time.monotonic() - start >= 0.18
@@ -0,0 +1,135 @@
+"""
+Unit tests for src/pipeline/engine.py: ordering, stage timeouts (streaming
+timeouts cover only the waits for the handler) and cancellation.
+"""
+import concurrent.futures
+import threading
+import time
+
+from src.pipeline.engine import Pipeline, Stage, StageTimeout
+from src.utils.logger import Logger
+
+
+def run(*stages: Stage, inputs=(1,)):
+    return Pipeline(list(stages), Logger(level="error", console=False)).run(list(inputs))
+
+
+def ticks(count: int, gap: float):
+    """A streaming handler yielding `count` items, `gap` seconds apart."""
+    def handler(item):
+        for i in range(count):
+            time.sleep(gap)
+            yield i
+    return handler
+
+
+def slow(delay: float):
+    def handler(item):
+        time.sleep(delay)
+        return item
+    return handler
+
+
+def test_outputs_keep_input_order():
+    result = run(
+        Stage("double", lambda x: x * 2),
+        Stage("inc", lambda x: x + 1),
+        inputs=range(5),
+    )
+    assert result.ok
+    assert result.outputs == [1, 3, 5, 7, 9]
+
+
+def test_none_drops_the_item():
+    result = run(Stage("odd", lambda x: x if x % 2 else None), inputs=range(4))
+    assert result.outputs == [1, 3]
+
+
+def test_stage_timeout_fails_the_run():
+    start = time.perf_counter()
+    result = run(Stage("slow", slow(2.0), timeout=0.2))
+    assert isinstance(result.error, StageTimeout)
+    assert result.error.stage == "slow"
+    # The abandoned handler is not waited for
+    assert time.perf_counter() - start < 1.0
+
+
+def test_streaming_timeout_bounds_each_gap_not_the_whole_stream():
+    # 5 items 0.1 s apart take 0.5 s in all, well over the 0.3 s timeout
+    result = run(Stage("stream", ticks(5, 0.1), timeout=0.3, streaming=True))
+    assert result.ok
+    assert result.outputs == [0, 1, 2, 3, 4]
+
+
+def test_streaming_timeout_fires_on_a_long_gap():
+    result = run(Stage("stream", ticks(3, 0.5), timeout=0.2, streaming=True))
+    assert isinstance(result.error, StageTimeout)
+    assert result.error.stage == "stream"
+
+
+def test_streaming_timeout_ignores_downstream_backpressure():
+    # The producer is fast but blocks ~0.8 s on the consumer's full inbox
+    result = run(
+        Stage("stream", ticks(5, 0.0), timeout=0.3, streaming=True),
+        Stage("consume", slow(0.2), timeout=1.0, queue_size=1),
+    )
+    assert result.ok
+    assert result.outputs == [0, 1, 2, 3, 4]
+
+
+def test_streaming_generator_is_closed_on_timeout():
+    closed = []
+
+    def handler(item):
+        try:
+            yield 1
+            time.sleep(0.5)
+            yield 2
+        finally:
+            closed.append(True)
+
+    result = run(Stage("stream", handler, timeout=0.1, streaming=True))
+    assert isinstance(result.error, StageTimeout)
+    # Closed once the abandoned step returns
+    time.sleep(0.6)
+    assert closed == [True]
+
+
+def test_cancel_stops_the_run():
+    pipeline = Pipeline(
+        [Stage("slow", slow(0.1))], Logger(level="error", console=False)
+    )
+
+    def cancel_after_first(item):
+        if item == 1:
+            pipeline.cancel()
+        return item
+
+    pipeline.stages.insert(0, Stage("cancel", cancel_after_first))
+    result = pipeline.run(range(10))
+    assert result.cancelled
+    assert len(result.outputs) < 10
+
+
+def test_injected_executor_is_used_and_left_running():
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=2, thread_name_prefix="shared"
+    )
+    names = []
+
+    def record(item):
+        names.append(threading.current_thread().name)
+        return item
+
+    pipeline = Pipeline(
+        [Stage("a", record), Stage("b", record)],
+        Logger(level="error", console=False), executor=executor,
+    )
+    try:
+        assert pipeline.run([1, 2]).outputs == [1, 2]
+        assert pipeline.run([3]).outputs == [3]
+        assert all(name.startswith("shared") for name in names)
+        # Still usable after the runs
+        assert executor.submit(lambda: 42).result() == 42
+    finally:
+        executor.shutdown()
@@ -0,0 +1,79 @@
+"""
+Tests for LiveTranscription in src/services/deepgram.py against the local
+mock live server (src/mock/deepgram_live.py): KeepAlives hold the stream
+open while waiting for speech.
+"""
+import time
+
+import pytest
+from websockets.sync.client import connect
+
+from src.mock.deepgram_live import MockLiveServer
+from src.services.deepgram import LiveTranscription
+from src.utils.logger import Logger
+
+# Mock server closes a stream after this long without audio or KeepAlive
+IDLE_TIMEOUT = 0.6
+SPEECH = b"\x01\x00" * 512
+
+
+@pytest.fixture
+def server():
+    mock = MockLiveServer(
+        "hi there", bytes_per_word=100, finalize_delay=0.01,
+        idle_timeout=IDLE_TIMEOUT,
+    ).start()
+    yield mock
+    mock.stop()
+
+
+def open_stream(server: MockLiveServer, keepalive_interval: float) -> LiveTranscription:
+    logger = Logger(level="error", console=False)
+    return LiveTranscription(
+        connect(server.url), logger, keepalive_interval=keepalive_interval
+    )
+
+
+def test_keepalives_hold_the_stream_open_until_speech(server):
+    live = open_stream(server, keepalive_interval=0.2)
+    # Silence for several idle timeouts before speech starts
+    time.sleep(IDLE_TIMEOUT * 3)
+    for _ in range(5):
+        live.send(SPEECH)
+
+    assert live.finish(timeout=2.0) == "hi there"
+    assert live.keepalives > 0
+    assert server.keepalives == live.keepalives
+    assert server.idle_closes == 0
+
+
+def test_idle_stream_is_closed_without_keepalives(server):
+    # The mock's idle timeout is real: with no KeepAlive the stream is lost
+    live = open_stream(server, keepalive_interval=60.0)
+    time.sleep(IDLE_TIMEOUT * 3)
+    live.send(SPEECH)
+
+    assert live.finish(timeout=1.0) is None
+    assert live.keepalives == 0
+    assert server.idle_closes == 1
+
+
+def test_no_keepalives_while_audio_flows(server):
+    live = open_stream(server, keepalive_interval=0.2)
+    for _ in range(10):
+        live.send(SPEECH)
+        time.sleep(0.05)
+
+    assert live.finish(timeout=2.0) == "hi there"
+    assert live.keepalives == 0
+
+
+def test_keepalives_stop_after_finish(server):
+    live = open_stream(server, keepalive_interval=0.1)
+    time.sleep(0.3)
+    live.send(SPEECH)
+    live.finish(timeout=2.0)
+    sent = live.keepalives
+
+    time.sleep(0.3)
+    assert live.keepalives == sent
@@ -0,0 +1,125 @@
+"""
+Unit tests for src/utils/logger.py: level filtering, the bounded queue,
+flush with concurrent producers and the shared handler thread stopping
+when idle and restarting on the next record.
+"""
+import gc
+import threading
+import time
+
+import config
+from src.utils import logger as logger_module
+from src.utils.logger import Logger
+
+
+def make_logger(**kwargs) -> Logger:
+    options = dict(level="info", console=False)
+    options.update(kwargs)
+    return Logger(**options)
+
+
+def wait_until(condition, timeout: float = 2.0) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_records_are_handled_in_order():
+    logger = make_logger()
+    seen = []
+    logger.add_callback(lambda log_type, message: seen.append((log_type, message)))
+    logger.info("one")
+    logger.warning("two")
+    logger.error("three")
+
+    assert logger.flush()
+    assert [log["message"] for log in logger.get_logs()] == ["one", "two", "three"]
+    assert seen == [("info", "one"), ("warning", "two"), ("error", "three")]
+
+
+def test_records_below_the_level_are_filtered():
+    logger = make_logger(level="warning")
+    logger.debug("a")
+    logger.info("b")
+    logger.error("c")
+
+    assert logger.flush()
+    stats = logger.stats()
+    assert stats["filtered"] == 2
+    assert stats["emitted"] == 1
+
+
+def test_full_queue_drops_records():
+    logger = make_logger(queue_size=10)
+    # Hold the handler inside a callback so the queue fills up
+    release = threading.Event()
+    logger.add_callback(lambda log_type, message: release.wait(2.0))
+    for i in range(50):
+        logger.info(f"record {i}")
+    release.set()
+
+    assert logger.flush()
+    stats = logger.stats()
+    assert stats["dropped"] > 0
+    assert stats["emitted"] + stats["dropped"] == 50
+
+
+def test_flush_waits_for_concurrent_producers():
+    logger = make_logger(queue_size=100000)
+    threads = [
+        threading.Thread(target=lambda: [logger.info("x") for _ in range(2000)])
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert logger.flush(timeout=5.0)
+    assert logger.stats()["emitted"] == 8 * 2000
+
+
+def test_idle_handler_stops_and_restarts(monkeypatch):
+    monkeypatch.setattr(config, "LOG_HANDLER_IDLE", 0.05)
+    logger = make_logger()
+    logger.info("before")
+    assert logger.flush()
+    assert wait_until(lambda: logger_module._handler.thread is None)
+
+    logger.info("after")
+    assert logger.flush()
+    assert logger.get_logs()[-1]["message"] == "after"
+
+
+def test_records_racing_the_idle_stop_are_handled(monkeypatch):
+    monkeypatch.setattr(config, "LOG_HANDLER_IDLE", 0.0)
+    logger = make_logger(queue_size=100000)
+    # With no idle grace, the handler keeps stopping between bursts
+    for burst in range(200):
+        logger.info(f"burst {burst}")
+        time.sleep(0.0005 * (burst % 5))
+    assert logger.flush(timeout=5.0)
+    assert logger.stats()["emitted"] == 200
+
+
+def test_collected_loggers_leave_the_handler():
+    logger = make_logger()
+    logger.info("hello")
+    assert logger.flush()
+    handler = logger_module._handler
+    count = len(handler.loggers)
+
+    del logger
+    gc.collect()
+    assert wait_until(lambda: len(handler.loggers) < count)
+
+
+def test_close_flushes_and_detaches():
+    logger = make_logger()
+    logger.info("last words")
+    logger.close()
+    assert logger.get_logs()[-1]["message"] == "last words"
+    assert logger not in logger_module._handler.loggers
@@ -0,0 +1,207 @@
+"""
+Unit tests for src/services/memory.py: trimming at the token budget, the
+summary of dropped turns, and memory across a hands-free session limited
+by `max_turns`. Services and the recorder are faked.
+"""
+import numpy as np
+
+import config
+from src.audio.wav import build_wav
+from src.pipeline.session import ConversationSession
+from src.pipeline.voice import VoicePipeline
+from src.services.memory import (
+    MESSAGE_OVERHEAD,
+    ConversationMemory,
+    estimate_tokens,
+    truncate_tokens,
+)
+from src.utils.logger import Logger
+
+# 'hello there' and 'hi' are 2 and 1 tokens: with the per-message overhead,
+# one such turn costs 11 tokens
+TURN_TOKENS = 2 + 1 + 2 * MESSAGE_OVERHEAD
+
+
+def add_turns(memory: ConversationMemory, count: int):
+    for i in range(count):
+        memory.add_turn(f"hello there{i}", "hi")
+
+
+# ---------- Token estimates ----------
+
+def test_estimate_tokens_counts_words_and_punctuation():
+    assert estimate_tokens("hello there") == 2
+    assert estimate_tokens("Hi, you!") == 4
+    # Long words cost one token per 4 characters
+    assert estimate_tokens("internationalization") == 5
+
+
+def test_truncate_tokens_marks_the_cut():
+    assert truncate_tokens("one two three", 5) == "one two three"
+    # The marker counts as one of the tokens
+    assert truncate_tokens("one two three four", 3) == "one two…"
+    assert estimate_tokens(truncate_tokens("one two three four", 3)) == 3
+
+
+# ---------- Budget ----------
+
+def test_history_exactly_at_budget_is_kept():
+    memory = ConversationMemory(budget=2 * TURN_TOKENS, summary_tokens=0)
+    add_turns(memory, 2)
+    assert memory.stats()["history_tokens"] == 2 * TURN_TOKENS
+    assert memory.dropped == 0
+    assert len(memory.history()) == 4
+
+
+def test_one_token_over_budget_drops_the_oldest_turn():
+    memory = ConversationMemory(budget=2 * TURN_TOKENS - 1, summary_tokens=0)
+    add_turns(memory, 2)
+    history = memory.history()
+    assert memory.dropped == 2
+    assert [m["content"] for m in history] == ["hello there1", "hi"]
+    assert memory.stats()["history_tokens"] == TURN_TOKENS
+
+
+def test_trimmed_history_starts_with_a_user_message():
+    memory = ConversationMemory(budget=3 * TURN_TOKENS, summary_tokens=0)
+    add_turns(memory, 10)
+    roles = [m["role"] for m in memory.history()]
+    assert roles == ["user", "assistant"] * 3
+    assert memory.stats()["history_tokens"] <= memory.budget
+
+
+def test_latest_turn_is_kept_even_over_budget():
+    memory = ConversationMemory(budget=5, summary_tokens=0)
+    memory.add_turn("a question far longer than the whole budget", "an answer")
+    assert len(memory.history()) == 2
+
+
+def test_summary_counts_towards_the_budget():
+    memory = ConversationMemory(budget=8 * TURN_TOKENS, summary_tokens=20)
+    add_turns(memory, 20)
+    history = memory.history()
+    assert memory.summary
+    assert memory.stats()["history_tokens"] <= memory.budget
+    assert history[0]["role"] == "system"
+    # The summary took the room of some turns, not all of them
+    assert 2 < len(history) - 1 < 16
+
+
+def test_prompt_tokens_include_system_history_and_message():
+    memory = ConversationMemory(system_prompt="Be brief.")
+    add_turns(memory, 1)
+    system = estimate_tokens("Be brief.") + MESSAGE_OVERHEAD
+    message = estimate_tokens("and now?") + MESSAGE_OVERHEAD
+    assert memory.prompt_tokens("and now?") == system + TURN_TOKENS + message
+
+
+# ---------- Summary ----------
+
+def test_dropped_user_messages_are_summarized():
+    memory = ConversationMemory(budget=TURN_TOKENS, summary_tokens=40)
+    memory.add_turn("tell me about Paris", "It is in France.")
+    memory.add_turn("and Rome", "It is in Italy.")
+    memory.add_turn("and Oslo", "It is in Norway.")
+    assert "tell me about Paris" in memory.summary
+    assert "and Rome" in memory.summary
+    assert memory.history()[-2]["content"] == "and Oslo"
+
+
+def test_oversize_message_is_truncated_not_wiping_the_summary():
+    memory = ConversationMemory(budget=TURN_TOKENS, summary_tokens=10)
+    memory.add_turn("weather in Paris", "Sunny.")
+    memory.add_turn(" ".join(["word"] * 50), "Okay.")
+    memory.add_turn("thanks", "Welcome.")
+
+    topics = memory.summary.split(" | ")
+    assert topics[0] == "weather in Paris"
+    # The long message keeps its first words, capped at half the summary
+    assert topics[1].startswith("word word") and topics[1].endswith("…")
+    assert estimate_tokens(topics[1]) <= 10 // 2
+    assert estimate_tokens(memory.summary) <= 10
+
+
+def test_oldest_topics_fall_off_the_summary():
+    memory = ConversationMemory(budget=TURN_TOKENS, summary_tokens=6)
+    for topic in ["alpha one", "beta two", "gamma three", "delta four"]:
+        memory.add_turn(topic, "ok")
+    assert "alpha one" not in memory.summary
+    assert memory.summary.endswith("gamma three")
+    assert estimate_tokens(memory.summary) <= 6
+
+
+def test_zero_summary_tokens_drops_silently():
+    memory = ConversationMemory(budget=TURN_TOKENS, summary_tokens=0)
+    add_turns(memory, 3)
+    assert memory.summary == ""
+    assert all(m["role"] != "system" for m in memory.history())
+
+
+# ---------- Across a session ----------
+
+class FakeRecorder:
+    vad_threshold = config.DEFAULT_VAD_THRESHOLD
+    vad = None
+
+    def record_with_vad(self, status_callback, chunk_callback=None):
+        status_callback("speaking")
+        samples = (np.sin(np.arange(16000) / 5) * 8000).astype(np.int16)
+        return memoryview(build_wav([samples], config.SAMPLE_RATE))
+
+    def stop(self):
+        pass
+
+    def cleanup(self):
+        pass
+
+
+class FakeDeepgram:
+    def __init__(self, transcripts):
+        self.transcripts = iter(transcripts)
+
+    def transcribe(self, audio, encoding=None, sample_rate=None):
+        return next(self.transcripts)
+
+    def synthesize(self, text):
+        return None
+
+
+class FakeGroq:
+    def __init__(self):
+        self.histories = []
+
+    def chat_stream(self, text, history=None, cancel=None, on_error=None):
+        self.histories.append(list(history or []))
+        yield f"You said {text}. It is a fine question, with a long answer."
+
+
+def test_session_max_turns_with_a_trimmed_memory(monkeypatch):
+    monkeypatch.setattr(config, "STREAMING_STT", False)
+    monkeypatch.setattr(config, "STREAMING_LLM", True)
+    logger = Logger(level="error", console=False)
+    transcripts = ["first question", "second question", "third question", "unused"]
+    groq = FakeGroq()
+    # Just short of three turns: the third drops the first into the summary,
+    # which costs less than a turn
+    turn = estimate_tokens(
+        "first question You said first question. It is a fine question, with a long answer."
+    ) + 2 * MESSAGE_OVERHEAD
+    memory = ConversationMemory(budget=3 * turn - 1, summary_tokens=20)
+    voice = VoicePipeline(
+        FakeRecorder(), FakeDeepgram(transcripts), groq, logger, memory=memory
+    )
+    session = ConversationSession(voice, logger, max_turns=3, idle_turns=0, barge_in=False)
+
+    session.start()
+    session._thread.join(10)
+
+    assert not session.running
+    assert session.snapshot().turns == 3
+    # Each request carried the turns before it
+    assert [len(history) for history in groq.histories] == [0, 2, 4]
+    # The session stopped before the fourth utterance; the memory holds the
+    # last two turns and summarizes the first
+    assert [m["content"] for m in memory.history() if m["role"] == "user"] == [
+        "second question", "third question",
+    ]
+    assert memory.summary == "first question"
@@ -0,0 +1,75 @@
+"""
+Unit tests for src/audio/preprocess.py: silence trimming with the energy
+threshold and with the configured VAD backend, and re-encoding.
+"""
+import numpy as np
+import pytest
+
+import config
+from src.audio.preprocess import UploadPreprocessor
+from src.audio.vad import AdaptiveEnergyVAD
+from src.audio.wav import build_wav
+from src.pipeline.voice import VoicePipeline
+from src.utils.logger import Logger
+
+RATE = config.SAMPLE_RATE
+
+
+def utterance(noise: float = 0.0) -> memoryview:
+    """One second of silence (or noise), half a second of tone, one second of silence."""
+    rng = np.random.default_rng(0)
+    lead, tail = ((rng.standard_normal(RATE) * noise).astype(np.int16) for _ in range(2))
+    tone = (np.sin(np.arange(RATE // 2) / 5) * 8000).astype(np.int16)
+    return memoryview(build_wav([lead, tone, tail], RATE))
+
+
+def test_energy_backend_trims_silence():
+    preprocessor = UploadPreprocessor(padding=0.1, encoding="linear16", sample_rate=RATE)
+    prepared = preprocessor.process(utterance())
+    assert prepared.trimmed_seconds == pytest.approx(1.8, abs=0.02)
+    assert prepared.saved_bytes > 0
+
+
+def test_adaptive_backend_trims_noise_above_the_energy_threshold():
+    # Background noise louder than the fixed threshold: the energy backend
+    # keeps everything, the adaptive one learns the floor
+    noisy = utterance(noise=200.0)
+    energy = UploadPreprocessor(padding=0.1, encoding="linear16", sample_rate=RATE)
+    assert energy.process(noisy).trimmed_seconds == 0.0
+
+    adaptive = UploadPreprocessor(
+        padding=0.1, encoding="linear16", sample_rate=RATE, vad_backend="adaptive"
+    )
+    assert adaptive.process(noisy).trimmed_seconds == pytest.approx(1.8, abs=0.15)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        UploadPreprocessor(vad_backend="nope")
+
+
+def test_no_speech_is_left_untrimmed():
+    silence = memoryview(build_wav([np.zeros(RATE, dtype=np.int16)], RATE))
+    prepared = UploadPreprocessor(encoding="linear16", sample_rate=RATE).process(silence)
+    assert prepared.trimmed_seconds == 0.0
+
+
+def test_mulaw_halves_the_bytes():
+    preprocessor = UploadPreprocessor(trim=False, encoding="mulaw", sample_rate=RATE)
+    prepared = preprocessor.process(utterance())
+    assert prepared.encoding == "mulaw"
+    assert len(prepared.data) == int(2.5 * RATE)
+
+
+class FakeRecorder:
+    vad_threshold = 120
+
+    def __init__(self, vad):
+        self.vad = vad
+
+
+def test_voice_pipeline_uses_the_recorder_backend():
+    logger = Logger(level="error", console=False)
+    voice = VoicePipeline(FakeRecorder(AdaptiveEnergyVAD()), None, None, logger)
+    assert voice.preprocessor.vad_backend == "adaptive"
+    assert voice.preprocessor.threshold == 120
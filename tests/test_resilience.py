@@ -0,0 +1,312 @@
+"""
+Unit tests for src/services/resilience.py: hedging, the circuit breaker's
+half-open trial, per-call breaker outcomes and deadline handling.
+Requests are simulated; nothing is sent over the network.
+"""
+import threading
+import time
+
+import pytest
+import requests
+import tenacity
+
+from src.services.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    Resilience,
+    TransientError,
+    format_resilience_stats,
+)
+from src.utils.deadline import DeadlineExceeded, deadline
+
+
+def response(status_code: int = 200, body: bytes = b"ok") -> requests.Response:
+    result = requests.Response()
+    result.status_code = status_code
+    result._content = body
+    return result
+
+
+def make_resilience(**kwargs) -> Resilience:
+    options = dict(
+        attempts=3, backoff=0.01, backoff_max=0.02,
+        hedge_percentile=50, hedge_min_samples=1,
+        breaker_failures=2, breaker_reset=0.2,
+    )
+    options.update(kwargs)
+    return Resilience(**options)
+
+
+def failing(*errors):
+    """A send callable raising `errors` in turn, then answering 200."""
+    calls = []
+
+    def send(timeout):
+        calls.append(timeout)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return response()
+
+    send.calls = calls
+    return send
+
+
+# ---------- Retries and breaker outcomes ----------
+
+def test_retries_transient_errors_then_succeeds():
+    resilience = make_resilience()
+    send = failing(requests.ConnectionError("reset"), requests.Timeout("slow"))
+
+    assert resilience.call("api", send).status_code == 200
+    stats = resilience.endpoint("api").stats()
+    assert len(send.calls) == 3
+    assert stats["retries"] == 2
+    assert stats["failures"] == 0
+
+
+def test_breaker_sees_one_outcome_per_call():
+    # Two failed attempts in one call are one failure: the circuit stays closed
+    resilience = make_resilience(breaker_failures=2)
+    send = failing(requests.ConnectionError("reset"), requests.ConnectionError("reset"))
+
+    assert resilience.call("api", send).status_code == 200
+    assert resilience.endpoint("api").breaker.state == CLOSED
+    assert resilience.endpoint("api").breaker.failures == 0
+
+
+def test_failed_calls_open_the_circuit():
+    resilience = make_resilience(attempts=2, breaker_failures=2)
+
+    def send(timeout):
+        raise requests.ConnectionError("down")
+
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            resilience.call("api", send)
+    endpoint = resilience.endpoint("api")
+    assert endpoint.breaker.state == OPEN
+    assert endpoint.counters["failures"] == 2
+
+    with pytest.raises(CircuitOpenError):
+        resilience.call("api", send)
+    assert endpoint.counters["short_circuits"] == 1
+
+
+def test_retryable_status_is_retried_and_raised():
+    resilience = make_resilience(attempts=2)
+    sent = []
+
+    def send(timeout):
+        sent.append(timeout)
+        return response(503, b"busy")
+
+    with pytest.raises(TransientError) as error:
+        resilience.call("api", send)
+    assert error.value.status_code == 503
+    assert len(sent) == 2
+    assert resilience.endpoint("api").breaker.failures == 1
+
+
+@pytest.mark.parametrize("status_code", [400, 401, 404])
+def test_client_errors_are_neutral(status_code):
+    resilience = make_resilience(breaker_failures=2)
+    endpoint = resilience.endpoint("api")
+    endpoint.breaker.record_failure()
+
+    result = resilience.call("api", lambda timeout: response(status_code))
+    assert result.status_code == status_code
+    # Neither a failure nor a success: the failure streak is unchanged
+    assert endpoint.breaker.failures == 1
+    assert endpoint.breaker.state == CLOSED
+    assert endpoint.counters["failures"] == 0
+
+
+def test_non_idempotent_calls_are_not_retried():
+    resilience = make_resilience()
+    send = failing(requests.ConnectionError("reset"))
+
+    with pytest.raises(requests.ConnectionError):
+        resilience.call("api", send, idempotent=False)
+    assert len(send.calls) == 1
+
+
+# ---------- Half-open trial ----------
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one trial at a time
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    # One failure is enough while half-open
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.opens == 2
+    assert not breaker.allow()
+
+
+def test_neutral_trial_frees_the_slot():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    breaker.record_neutral()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_trial_call_closes_the_circuit():
+    resilience = make_resilience(attempts=1, breaker_failures=1, breaker_reset=0.05)
+
+    with pytest.raises(requests.ConnectionError):
+        resilience.call("api", failing(requests.ConnectionError("down")))
+    with pytest.raises(CircuitOpenError):
+        resilience.call("api", lambda timeout: response())
+
+    time.sleep(0.06)
+    assert resilience.call("api", lambda timeout: response()).status_code == 200
+    assert resilience.endpoint("api").breaker.state == CLOSED
+
+
+# ---------- Hedging ----------
+
+def test_slow_request_is_hedged_and_backup_wins():
+    resilience = make_resilience()
+    # One fast observation: the hedge fires after ~10 ms
+    resilience.endpoint("api").record_latency(0.01)
+    released = threading.Event()
+    sent = []
+
+    def send(timeout):
+        sent.append(time.perf_counter())
+        if len(sent) == 1:
+            # The primary hangs until the test ends
+            released.wait(2.0)
+            return response(body=b"primary")
+        return response(body=b"backup")
+
+    try:
+        start = time.perf_counter()
+        result = resilience.call("api", send, hedge=True)
+        elapsed = time.perf_counter() - start
+    finally:
+        released.set()
+
+    assert result.content == b"backup"
+    assert elapsed < 1.0
+    stats = resilience.endpoint("api").stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_fast_request_is_not_hedged():
+    resilience = make_resilience()
+    resilience.endpoint("api").record_latency(0.5)
+    sent = []
+
+    def send(timeout):
+        sent.append(timeout)
+        return response()
+
+    assert resilience.call("api", send, hedge=True).status_code == 200
+    assert len(sent) == 1
+    assert resilience.endpoint("api").counters["hedges"] == 0
+
+
+def test_no_hedge_without_latency_samples():
+    resilience = make_resilience(hedge_min_samples=5)
+    sent = []
+
+    def send(timeout):
+        sent.append(timeout)
+        time.sleep(0.05)
+        return response()
+
+    resilience.call("api", send, hedge=True)
+    assert len(sent) == 1
+
+
+# ---------- Deadlines ----------
+
+def test_timeouts_are_capped_to_the_deadline():
+    resilience = make_resilience()
+    seen = []
+
+    def send(timeout):
+        seen.append(timeout)
+        return response()
+
+    with deadline(0.5):
+        resilience.call("api", send)
+    connect, read = seen[0]
+    assert connect <= 0.5 and read <= 0.5
+
+
+def test_retries_stop_at_the_deadline(monkeypatch):
+    # Backoff of 1 s cannot fit in a 0.2 s deadline: one attempt only. The
+    # jittered wait is pinned to its upper bound so a short draw cannot fit
+    monkeypatch.setattr(tenacity.wait.random, "uniform", lambda low, high: high)
+    resilience = make_resilience(attempts=5, backoff=1.0, backoff_max=1.0)
+    send = failing(*[requests.ConnectionError("down")] * 5)
+
+    start = time.perf_counter()
+    with deadline(0.2):
+        with pytest.raises(requests.ConnectionError):
+            resilience.call("api", send)
+    assert time.perf_counter() - start < 0.2
+    assert len(send.calls) == 1
+
+
+def test_passed_deadline_sends_nothing_and_is_neutral():
+    resilience = make_resilience(breaker_failures=1)
+    send = failing()
+
+    with deadline(0.0):
+        with pytest.raises(DeadlineExceeded):
+            resilience.call("api", send)
+    assert send.calls == []
+    assert resilience.endpoint("api").breaker.state == CLOSED
+
+
+def test_cancel_stops_retries():
+    class Cancelled:
+        cancelled = True
+
+    resilience = make_resilience(attempts=5)
+    send = failing(*[requests.ConnectionError("down")] * 5)
+    with pytest.raises(requests.ConnectionError):
+        resilience.call("api", send, cancel=Cancelled())
+    assert len(send.calls) == 1
+
+
+# ---------- Stats ----------
+
+def test_format_resilience_stats():
+    resilience = make_resilience()
+    resilience.call("groq.chat", lambda timeout: response())
+    lines = format_resilience_stats(resilience.stats())
+    assert len(lines) == 1
+    assert lines[0].startswith("groq.chat")
+    assert "calls=1" in lines[0] and "circuit=closed" in lines[0]
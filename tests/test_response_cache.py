@@ -0,0 +1,99 @@
+"""
+Unit tests for src/services/response_cache.py: key normalization, context
+matching, bypass of context-dependent questions, TTL and LRU eviction.
+"""
+import time
+
+from src.services.response_cache import ResponseCache
+
+MODEL = "llama-3.1-8b-instant"
+PROMPT = "Be brief."
+REPLY = "Paris is the capital of France."
+HISTORY = [
+    {"role": "user", "content": "hello"},
+    {"role": "assistant", "content": "Hi!"},
+]
+
+
+def test_normalized_question_hits():
+    cache = ResponseCache()
+    cache.put(MODEL, PROMPT, "What is the capital of France?", None, REPLY)
+    assert cache.get(MODEL, PROMPT, "what is the capital of france") == REPLY
+    assert cache.get(MODEL, PROMPT, "What's the capital of Spain?") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_model_and_prompt_are_part_of_the_key():
+    cache = ResponseCache()
+    cache.put(MODEL, PROMPT, "capital of France", None, REPLY)
+    assert cache.get("llama-3.3-70b-versatile", PROMPT, "capital of France") is None
+    assert cache.get(MODEL, "Be verbose.", "capital of France") is None
+
+
+def test_recent_context_must_match():
+    cache = ResponseCache(context_turns=1)
+    cache.put(MODEL, PROMPT, "capital of France", HISTORY, REPLY)
+    assert cache.get(MODEL, PROMPT, "capital of France", HISTORY) == REPLY
+    assert cache.get(MODEL, PROMPT, "capital of France") is None
+    # Only the last `context_turns` exchanges count
+    longer = [{"role": "user", "content": "hey"}, {"role": "assistant", "content": "Yo"}]
+    assert cache.get(MODEL, PROMPT, "capital of France", longer + HISTORY) == REPLY
+
+
+def test_zero_context_turns_ignores_history():
+    cache = ResponseCache(context_turns=0)
+    cache.put(MODEL, PROMPT, "capital of France", HISTORY, REPLY)
+    assert cache.get(MODEL, PROMPT, "capital of France") == REPLY
+
+
+def test_context_dependent_questions_bypass_the_cache():
+    cache = ResponseCache()
+    cache.put(MODEL, PROMPT, "tell me more about that", None, REPLY)
+    assert cache.entries == {}
+    assert cache.get(MODEL, PROMPT, "tell me more about that") is None
+    stats = cache.stats()
+    assert stats["bypassed"] == 1 and stats["misses"] == 0
+
+
+def test_empty_reply_is_not_cached():
+    cache = ResponseCache()
+    cache.put(MODEL, PROMPT, "capital of France", None, "")
+    assert cache.entries == {}
+
+
+def test_expired_reply_is_dropped():
+    cache = ResponseCache(ttl=0.05)
+    cache.put(MODEL, PROMPT, "capital of France", None, REPLY)
+    time.sleep(0.1)
+    assert cache.get(MODEL, PROMPT, "capital of France") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.size == 0
+
+
+def test_byte_budget_evicts_least_recently_used():
+    size = len(REPLY.encode("utf-8"))
+    cache = ResponseCache(max_bytes=2 * size)
+    cache.put(MODEL, PROMPT, "first question", None, REPLY)
+    cache.put(MODEL, PROMPT, "second question", None, REPLY)
+    cache.get(MODEL, PROMPT, "first question")
+    cache.put(MODEL, PROMPT, "third question", None, REPLY)
+
+    assert cache.get(MODEL, PROMPT, "second question") is None
+    assert cache.get(MODEL, PROMPT, "first question") == REPLY
+    assert cache.get(MODEL, PROMPT, "third question") == REPLY
+    assert cache.size == 2 * size
+
+
+def test_oversize_reply_is_not_cached():
+    cache = ResponseCache(max_bytes=8)
+    cache.put(MODEL, PROMPT, "capital of France", None, REPLY)
+    assert cache.entries == {} and cache.size == 0
+
+
+def test_replacing_a_reply_keeps_the_size_right():
+    cache = ResponseCache()
+    cache.put(MODEL, PROMPT, "capital of France", None, "Paris.")
+    cache.put(MODEL, PROMPT, "Capital of France?", None, REPLY)
+    assert cache.get(MODEL, PROMPT, "capital of France") == REPLY
+    assert cache.size == len(REPLY.encode("utf-8"))
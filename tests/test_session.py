@@ -0,0 +1,77 @@
+"""
+Unit tests for the state channel of src/pipeline/session.py: snapshot
+counters are incremented under the session lock, and every turn run is
+counted whether or not it was answered. The voice pipeline is stubbed.
+"""
+import threading
+from types import SimpleNamespace
+
+from src.pipeline.session import ConversationSession
+from src.pipeline.voice import VoiceTurnResult
+from src.utils.logger import Logger
+from src.utils.tracing import Trace
+
+
+class StubVoice:
+    player = None
+    status_callback = None
+
+    def __init__(self):
+        self.recorder = SimpleNamespace(vad=None)
+        self.cancels = 0
+
+    def cancel(self):
+        self.cancels += 1
+
+
+def make_session() -> ConversationSession:
+    return ConversationSession(
+        StubVoice(), Logger(level="error", console=False), barge_in=False
+    )
+
+
+def test_concurrent_barge_ins_are_all_counted():
+    session = make_session()
+    session._answering.set()
+
+    def speak():
+        for _ in range(500):
+            session._on_monitor_status("speaking")
+
+    threads = [threading.Thread(target=speak) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    snapshot = session.snapshot()
+    assert snapshot.barge_ins == 8 * 500
+    assert session.voice.cancels == 8 * 500
+
+
+def test_speech_outside_a_turn_is_not_a_barge_in():
+    session = make_session()
+    session._on_monitor_status("speaking")
+    assert session.snapshot().barge_ins == 0
+    assert session.snapshot().status == "speaking"
+
+
+def test_unanswered_turns_are_counted():
+    session = make_session()
+    session._publish(VoiceTurnResult(transcript="hello", trace=Trace()))
+    session._publish(VoiceTurnResult(transcript="", trace=Trace()))
+
+    snapshot = session.snapshot()
+    assert snapshot.turns == 2
+    assert snapshot.transcript == "hello"
+    assert snapshot.response == ""
+
+
+def test_every_update_bumps_the_version():
+    session = make_session()
+    version = session.snapshot().version
+    session._set_status("listening")
+    session._update("turns", transcript="hi")
+    snapshot = session.snapshot()
+    assert snapshot.version == version + 2
+    assert snapshot.turns == 1 and snapshot.transcript == "hi"
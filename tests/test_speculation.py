@@ -0,0 +1,148 @@
+"""
+Unit tests for src/pipeline/speculation.py: a matching final transcript
+reuses the speculative stream, a mismatch cancels it, and launching is held
+while the previous turn is still being answered. Groq is faked.
+"""
+import threading
+import time
+
+from src.pipeline.speculation import SpeculationStats, Speculator
+from src.services.memory import ConversationMemory
+from src.utils.logger import Logger
+
+TEXT = "what time is it"
+
+
+class FakeGroq:
+    """Streams a fixed answer, one token at a time, until cancelled."""
+
+    def __init__(self, tokens=("It ", "is ", "noon."), delay: float = 0.0):
+        self.tokens = tokens
+        self.delay = delay
+        self.requests = []
+        self.cancelled = threading.Event()
+
+    def chat_stream(self, text, history=None, cancel=None, on_error=None):
+        self.requests.append((text, history))
+        for token in self.tokens:
+            time.sleep(self.delay)
+            if cancel is not None and cancel.cancelled:
+                self.cancelled.set()
+                return
+            yield token
+
+
+def wait_until(condition, timeout: float = 2.0) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def make_speculator(groq: FakeGroq, **kwargs) -> Speculator:
+    options = dict(
+        memory=None, stable_time=0.05, min_words=2, max_attempts=2,
+    )
+    options.update(kwargs)
+    return Speculator(
+        groq, Logger(level="error", console=False), SpeculationStats(), **options
+    )
+
+
+def launched(speculator: Speculator) -> bool:
+    return wait_until(lambda: speculator.active is not None)
+
+
+def test_matching_transcript_reuses_the_stream():
+    groq = FakeGroq()
+    speculator = make_speculator(groq)
+    speculator.on_transcript(TEXT)
+    assert launched(speculator)
+
+    # Casing and punctuation differences still match
+    speculation = speculator.take("What time is it?")
+    assert speculation is not None
+    assert "".join(speculation.stream()) == "It is noon."
+    assert len(groq.requests) == 1
+    stats = speculator.stats.stats()
+    assert stats["hits"] == 1 and stats["wasted"] == 0
+
+
+def test_mismatched_transcript_cancels_the_stream():
+    groq = FakeGroq(delay=0.05)
+    speculator = make_speculator(groq)
+    speculator.on_transcript(TEXT)
+    assert launched(speculator)
+    speculation = speculator.active
+
+    assert speculator.take("what time is it in Paris") is None
+    assert speculation.token.cancelled
+    assert groq.cancelled.wait(1.0)
+    stats = speculator.stats.stats()
+    assert stats["hits"] == 0 and stats["wasted"] == 1
+
+
+def test_changed_history_is_a_miss():
+    memory = ConversationMemory()
+    speculator = make_speculator(FakeGroq(delay=0.05), memory=memory)
+    speculator.on_transcript(TEXT)
+    assert launched(speculator)
+
+    # The previous turn was recorded after the request was sent
+    memory.add_turn("hello", "Hi!")
+    assert speculator.take(TEXT) is None
+    assert speculator.stats.stats()["wasted"] == 1
+
+
+def test_new_words_discard_the_stale_request():
+    groq = FakeGroq(delay=0.05)
+    speculator = make_speculator(groq)
+    speculator.on_transcript(TEXT)
+    assert launched(speculator)
+    stale = speculator.active
+
+    speculator.on_transcript(TEXT + " in Paris")
+    assert stale.token.cancelled
+    assert wait_until(lambda: speculator.active is not None and speculator.active is not stale)
+    assert speculator.take("what time is it in Paris") is not None
+    assert [text for text, _ in groq.requests] == [TEXT, TEXT + " in Paris"]
+
+
+def test_short_transcripts_are_not_speculated():
+    groq = FakeGroq()
+    speculator = make_speculator(groq, min_words=5)
+    speculator.on_transcript(TEXT)
+    time.sleep(0.2)
+    assert speculator.active is None
+    assert groq.requests == []
+
+
+def test_barge_in_holds_the_launch():
+    groq = FakeGroq()
+    answering = threading.Event()
+    answering.set()
+    speculator = make_speculator(groq, hold=answering.is_set)
+    speculator.on_transcript(TEXT)
+
+    # Stable long enough, but the previous turn is still being answered
+    time.sleep(0.3)
+    assert speculator.active is None
+    assert groq.requests == []
+
+    answering.clear()
+    assert launched(speculator)
+    assert speculator.take(TEXT) is not None
+    assert len(groq.requests) == 1
+
+
+def test_take_stops_pending_launches():
+    groq = FakeGroq()
+    speculator = make_speculator(groq, stable_time=0.2)
+    speculator.on_transcript(TEXT)
+
+    assert speculator.take(TEXT) is None
+    time.sleep(0.4)
+    assert speculator.active is None
+    assert groq.requests == []
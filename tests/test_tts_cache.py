@@ -0,0 +1,154 @@
+"""
+Unit tests for src/services/tts_cache.py: key normalization, LRU and TTL
+eviction in both tiers, promotion of disk hits to memory, and the disk
+index rebuilt on restart. The disk tier uses pytest's tmp_path.
+"""
+import os
+import time
+
+from src.services.tts_cache import STALE_TEMP_AGE, DiskTier, MemoryTier, TTSCache
+
+MODEL = "aura-asteria-en"
+AUDIO = b"RIFF" + b"\0" * 96
+
+
+def make_cache(tmp_path, **kwargs) -> TTSCache:
+    options = dict(memory_bytes=1024, disk_dir=str(tmp_path), disk_bytes=4096, ttl=60.0)
+    options.update(kwargs)
+    return TTSCache(**options)
+
+
+def disk_files(tmp_path, suffix=".wav"):
+    return sorted(name for name in os.listdir(tmp_path) if name.endswith(suffix))
+
+
+# ---------- Keys ----------
+
+def test_keys_ignore_whitespace_and_unicode_form():
+    key = TTSCache.make_key(MODEL, "linear16", "Café  au lait ")
+    assert TTSCache.make_key(MODEL, "linear16", "Café au lait") == key
+    assert TTSCache.make_key(MODEL, "linear16", "café au lait.") != key
+
+
+def test_keys_include_model_and_encoding():
+    key = TTSCache.make_key(MODEL, "linear16", "hello")
+    assert TTSCache.make_key("aura-orion-en", "linear16", "hello") != key
+    assert TTSCache.make_key(MODEL, "mulaw", "hello") != key
+
+
+def test_normalized_text_hits(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put(MODEL, "linear16", "Hello there", AUDIO)
+    assert cache.get(MODEL, "linear16", " Hello   there ") == AUDIO
+    assert cache.get(MODEL, "linear16", "hello there") is None
+
+
+# ---------- Memory tier ----------
+
+def test_memory_tier_evicts_least_recently_used():
+    tier = MemoryTier(max_bytes=10)
+    tier.put("a", b"aaaa")
+    tier.put("b", b"bbbb")
+    tier.get("a")
+    tier.put("c", b"cccc")
+    assert tier.get("b") is None
+    assert tier.get("a") == b"aaaa" and tier.get("c") == b"cccc"
+    assert tier.size == 8
+
+
+def test_memory_tier_skips_oversize_audio():
+    tier = MemoryTier(max_bytes=4)
+    tier.put("a", b"too long")
+    assert tier.entries == {} and tier.size == 0
+
+
+# ---------- Disk tier ----------
+
+def test_disk_hit_is_promoted_to_memory(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put(MODEL, "linear16", "hello", AUDIO)
+    cache.memory.clear()
+
+    assert cache.get(MODEL, "linear16", "hello") == AUDIO
+    assert cache.get(MODEL, "linear16", "hello") == AUDIO
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["memory_entries"] == 1
+
+
+def test_disk_entries_survive_a_restart(tmp_path):
+    make_cache(tmp_path).put(MODEL, "linear16", "hello", AUDIO)
+
+    cache = make_cache(tmp_path)
+    assert cache.disk.size == len(AUDIO)
+    assert cache.get(MODEL, "linear16", "hello") == AUDIO
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_expired_disk_entry_is_removed(tmp_path):
+    cache = make_cache(tmp_path, ttl=0.05)
+    cache.put(MODEL, "linear16", "hello", AUDIO)
+    cache.memory.clear()
+    time.sleep(0.1)
+
+    assert cache.get(MODEL, "linear16", "hello") is None
+    assert disk_files(tmp_path) == []
+    assert cache.disk.size == 0
+
+
+def test_hits_do_not_extend_the_ttl(tmp_path):
+    disk = DiskTier(str(tmp_path), max_bytes=4096, ttl=0.15)
+    disk.put("a", AUDIO)
+    time.sleep(0.1)
+    assert disk.get("a") == AUDIO
+    time.sleep(0.1)
+    assert disk.get("a") is None
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    disk = DiskTier(str(tmp_path), max_bytes=3 * len(AUDIO) - 1, ttl=60.0)
+    for key in ("a", "b"):
+        disk.put(key, AUDIO)
+    disk.get("a")
+    disk.put("c", AUDIO)
+
+    assert disk_files(tmp_path) == ["a.wav", "c.wav"]
+    assert disk.get("b") is None
+    assert disk.size == 2 * len(AUDIO)
+
+
+def test_disk_tier_evicts_expired_entries_first(tmp_path):
+    disk = DiskTier(str(tmp_path), max_bytes=2 * len(AUDIO), ttl=0.2)
+    disk.put("old", AUDIO)
+    time.sleep(0.25)
+    disk.put("a", AUDIO)
+    disk.put("b", AUDIO)
+
+    # Over budget: the expired entry goes before any live one
+    assert disk_files(tmp_path) == ["a.wav", "b.wav"]
+
+
+def test_stale_temp_files_are_removed_on_start(tmp_path):
+    stale = tmp_path / "tmpcrashed.tmp"
+    stale.write_bytes(b"partial")
+    old = time.time() - STALE_TEMP_AGE - 1
+    os.utime(stale, (old, old))
+    # May belong to another process writing right now
+    fresh = tmp_path / "tmpwriting.tmp"
+    fresh.write_bytes(b"partial")
+
+    disk = DiskTier(str(tmp_path), max_bytes=4096, ttl=60.0)
+    assert not stale.exists()
+    assert fresh.exists()
+    assert disk.index == {}
+    assert disk.size == 0
+
+
+def test_clear_removes_both_tiers(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put(MODEL, "linear16", "hello", AUDIO)
+    cache.clear()
+
+    assert cache.get(MODEL, "linear16", "hello") is None
+    assert disk_files(tmp_path) == []
@@ -0,0 +1,41 @@
+"""
+Unit tests for the scoring in benchmarks/vad_bench.py: utterances are
+matched to labelled segments by the audio they captured.
+"""
+import pytest
+
+from benchmarks.vad_bench import score_file
+
+LABELS = [(1.461, 2.062), (4.5, 5.5)]
+
+
+def test_triggers_inside_speech_score_onset_and_endpoint():
+    utterances = [(1.5, 1.2, 3.0), (4.55, 4.3, 6.4)]
+    score = score_file(LABELS, utterances, 8.0)
+    assert score["onsets"] == pytest.approx([1.5 - 1.461, 0.05])
+    assert score["endpoints"] == pytest.approx([3.0 - 2.062, 0.9])
+    assert score["false_triggers"] == score["early_onsets"] == score["missed_segments"] == 0
+
+
+def test_early_trigger_is_an_early_onset_not_a_miss():
+    # Triggered by noise at 64 ms, but the capture covers the first segment
+    score = score_file(LABELS, [(0.064, 0.0, 3.84)], 8.0)
+    assert score["early_onsets"] == 1
+    assert score["false_triggers"] == 0
+    assert score["onsets"] == []
+    assert score["endpoints"] == pytest.approx([3.84 - 2.062])
+    assert score["missed_segments"] == 1  # the second segment only
+
+
+def test_capture_without_speech_is_a_false_trigger():
+    score = score_file(LABELS, [(3.0, 2.8, 3.9)], 8.0)
+    assert score["false_triggers"] == 1
+    assert score["missed_segments"] == 2
+
+
+def test_one_utterance_covering_two_segments():
+    score = score_file(LABELS, [(1.5, 1.3, 6.0)], 8.0)
+    assert score["missed_segments"] == 0
+    assert len(score["onsets"]) == 1
+    # Endpoint measured from the end of the last covered segment
+    assert score["endpoints"] == pytest.approx([0.5])